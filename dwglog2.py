@@ -10,47 +10,134 @@ stores those numbers, along with part numbers and part descriptions, in a
 sqlite database file.
 """
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import (QTableWidget, QMainWindow, QDialog, QApplication,
+from PyQt5.QtCore import (Qt, QTimer, QAbstractTableModel, QModelIndex, QObject,
+                          QStringListModel, pyqtSignal)
+from PyQt5.QtWidgets import (QTableView, QMainWindow, QDialog, QApplication,
                              QToolBar, QStatusBar, QAction, QLabel, QLineEdit,
-                             QTableWidgetItem, QVBoxLayout, QPushButton, QComboBox,
-                             QHBoxLayout, QMessageBox, QDialogButtonBox, QRadioButton)
-from PyQt5.QtGui import QIcon, QKeySequence, QPixmap, QColor
+                             QVBoxLayout, QPushButton, QComboBox,
+                             QHBoxLayout, QMessageBox, QDialogButtonBox, QRadioButton,
+                             QCheckBox, QSpinBox, QProgressBar, QCompleter, QTreeView)
+from PyQt5.QtGui import QIcon, QKeySequence, QPixmap, QColor, QStandardItemModel, QStandardItem
 import sys
 import sqlite3
 import os
-from datetime import datetime, date
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from dwglog2core import DatabaseBusyError, dates, settings, validate
+from dwglog2core import default_store as store  # replaced by reopen
+from dwglog2core.descrip import pndescrip, load_descriptions
+from dwglog2core.settings import get_settingsfn, get_settings, open_store
+from dwglog2core.watch import Watcher, merge
+from dwglog2core.columns import ColumnStore
+from dwglog2core.live import LiveSearch
+from dwglog2core.query import as_you_type
+from dwglog2core.parts import PartIndex
+from dwglog2core.templates import Suggestions
+from dwglog2core.similar import SimilarIndex
 
 __version__ = '0.3'
 __author__ = 'Kenneth E. Carlton'
 
-if os.getenv('USERNAME'):
-    author = os.getenv('USERNAME')  # Works only on MS Windows
-    author = author.replace('_', '').lower()
-elif sys.platform[:3] == 'lin':  # I'm working on my Linux system
-    author = 'kcarlton'
-else:
-    author = 'unknown'
+author = settings.default_author()
+
+views = []  # open tables, kept up to date by MainWindow.poll
+
+headers = ('Dwg No.', 'Part No.', 'Description', 'Date', 'Author')
+highlight = QColor(255, 255, 0)  # background of cells with a ?
+search_pagesize = 500  # records a search results window reads at a time
+partindex = PartIndex()  # part nos. of the log, for AddDialog; see MainWindow.index_parts
+suggestions = Suggestions()  # the log's description templates, for AddDialog; see MainWindow.learn
+similar = SimilarIndex()  # the log's descriptions, for AddDialog.addpart; see MainWindow.index_parts
+
+busymsg = ('The database is being used by other users and stayed locked.\n'
+           'No change was made.  Please try again in a moment.')
+
+
+class Database(QObject):
+    ''' Carries out the program's calls to the store on a thread of its own,
+    the only thread that uses the store's connection.  The window so never
+    waits for dwglog2.db, be it on a slow network share or locked by another
+    user.  Calls are carried out one at a time, in the order made, so writes
+    are serialized.  Results come back to the GUI thread through a signal.
+    '''
+    finished = pyqtSignal(object, object, object)  # (done, failed, call), result, exception
+    working = pyqtSignal(bool)  # calls are waiting or running, or not
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix='dwglog2 database')
+        self.worker = ThreadPoolExecutor(1, thread_name_prefix='dwglog2 worker')  # see compute
+        self.pending = 0
+        self.finished.connect(self._finished)
+
+    def call(self, func, *args, done=None, failed=None):
+        ''' Call func(*args) on the database thread; func may also be the
+        name of a method of the store, e.g. 'latest'.  Then, back on the GUI
+        thread, call done(result), or failed(exception) if func raised one
+        (the default shows the user what went wrong; see show_error).
+        '''
+        self.pending += 1
+        if self.pending == 1:
+            self.working.emit(True)
+        self.executor.submit(self._run, func, args, (done, failed, True))
+
+    def compute(self, func, *args, done=None, failed=None):
+        ''' Like call, but on a thread of its own, for work that needs no
+        database, e.g. building an index of rows that call read.  Calls to
+        the database so don't wait for it.
+        '''
+        self.worker.submit(self._run, func, args, (done, failed, False))
+
+    def _run(self, func, args, callbacks):
+        try:
+            # the store is looked up when the call is carried out: an
+            # earlier call may have replaced it (see reopen)
+            result = (getattr(store, func) if isinstance(func, str) else func)(*args)
+            self.finished.emit(callbacks, result, None)
+        except Exception as er:
+            self.finished.emit(callbacks, None, er)
+
+    def _finished(self, callbacks, result, error):
+        done, failed, call = callbacks
+        if call:
+            self.pending -= 1
+            if not self.pending:
+                self.working.emit(False)
+        if error is not None:
+            (failed or show_error)(error)
+        elif done is not None:
+            done(result)
+
+
+def reopen(settingsdic, sqldatafile):
+    ''' Close the store and open the one that settingsdic calls for.  Run on
+    the database thread, e.g. db.call(reopen, ...).
+    '''
+    global store
+    store.close()
+    store = open_store(settingsdic, sqldatafile)  # one warm connection, or a dwglog2 server
+    return store
 
 
 class MainWindow(QMainWindow):
     ''' Shows a table of data derived from the dwglog2.db database.  Menu items
     allow for the manipulation of this data.
     '''
+    found = pyqtSignal(int, list, bool, str)  # from the search thread; see LiveSearch
+
     def __init__(self, *args, **kwargs):
         super(MainWindow, self).__init__(*args, **kwargs)
         
-        global sqldatafile
-        sqldatafile = get_sqldatafile()        
-        self.conn = sqlite3.connect(sqldatafile)
-
-        with self.conn:
-            self.c = self.conn.cursor()
-            self.c.execute('''CREATE TABLE IF NOT EXISTS
-                            dwgnos(dwg_index INTEGER PRIMARY KEY NOT NULL UNIQUE,
-                            dwg KEY NOT NULL UNIQUE, part TEXT,
-                            description TEXT, date TEXT NOT NULL, author TEXT)''')
+        global sqldatafile, db
+        sqldatafile = get_sqldatafile()
+        db = Database()
+        # creates/upgrades the dwgnos table; this and all other use of the
+        # database is done on the database thread
+        db.call(reopen, get_settings(), sqldatafile)
+        self.building = 0  # index builds under way; see index_parts
+        self.unindexed = set()  # dwg_indexes changed during a build
+        self.index_parts()
+        self.learn()
                             
         self.setWindowIcon(QIcon('icon/dwglog2.ico'))                    
 
@@ -59,24 +146,17 @@ class MainWindow(QMainWindow):
         self.setWindowTitle('Dekker Drawing Log 2')
         self.setMinimumSize(765, 600)
 
-        self.tableWidget = QTableWidget()
-        self.setCentralWidget(self.tableWidget)
-        self.tableWidget.setAlternatingRowColors(True)
-        self.tableWidget.setColumnCount(5)
+        # The whole log, newest first.  Records are read a page at a time as
+        # the user scrolls down; see LogModel.
+        self.model = LogModel(self.cell_was_changed, parent=self)
+        # While the user types into the search box, the table shows this instead
+        self.results = ResultsModel([], '', self.cell_was_changed, parent=self)
+        self.tableView = QTableView()
+        self.tableView.setModel(self.model)
+        self.setCentralWidget(self.tableView)
+        format_table(self.tableView)
 
-        self.tableWidget.setColumnWidth(0, 80)
-        self.tableWidget.setColumnWidth(1, 170)
-        self.tableWidget.setColumnWidth(2, 335)
-        self.tableWidget.setColumnWidth(3, 90)
-        self.tableWidget.setColumnWidth(4, 30)
-
-        self.tableWidget.horizontalHeader().setStretchLastSection(True)
-        self.tableWidget.verticalHeader().setVisible(False)
-        self.tableWidget.setHorizontalHeaderLabels(('Dwg No.', 'Part No.',
-                                            'Description', 'Date', 'Author'))
-
-        self.tableWidget.cellClicked.connect(self.cell_was_clicked)
-        self.tableWidget.cellChanged.connect(self.cell_was_changed)
+        self.tableView.clicked.connect(self.cell_was_clicked)
 
         toolbar = QToolBar()
         toolbar.setMovable(False)
@@ -84,6 +164,13 @@ class MainWindow(QMainWindow):
 
         statusbar = QStatusBar()
         self.setStatusBar(statusbar)
+        busy = QProgressBar()  # shown while the database thread is at work
+        busy.setRange(0, 0)
+        busy.setMaximumSize(80, 12)
+        busy.setTextVisible(False)
+        busy.hide()
+        statusbar.addPermanentWidget(busy)
+        db.working.connect(busy.setVisible)
 
         btn_ac_addpart = QAction(QIcon('icon/add_record.png'), 'Add Record', self)  # add part icon
         btn_ac_addpart.triggered.connect(self.insert)
@@ -113,10 +200,22 @@ class MainWindow(QMainWindow):
         self.searchinput = QLineEdit()
         self.searchinput.setPlaceholderText('\U0001F50D Type here to search (e.g. BASEPLATE*; kcarlton)')
         self.searchinput.setToolTip('; = intersection of search result sets. Search is case sensitive. \n' +
-                                    'GLOB characters *, ?, [, and ] can be used for searching')
+                                    'GLOB characters *, ?, [, and ] can be used for searching. \n' +
+                                    'date:2020-01-01..2020-03-31 = a range of dates')
         self.searchinput.returnPressed.connect(self.searchpart)
+        self.searchinput.textEdited.connect(self.typed)
         toolbar.addWidget(self.searchinput)
 
+        # Search as you type: once typing pauses, search on a thread of its
+        # own, and show the rows in the table as they are found
+        self.searcher = None
+        self.searching = False  # rows are still coming in
+        self.typing = QTimer(self)
+        self.typing.setSingleShot(True)
+        self.typing.setInterval(300)  # ms without a key stroke
+        self.typing.timeout.connect(self.search_as_you_type)
+        self.found.connect(self.show_found)
+
         addpart_action = QAction(QIcon('icon/add_record.png'), '&Add Record', self)
         #self.addshortcut = QShortcut(QKeySequence('Ctrl+A'), self)  # ===========
         #self.addshortcut.activated.connect(self.insert)             # ===========
@@ -146,56 +245,238 @@ class MainWindow(QMainWindow):
         about_action = QAction(QIcon('icon/about.png'), '&About', self)
         about_action.triggered.connect(self.about)
         help_menu.addAction(about_action)
-        
+
+        cache_action = QAction('Search cache statistics', self)
+        cache_action.triggered.connect(self.cache_stats)
+        help_menu.addAction(cache_action)
+
+        # Look for changes made by other users every few seconds
+        views.append(self)
+        self.watcher = None
+        self.polling = False  # a poll is under way
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+        self.start_polling(get_settings())
+        self.start_searching(get_settings())
+
+    def start_polling(self, settingsdic):
+        ''' (Re)start looking for changes made by other users, every
+        'poll_interval' seconds of settings.txt (0 = never).
+        '''
+        self.timer.stop()
+        self.watcher = None
+
+        def started(watcher):
+            self.watcher = watcher
+            interval = settingsdic.get('poll_interval', 2)
+            if interval:
+                self.timer.start(int(interval * 1000))
+
+        def failed(e):
+            print('error at MainWindow/start_polling: ' + str(e))
+        db.call(lambda: Watcher(store), done=started, failed=failed)
+
+    def index_parts(self):
+        ''' Read all part nos. of the log into partindex, and all
+        descriptions into similar.  The rows are read on the database thread
+        and indexed on the worker thread.  From then on the indexes are kept
+        up to date with the records added or changed, by this user or by
+        others (see poll).
+        '''
+        def read():
+            return store.parts(), store.descriptions()
+
+        def build(parts, descriptions):
+            return PartIndex(parts), SimilarIndex(descriptions)
+
+        def built(indexes):
+            global partindex, similar
+            partindex, similar = indexes
+            self.building -= 1
+            # the indexes were built from rows read before records changed
+            # since then; read those again into them
+            changed = sorted(self.unindexed)
+            if not self.building:
+                self.unindexed.clear()
+            if changed:
+                db.call('rows', changed, failed=failed,
+                        done=lambda rows: self.index_rows(rows, changed))
+
+        def failed(e):
+            print('error at MainWindow/index_parts: ' + str(e))
+
+        def not_built(e):  # keep the indexes there are
+            self.building -= 1
+            if not self.building:
+                self.unindexed.clear()
+            failed(e)
+        self.building += 1
+        db.call(read, failed=not_built,
+                done=lambda rows: db.compute(build, *rows, done=built, failed=not_built))
+
+    def index_rows(self, rows, changed):
+        ''' Bring partindex and similar up to date with rows, the records
+        changed (dwg_indexes) that still exist.  Remember the records
+        changed while the indexes are being built, for index_parts.
+        '''
+        partindex.update(rows)
+        similar.update(rows, changed)
+        if self.building:
+            self.unindexed.update(changed)
+
+    def learn(self):
+        ''' Read the description templates that the log uses most into
+        suggestions, on the database thread.  Read again after records are
+        added or changed, by this user or by others (see poll).
+        '''
+        def learned(rows):
+            global suggestions
+            suggestions = Suggestions(rows)
+
+        def failed(e):
+            print('error at MainWindow/learn: ' + str(e))
+        db.call('templates_used', done=learned, failed=failed)
+
+    def poll(self):
+        ''' Called by the timer.  If other users changed records, patch the
+        tables that show them.
+        '''
+        if self.watcher is None or self.polling:
+            return  # the last poll is still waiting for the database
+        self.polling = True
+
+        def polled(changed):
+            self.polling = False
+            if changed is None:  # too much changed to tell what; read it all again
+                for view in views:
+                    if view is self:
+                        view.loaddata()
+                    else:
+                        view.refresh()
+                self.index_parts()
+                self.learn()
+                return
+            for view in views:
+                view.patch(changed)
+            if changed:
+                db.call('rows', changed, failed=failed,
+                        done=lambda rows: self.index_rows(rows, changed))
+                self.learn()
+
+        def failed(e):  # e.g. busy; try again on the next tick
+            self.polling = False
+            print('error at MainWindow/poll: ' + str(e))
+        db.call(self.watcher.poll, done=polled, failed=failed)
+
+    def patch(self, changed, rows=None):
+        ''' Bring the table up to date with the records changed, whose
+        current rows are rows; read from the database if not given.
+        '''
+        self.model.patch(changed, rows)
+        if self.tableView.model() is self.results and not self.searching:
+            self.results.patch(changed)  # only those its search finds
+
+    def start_searching(self, settingsdic):
+        ''' (Re)start the thread that searches as the user types, unless
+        'search_as_you_type' of settings.txt is False.
+        '''
+        if self.searcher is not None:
+            self.searcher.close()
+            self.searcher = None
+        self.show_model(self.model)
+
+        def started(searcher):
+            self.searcher = searcher
+
+        def failed(e):
+            print('error at MainWindow/start_searching: ' + str(e))
+        if settingsdic.get('search_as_you_type', True):
+            db.call(lambda: LiveSearch(store, self.found.emit), done=started, failed=failed)
+
+    def typed(self, text):
+        ''' The user typed into the search box.  Search once typing pauses.'''
+        if self.searcher is not None:
+            self.typing.start()  # restarted by each key stroke
+
+    def search_as_you_type(self):
+        ''' Search for what is in the search box, on the search thread.  A
+        search still running is interrupted.  An empty box shows the log.
+        '''
+        searchterm = as_you_type(self.searchinput.text().strip())
+        if not searchterm:
+            self.searcher.cancel()
+            self.searching = False
+            self.show_model(self.model)
+            self.statusBar().clearMessage()
+            return
+        self.results.searchterm = searchterm
+        self.results.reload([])
+        self.show_model(self.results)
+        self.searching = True
+        self.statusBar().showMessage('Searching for ' + searchterm + ' ...')
+        self.searcher.submit(searchterm)
+
+    def show_found(self, generation, rows, done, error):
+        ''' Rows found by the search as you type; see LiveSearch.'''
+        if self.searcher is None or generation != self.searcher.generation:
+            return  # from a search that has since been superseded
+        self.results.append(rows)
+        if done:
+            self.searching = False
+            if error:
+                self.statusBar().showMessage('Search failed: ' + error)
+            else:
+                self.statusBar().showMessage('%d found' % len(self.results.shown))
+
+    def show_model(self, model):
+        if self.tableView.model() is not model:
+            self.tableView.setModel(model)
+            format_table(self.tableView)  # a new model sets the columns back
+
     def settings(self):
         dlg = SettingsDialog()
         dlg.exec_()
+        self.start_polling(get_settings())
+        self.start_searching(get_settings())
+        self.index_parts()  # the log may be another file now
+        self.learn()
 
     def loaddata(self):
-        self.loadingdata = True  # make sure that "cell_was_changed" func doesn't get activated.
-        
-        try:
-            conn = sqlite3.connect(sqldatafile)  # sqldatafile is a global variable
-            with conn:
-                c = conn.cursor()
-                c.execute('''CREATE TABLE IF NOT EXISTS
-                                dwgnos(dwg_index INTEGER PRIMARY KEY NOT NULL UNIQUE,
-                                dwg KEY NOT NULL UNIQUE, part TEXT,
-                                description TEXT, date TEXT NOT NULL, author TEXT)''')
-                query = ('''SELECT dwg, part, description, date, author
-                            FROM dwgnos
-                            ORDER BY dwg_index DESC LIMIT 100''')
-                result = c.execute(query)
-                self.tableWidget.setRowCount(0)
-                for row_number, row_data in enumerate(result):
-                    self.tableWidget.insertRow(row_number)
-                    for column_number, data in enumerate(row_data):
-                        item = QTableWidgetItem(str(data))
-                        if '?' in str(data):
-                            item.setBackground(QColor(255, 255, 0))
-                        self.tableWidget.setItem(row_number, column_number, item)
-
-        except sqlite3.Error as e:
-            msg = ('sqlite error at MainWindow/loaddata: ' + str(e))
-            print(msg)
-            message(msg, 'Error', msgtype='Warning', showButtons=False) 
-            
-        except Exception as e:
-            msg = ('Error at MainWindow/loaddata: ' + str(e))
-            print(msg)
-            message(msg, 'Error', msgtype='Warning', showButtons=False) 
-    
-        self.loadingdata = False
+        self.model.reload()  # the table fills once the database thread has read the rows
+        if self.tableView.model() is self.results:
+            self.search_as_you_type()
 
     def insert(self):
         dlg = AddDialog()  # call up the dialog box to add a new record.
         dlg.exec_()
-        self.loaddata()   # automatically reload latest database data
+        if dlg.added:  # put the new records at the top of the table
+            self.patch([row[0] for row in dlg.added], dlg.added)
+            self.index_rows(dlg.added, [row[0] for row in dlg.added])
+            self.learn()
 
     def about(self):
         dlg = AboutDialog()
         dlg.exec_()
 
+    def cache_stats(self):
+        ''' Show how often searches were answered from the search cache (see
+        cache.SearchCache).  For debugging.
+        '''
+        def show(stats):
+            if stats is None:
+                msg = 'Searches are made by the dwglog2 server.  No cache is kept here.'
+            else:
+                msg = ('Searches answered from the cache (hits): {hits}\n'
+                       'Searches read from dwglog2.db (misses): {misses}\n'
+                       'Hit rate: {hit_rate:.0%}\n\n'
+                       'Searches in the cache: {entries}\n'
+                       'Memory used: {mb:.1f} of {maxmb:.0f} MB\n'
+                       'Emptied because the log changed: {invalidations}\n'
+                       'Dropped for lack of room: {evictions}').format(
+                           mb=stats['bytes'] / 2**20, maxmb=stats['maxbytes'] / 2**20, **stats)
+            message(msg, 'Search cache', msgtype='Information')
+        db.call(lambda: store.cache.stats() if hasattr(store, 'cache') else None, done=show)
+
     def _help(self):
         webbrowser.open('dwglog2_help.html')
 
@@ -209,12 +490,11 @@ class MainWindow(QMainWindow):
         else:
              self.radio_button_on = False
 
-    def cell_was_clicked(self, row, column):
+    def cell_was_clicked(self, index):
         ''' When a user clicks on a table cell, record the text from that cell
         before the user changes the contents.
         '''
-        item = self.tableWidget.item(row, column)
-        self.clicked_cell_text = item.text().strip()
+        self.clicked_cell_text = index.data().strip()
 
         if self.radio_button_on == True:
             #cb = QtGui.QApplication.clipboard()
@@ -222,15 +502,258 @@ class MainWindow(QMainWindow):
             cb.clear(mode=cb.Clipboard )
             cb.setText(self.clicked_cell_text, mode=cb.Clipboard)
 
-    def cell_was_changed(self,row,column):
-        if self.loadingdata == False:
-            k = {}
-            for n in range(5):
-                itemcol = self.tableWidget.item(row, n)
-                k[n] = itemcol.text()
-            clicked_text = self.clicked_cell_text  # text previously in the cell
-            cell_changed(k, clicked_text, column)  # update database with new data
-            self.loaddata()  # automatically reload latest database data
+    def cell_was_changed(self, k, clicked_text, column):
+        ''' Called by the model when the user has edited a cell.'''
+        def changed(affected):  # show the record(s) as they now are in the database
+            self.patch(affected.changed, affected.rows)
+        cell_changed(k, clicked_text, column, changed)  # update database with new data
+
+
+class RowsModel(QAbstractTableModel):
+    ''' Records of dwglog2.db, newest first, for a QTableView.  The rows are
+    kept in a ColumnStore, and a cell is drawn from it when the view asks for
+    it (see data); no widget item is made for each cell.
+
+    Parameters
+    ----------
+    edited: function
+        Called as edited(k, clicked_text, column) when the user has edited a
+        cell; see cell_changed for what k, clicked_text and column are.
+    '''
+    searchterm = ''  # rows that belong in the table are those this finds
+
+    def __init__(self, edited, parent=None):
+        super().__init__(parent)
+        self.edited = edited
+        self.shown = ColumnStore()  # rows shown, each starting with its dwg_index
+        self.generation = 0  # of the rows shown; see reset
+        self.more = False  # there are older rows than those read
+        self.fetching = False  # a page is being read
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.shown)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        data = self.shown.value(index.row(), index.column())
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return cell_text(index.column(), data)
+        if role == Qt.BackgroundRole and '?' in str(data):
+            return highlight
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return headers[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        ''' The user edited a cell.  The change is handed to self.edited,
+        which updates the database and then patches the record (see patch).
+        Until then the cell shows what it did before.
+        '''
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        row, column = index.row(), index.column()
+        k = {n: cell_text(n, self.shown.value(row, n)) for n in range(len(headers))}
+        clicked_text = k[column].strip()  # text previously in the cell
+        if value == k[column]:
+            return False
+        k[column] = value
+        # Not at once: the view is still in the midst of closing the editor,
+        # and self.edited may show message boxes and change the model.
+        QTimer.singleShot(0, lambda: self.edited(k, clicked_text, column))
+        return True
+
+    def reset(self, rows):
+        ''' Show rows instead of the rows shown.  Rows asked for before are
+        then no longer wanted; see current.
+        '''
+        self.beginResetModel()
+        self.shown = ColumnStore(rows)
+        self.generation += 1
+        self.endResetModel()
+
+    def current(self, done):
+        ''' A function that calls done(rows) if the rows shown have not been
+        replaced (see reset) in the meantime, for db.call.
+        '''
+        generation = self.generation
+
+        def current(rows):
+            if generation == self.generation:
+                done(rows)
+        return current
+
+    def patch(self, changed, rows=None):
+        ''' Bring the table up to date with the records changed (see
+        watch.Watcher), whose current rows are rows.  If rows is not given,
+        those of the records changed that belong in the table are read from
+        the database first.  Changed records older than the oldest row read
+        are left for the page that reads them.
+        '''
+        if self.more and len(self.shown):
+            oldest = self.shown.dwg_index[-1]
+            changed = [i for i in changed if i >= oldest]
+            if rows is not None:
+                rows = [row for row in rows if row[0] >= oldest]
+        if not changed:
+            return
+        if rows is None:
+            db.call('rows', changed, self.searchterm,
+                    done=self.current(lambda rows: self.patch(changed, rows)))
+            return
+        edits = merge(self.shown.copy(), changed, rows)
+        for action, pos, row in edits:
+            if action == 'update':
+                self.shown[pos] = row
+                self.dataChanged.emit(self.index(pos, 0), self.index(pos, len(headers) - 1))
+            elif action == 'insert':
+                self.beginInsertRows(QModelIndex(), pos, pos)
+                self.shown.insert(pos, row)
+                self.endInsertRows()
+            else:
+                self.beginRemoveRows(QModelIndex(), pos, pos)
+                del self.shown[pos]
+                self.endRemoveRows()
+
+
+class LogModel(RowsModel):
+    ''' The drawing log.  At first only one page of records is read.  When
+    the user scrolls to the end of what has been read, the view asks for
+    more (canFetchMore/fetchMore), and the next page is read with "WHERE
+    dwg_index < (the oldest read so far)".  Unlike an OFFSET that is as fast
+    at the end of the log as at its start, so opening the log, and scrolling
+    through it, costs the same however long it grows.
+
+    Parameters
+    ----------
+    edited: function
+        See RowsModel.
+    pagesize: int, optional
+        Number of records read at a time.  The default is 200.
+    '''
+    def __init__(self, edited, pagesize=200, parent=None):
+        super().__init__(edited, parent)
+        self.pagesize = pagesize
+
+    def reload(self):
+        ''' Read the first page of the log anew.'''
+        self.generation += 1  # pages asked for before are no longer wanted
+
+        def loaded(rows):
+            self.reset(rows)
+            self.more = len(rows) == self.pagesize
+            self.fetching = False
+        db.call('latest', self.pagesize, True, done=self.current(loaded))
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.more and not self.fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.more or self.fetching or not len(self.shown):
+            return
+        self.fetching = True
+
+        def fetched(rows):
+            self.fetching = False
+            self.more = len(rows) == self.pagesize
+            if rows:
+                first = len(self.shown)
+                self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+                self.shown.extend(rows)
+                self.endInsertRows()
+
+        def failed(e):  # e.g. busy; the view asks again when scrolled
+            self.fetching = False
+            print('error at LogModel/fetchMore: ' + str(e))
+        db.call('latest', self.pagesize, True, self.shown.dwg_index[-1],
+                done=self.current(fetched), failed=failed)
+
+
+class ResultsModel(RowsModel):
+    ''' The records found by a search.
+
+    Parameters
+    ----------
+    found: list
+        The rows found, each starting with its dwg_index (see Store.search).
+        Not kept; the rows are copied into a ColumnStore.
+    searchterm: str
+        The search that found them.
+    edited: function
+        See RowsModel.
+    pagesize: int, optional
+        Rows read at a time by load.  The default is 500.
+    '''
+    loaded = pyqtSignal()  # a page was read; see load
+
+    def __init__(self, found, searchterm, edited, pagesize=500, parent=None):
+        super().__init__(edited, parent)
+        self.searchterm = searchterm
+        self.shown = ColumnStore(found)
+        self.pagesize = pagesize
+        self.more = len(found) == pagesize  # found is the first page of the search
+        self.cap = 0
+
+    def reload(self, found):
+        ''' Show found, the rows of a new search, instead.'''
+        self.reset(found)
+        self.more = self.fetching = False
+
+    def load(self, cap=0):
+        ''' Read the rest of the search's results a page at a time, on the
+        database thread, until cap rows are shown (0: all of them).  Each
+        page shows as soon as it is read.
+        '''
+        self.cap = cap
+        if self.more and not self.fetching:
+            self.fetch(self.shown.dwg_index[-1] if len(self.shown) else None)
+
+    def refresh(self):
+        ''' Search again.  The first page read replaces the rows shown.'''
+        self.generation += 1  # pages asked for before are no longer wanted
+        self.more = True
+        self.fetch(None)
+
+    def fetch(self, before):
+        limit = self.pagesize
+        if self.cap:
+            limit = max(min(limit, self.cap - len(self.shown)), 1)
+        self.fetching = True
+
+        def fetched(rows):
+            self.fetching = False
+            self.more = len(rows) == limit
+            if before is None:
+                self.reset(rows)
+            else:
+                self.append(rows)
+            if self.more and (not self.cap or len(self.shown) < self.cap):
+                self.fetch(self.shown.dwg_index[-1])
+            self.loaded.emit()
+
+        def failed(e):
+            self.fetching = False
+            self.loaded.emit()
+            show_error(e)
+        db.call('search', self.searchterm, limit, True, before,
+                done=self.current(fetched), failed=failed)
+
+    def append(self, rows):
+        ''' Add rows, more rows found by the search, at the end.'''
+        if rows:
+            first = len(self.shown)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self.shown.extend(rows)
+            self.endInsertRows()
 
 
 class AboutDialog(QDialog):
@@ -275,27 +798,51 @@ class AddDialog(QDialog):
         self.flag = False
         self.descrip = ''
         self.part = ''
+        self.added = []  # the records added, for the main table
 
         self.setWindowTitle('Insert Part Data')
         self.setFixedWidth(350)
-        self.setFixedHeight(150)
+        self.setFixedHeight(180)
 
         layout = QVBoxLayout()
 
         self.partinput = QComboBox()
         self.partinput.setEditable(True)
-        self.partinput.addItems(["0300-", "2202-", "2223-", "2724-", "2273-",
+        # the common prefixes, and any others that the log's part nos. have
+        self.partinput.addItems(sorted(set(partindex.prefixes()) |
+                                {"0300-", "2202-", "2223-", "2724-", "2273-",
                                  "2277-", "2728-", "2730-", "6050-", "6415-",
-                                 "6820-", "6830-", "6875-", "6890-"])
+                                 "6820-", "6830-", "6875-", "6890-"}))
         self.partinput.setCurrentIndex(-1)
         self.partinput.setCurrentText("Part No.")
         self.partinput.view().setMinimumHeight(220)
         self.partinput.currentTextChanged.connect(self.pntextchanged)
         layout.addWidget(self.partinput)
 
+        # While the user types a part no., offer those of the log that begin
+        # with what was typed, with their descriptions.  Found in partindex,
+        # not in the database, so each key stroke costs microseconds.
+        self.matches = QStandardItemModel(self)
+        self.completer = QCompleter(self.matches, self)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setWidget(self.partinput.lineEdit())
+        popup = QTreeView()
+        popup.setHeaderHidden(True)
+        popup.setRootIsDecorated(False)
+        popup.setMinimumWidth(500)
+        self.completer.setPopup(popup)
+        self.completer.activated[str].connect(self.completed)
+        self.partinput.lineEdit().textEdited.connect(self.complete)
+
         self.descriptioninput = QLineEdit()
         self.descriptioninput.setPlaceholderText('Description')
         self.descriptioninput.setMaxLength(40)
+        # the descriptions suggested for the part no., offered as the user types
+        self.descriptions = QStringListModel(self)
+        desccompleter = QCompleter(self.descriptions, self)
+        desccompleter.setCaseSensitivity(Qt.CaseInsensitive)
+        desccompleter.setFilterMode(Qt.MatchContains)
+        self.descriptioninput.setCompleter(desccompleter)
         layout.addWidget(self.descriptioninput)
         
         self.author = QLineEdit()
@@ -303,6 +850,19 @@ class AddDialog(QDialog):
         
         layout.addWidget(self.author)
 
+        self.countinput = QSpinBox()
+        self.countinput.setRange(1, 100)
+        self.countinput.setValue(1)
+        self.countinput.setToolTip('Number of records to add.  Each gets its own dwg no., and, if\n'
+                                   'only the first four digits of the part no. are given (e.g. 6890-),\n'
+                                   'its own part no.  All get the same description.')
+        countlabel = QLabel('No. of records:')
+        countbox = QHBoxLayout()
+        countbox.addWidget(countlabel)
+        countbox.addWidget(self.countinput)
+        countbox.addStretch(1)
+        layout.addLayout(countbox)
+
         self.QBtn = QPushButton('text-align:center')
         self.QBtn.setText("OK")
         self.QBtn.setMaximumWidth(75)
@@ -316,42 +876,75 @@ class AddDialog(QDialog):
     def addpart(self):
         global author        
         description = self.descriptioninput.text().upper().strip()
-        now = datetime.now()
-        _date = now.strftime("%m/%d/%Y")
         
         if self.author.text():
             author = self.author.text().lower()
+
+        # a drawing of the same part under another description?  (Not one
+        # of another size; see similar.py.  A ? is still to be filled in, as
+        # in BASEPLATE ? CS, so no need to look.)
+        if description and '?' not in description:
+            matches = similar.find(description)
+            if matches:
+                msg = ('These records have a description much like\n' + description + ':\n\n' +
+                       '\n'.join('%3d%%   %s   %s   %s' % (100 * score, dwg, part, desc)
+                                 for score, dwg, part, desc in matches) +
+                       '\n\nAdd the new record anyway?')
+                if message(msg, 'Possible duplicate', showButtons=True) != QMessageBox.Ok:
+                    return
                     
-        try:
-            self.conn = sqlite3.connect(sqldatafile) # sqldatafile is a global variable
-            #self.conn = sqlite3.connect('dwglog2.db')
-            with self.conn:
-                self.c = self.conn.cursor()
-                self.c.execute("SELECT dwg_index FROM dwgnos ORDER BY dwg_index DESC LIMIT 1")
-                result = self.c.fetchall()
-                dwgno, self.part, new_dwg_index = generate_nos(result, self.part)
-                self.c.execute("INSERT INTO dwgnos (dwg_index, dwg, part, description, Date, author) VALUES (?,?,?,?,?,?)",
-                               (new_dwg_index, dwgno, self.part, description, _date, author))
-            self.close()
-        except TypeError:
-            # if a dwg_index no. not derived from the database, try the below
-            year = date.today().year
-            dwgno, self.part, new_dwg_index  = generate_nos([(year*100000,)], self.part)
-            #self.conn = sqlite3.connect('dwglog2.db')
-            self.conn = sqlite3.connect(sqldatafile)  # sqldatafile is a global variable
-            with self.conn:
-                self.c = self.conn.cursor()
-                self.c.execute("INSERT INTO dwgnos (dwg_index, dwg, part, description, Date, author) VALUES (?,?,?,?,?,?)",
-                               (new_dwg_index, dwgno, self.part, description, _date, author))
+        def added(rows):
+            self.added = rows
             self.close()
-            QMessageBox.warning(QMessageBox(), 'Error', 'There appears to be a problem with\n'
-                                                        'the database.  Will try to cope.')
-        except sqlite3.Error as er:
-            errmsg = 'SQLite error: %s' % (' '.join(er.args))
-            QMessageBox.warning(QMessageBox(), 'Error', errmsg)
-        except Exception as er:
-            errmsg = 'Error: %s' % (' '.join(er.args))
-            QMessageBox.warning(QMessageBox(), 'Error', errmsg)
+
+        def failed(er):
+            self.setEnabled(True)
+            if isinstance(er, DatabaseBusyError):
+                QMessageBox.warning(QMessageBox(), 'Database busy', busymsg)
+            elif isinstance(er, sqlite3.Error):
+                errmsg = 'SQLite error: %s' % (' '.join(er.args))
+                QMessageBox.warning(QMessageBox(), 'Error', errmsg)
+            else:
+                errmsg = 'Error: %s' % (' '.join(str(arg) for arg in er.args))
+                QMessageBox.warning(QMessageBox(), 'Error', errmsg)
+
+        self.setEnabled(False)  # no second add while this one waits for the database
+        # takes the next dwg no(s). and inserts all the records in one transaction
+        db.call('add', self.part, description, author, self.countinput.value(),
+                done=added, failed=failed)
+
+    def complete(self, part):
+        ''' Offer the part nos. of the log that begin with part.'''
+        self.matches.clear()
+        for pn, description in partindex.complete(part.strip(), 50) if part.strip() else []:
+            self.matches.appendRow([QStandardItem(pn), QStandardItem(description)])
+        if self.matches.rowCount():
+            self.completer.popup().resizeColumnToContents(0)
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def completed(self, part):
+        ''' The user picked part from the part nos. offered: take it, and,
+        unless the user wrote a description, its description.
+        '''
+        desc = self.descriptioninput.text().strip()
+        self.partinput.setCurrentText(part)
+        description = partindex.describe(part)
+        if description and (not desc or desc == self.descrip.strip()):
+            self.descrip = description
+            self.descriptioninput.setText(description)
+
+    def suggested(self, part):
+        ''' Descriptions for a part no. beginning with part: that of pndescrip
+        (see descriptions.py) first, then the templates the log uses most for
+        its first four digits (see templates.py).
+        '''
+        if len(part) < 4 or not part[:4].isdigit():
+            return []
+        prefix = int(part[:4])
+        found = [pndescrip[prefix].strip()] if prefix in pndescrip else []
+        return found + [t for t in suggestions.get(prefix) if t not in found]
 
     def pntextchanged(self, part):
         ''' Generate a part's description based on the part no. that the user
@@ -359,7 +952,8 @@ class AddDialog(QDialog):
         user then will be alter this description as he pleases.  At least the
         first four characters of the part no., all digits, need to be provided.
         If the fifth character is not a dash, -, the description field will
-        be cleared.
+        be cleared.  The other descriptions suggested are offered when the
+        user types in the description field.
 
         Parameters
         ----------
@@ -373,15 +967,13 @@ class AddDialog(QDialog):
         '''
         self.part = part
         desc = self.descriptioninput.text().strip()
+        suggested = self.suggested(part)
+        self.descriptions.setStringList(suggested)
         if len(part) <= 3 and desc == self.descrip:  # if user put in his decrip, leave it
             self.descriptioninput.setText("")
-        elif (len(part) == 4 and part.isdigit() and (int(part) in pndescrip)
+        elif (len(part) in (4, 5) and suggested
                 and (not desc  or desc == self.descrip.strip())):
-            self.descrip = pndescrip[int(part[:4])]
-            self.descriptioninput.setText(self.descrip.strip())
-        elif (len(part) == 5 and part[:4].isdigit() and (int(part[:4]) in pndescrip)
-                and (not desc  or desc == self.descrip.strip())):
-            self.descrip = pndescrip[int(part[:4])]
+            self.descrip = suggested[0]
             self.descriptioninput.setText(self.descrip.strip())
         if (len(part) == 5 and part[-1:] != '-' and desc == self.descrip.strip()):
             self.descriptioninput.setText("")
@@ -391,13 +983,13 @@ class SearchResults(QDialog):
     ''' A dialog box to show search results based on a users search query.
     The results are shown in a table.  Note that any changes made to a cell
     in the table are passed on to the dwglog2.db database.  Afterward the
-    table is refreshed.
+    rows changed are redrawn.
     '''
-    def __init__(self, found, searchterm, radio_button_on, parent=None):
+    def __init__(self, found, searchterm, radio_button_on, cap=0, parent=None):
         super(SearchResults, self).__init__(parent)
-        self.found = found
         self.searchterm = searchterm
         self.radio_button_on = radio_button_on
+        self.cap = cap
         lenfound = len(found)
         self.setWindowTitle('Search Results: ' + searchterm)
         self.setMinimumWidth(785)
@@ -405,24 +997,14 @@ class SearchResults(QDialog):
             self.setMinimumHeight(600)
         elif 16 > lenfound > 5:    # to rescrict the size of the dialog box somewhat
             self.setMinimumHeight(lenfound*37 + 40)
-        self.r_max = len(self.found)
-        self.c_max = len(self.found[0])
-        self.values = {}
-        for r in range(self.r_max):
-             for c in range(self.c_max):
-                self.values[(r, c)] = found[r][c]
-        self.tableWidget = QTableWidget()
-        self.tableWidget.setColumnCount(5)
-        self.tableWidget.verticalHeader().setVisible(False)
-        self.tableWidget.setColumnWidth(0, 80)
-        self.tableWidget.setColumnWidth(1, 170)
-        self.tableWidget.setColumnWidth(2, 335)
-        self.tableWidget.setColumnWidth(3, 90)
-        self.tableWidget.setColumnWidth(4, 30)
-        self.tableWidget.horizontalHeader().setStretchLastSection(True)
-        self.tableWidget.setAlternatingRowColors(True)
-        self.tableWidget.cellClicked.connect(self.cell_was_clicked)
-        self.tableWidget.cellChanged.connect(self.cell_was_changed)
+        # found is the first page of results; the rest are read while the window shows
+        self.model = ResultsModel(found, searchterm, self.cell_was_changed,
+                                  pagesize=search_pagesize, parent=self)
+        self.model.loaded.connect(self.count)
+        self.tableView = QTableView()
+        self.tableView.setModel(self.model)
+        format_table(self.tableView)
+        self.tableView.clicked.connect(self.cell_was_clicked)
 
         btn_refresh = QPushButton()
         btn_refresh.setIcon(QIcon("icon/refresh.png"))
@@ -438,11 +1020,19 @@ class SearchResults(QDialog):
             self.radio_button.setChecked(False)
         self.radio_button.clicked.connect(self.check)
 
+        self.count_label = QLabel()
+        self.more_button = QPushButton('Load more')
+        self.more_button.setToolTip('Read the next %d records found' % cap if cap else '')
+        self.more_button.clicked.connect(self.load_more)
+
         hbox = QHBoxLayout()
         hbox.setSpacing(18)
         #hbox.addStretch(2)
         hbox.addWidget(btn_refresh)
         hbox.addWidget(self.radio_button)
+        hbox.addStretch(1)
+        hbox.addWidget(self.count_label)
+        hbox.addWidget(self.more_button)
 
         layout = QVBoxLayout()
         #layout.addStretch(1)
@@ -451,9 +1041,25 @@ class SearchResults(QDialog):
         #layout = QVBoxLayout()
         #layout.addWidget(btn_refresh)
         #layout.addWidget(self.radio_button)
-        layout.addWidget(self.tableWidget)
+        layout.addWidget(self.tableView)
         self.setLayout(layout)
-        self.loaddata()
+        self.count()
+        self.model.load(cap)
+
+    def count(self):
+        ''' Show how many records have been found, and whether there are more.'''
+        shown, model = len(self.model.shown), self.model
+        if model.fetching:
+            self.count_label.setText('{:,} found so far ...'.format(shown))
+        elif model.more:
+            self.count_label.setText('first {:,} found'.format(shown))
+        else:
+            self.count_label.setText('{:,} found'.format(shown))
+        self.more_button.setVisible(model.more and not model.fetching)
+
+    def load_more(self):
+        self.model.load(len(self.model.shown) + self.cap if self.cap else 0)
+        self.count()
 
     def check(self):
         if self.radio_button.isChecked():
@@ -462,71 +1068,39 @@ class SearchResults(QDialog):
             self.radio_button_on = False
         print(self.radio_button_on)
 
-    def loaddata(self):
-        ''' The __init__ func loads data without using this function.  Rather
-        this function reloads data.
+    def searchpart(self):
+        ''' Again search the database using the previously used search query
+        so that the table can be refreshed.  As many records are read as are
+        now shown.
         '''
-        try:
-            self.loadingdata = True  # make sure that "cell_was_changed" func doesn't get activated.
-            self.tableWidget.clear()
-            self.tableWidget.setColumnCount(self.c_max)
-            self.tableWidget.setRowCount(self.r_max)
-            self.tableWidget.setHorizontalHeaderLabels(['Dwg No.', 'Part No.',
-                                                'Description', 'Date', 'Author'])
-            for r in range(self.r_max):
-                for c in range(self.c_max):
-                    item = QTableWidgetItem(str(self.found[r][c]))
-                    if '?' in str(str(self.found[r][c])):
-                        item.setBackground(QColor(255, 255, 0))
-                    item.setTextAlignment(Qt.AlignLeft|Qt.AlignVCenter)
-                    self.tableWidget.setItem(r, c, item)
-            self.loadingdata = False
-        except:
-            self.tableWidget.clear()
-            self.loadingdata = False
+        self.model.cap = max(len(self.model.shown), self.cap) if self.cap else 0
+        self.model.refresh()
+        self.count()
 
-    def searchpart(self):
-        ''' If a user changed a cell, then the database would have been updated.
-         This function serves to again search the database using the previously
-         used search query so that the table can be refreshed.
+    def patch(self, changed):
+        ''' Bring the table up to date with the records changed: add those
+        that the search now finds, remove those it no longer finds.
         '''
-        caller_is_SearchResults = True
-        self.found = search(self.searchterm, self.radio_button_on, caller_is_SearchResults)
-        if len(self.found):
-            self.r_max = len(self.found)
-            self.c_max = len(self.found[0])
+        self.model.patch(changed)
 
-    def cell_was_clicked(self, row, column):
+    def cell_was_clicked(self, index):
         ''' When a user clicks on a table cell, record the text from that cell
         before the user changes the contents.
         '''
-        try:
-            item = self.tableWidget.item(row, column)
-            self.clicked_cell_text = item.text().strip()
-            if self.radio_button_on == True:
-                cb = QApplication.clipboard()
-                cb.clear(mode=cb.Clipboard )
-                cb.setText(self.clicked_cell_text, mode=cb.Clipboard)
-        except:
-            pass
-
-    def cell_was_changed(self, row, column):
-        try:
-            if self.loadingdata == False:
-                k = {}
-                for n in range(5):
-                    itemcol = self.tableWidget.item(row, n)
-                    k[n] = itemcol.text()
-                clicked_text = self.clicked_cell_text  # text previously in the cell
-                cell_changed(k, clicked_text, column)  # update database with new data
-                self.searchpart()  # cell was changed.  Search again to get table refreshed.
-                self.loaddata()   # cell was changed, so reload data from database
-        except:
-            self.tableWidget.clear()
+        self.clicked_cell_text = index.data().strip()
+        if self.radio_button_on == True:
+            cb = QApplication.clipboard()
+            cb.clear(mode=cb.Clipboard )
+            cb.setText(self.clicked_cell_text, mode=cb.Clipboard)
+
+    def cell_was_changed(self, k, clicked_text, column):
+        ''' Called by the model when the user has edited a cell.'''
+        def changed(affected):  # redraw just the row(s) changed
+            self.model.patch(affected.changed)
+        cell_changed(k, clicked_text, column, changed)  # update database with new data
 
     def refresh(self):
         self.searchpart()
-        self.loaddata()
         
         
 class SettingsDialog(QDialog):
@@ -564,6 +1138,45 @@ class SettingsDialog(QDialog):
             self.currentsqldatafile = self.settingsdic.get('sqldatafile', '')
             self.sqldatafile_input.setText(self.currentsqldatafile)
         layout.addWidget(self.sqldatafile_input)
+
+        self.wal_checkbox = QCheckBox('Concurrency mode (WAL journal; only used if dwglog2.db is on a local disk)')
+        self.wal_checkbox.setChecked(bool(self.settingsdic.get('wal', False)))
+        self.wal_checkbox.setToolTip('Users reading the database will not block a user adding a record.\n'
+                                     'Ignored for a dwglog2.db located on a network share.')
+        layout.addWidget(self.wal_checkbox)
+
+        self.replica_checkbox = QCheckBox('Search a local copy of dwglog2.db (for a dwglog2.db on a slow network share)')
+        self.replica_checkbox.setChecked(bool(self.settingsdic.get('replica', False)))
+        self.replica_checkbox.setToolTip('Searches are much faster, but may miss changes made by\n'
+                                         'other users in the last few seconds.')
+        layout.addWidget(self.replica_checkbox)
+
+        self.live_checkbox = QCheckBox('Search as you type')
+        self.live_checkbox.setChecked(bool(self.settingsdic.get('search_as_you_type', True)))
+        self.live_checkbox.setToolTip('Show what the search box finds while you type, without\n'
+                                      'pushing the Enter key.  The Enter key still opens a\n'
+                                      'search results window.')
+        layout.addWidget(self.live_checkbox)
+
+        cap_layout = QHBoxLayout()
+        cap_label = QLabel('Records a search results window reads at first (0 = all):')
+        self.cap_input = QSpinBox()
+        self.cap_input.setRange(0, 1000000)
+        self.cap_input.setSingleStep(1000)
+        self.cap_input.setValue(int(self.settingsdic.get('search_cap', 5000)))
+        self.cap_input.setToolTip('More can then be read with the Load more button.')
+        cap_layout.addWidget(cap_label)
+        cap_layout.addWidget(self.cap_input)
+        layout.addLayout(cap_layout)
+
+        server_label = QLabel()
+        server_label.setText('dwglog2 server (e.g. http://cadserver:8765), if your\n'
+                             'administrator runs one.  Leave blank to use the file above:')
+        layout.addWidget(server_label)
+
+        self.server_input = QLineEdit()
+        self.server_input.setText(self.settingsdic.get('server', ''))
+        layout.addWidget(self.server_input)
         
         self.QBtnOK = QPushButton('text-align:center')
         self.QBtnOK.setText("OK")
@@ -599,12 +1212,18 @@ class SettingsDialog(QDialog):
                 x = x.replace('\\', '\\\\')
                 self.settingsdic = eval(x) 
                 self.settingsdic['sqldatafile'] = self.sqldatafile
+                self.settingsdic['wal'] = self.wal_checkbox.isChecked()
+                self.settingsdic['replica'] = self.replica_checkbox.isChecked()
+                self.settingsdic['search_as_you_type'] = self.live_checkbox.isChecked()
+                self.settingsdic['search_cap'] = self.cap_input.value()
+                self.settingsdic['server'] = self.server_input.text().strip()
                 file.seek(0)
                 strsettingsdic = str(self.settingsdic)
                 strsettingsdic = strsettingsdic.replace('\\\\', '\\')
                 file.write(strsettingsdic)
                 file.truncate()
                 sqldatafile = self.sqldatafile # set the global variable
+                db.call(reopen, dict(self.settingsdic), sqldatafile)  # opens the new connection
             if (self.currentsqldatafile.lower() != self.sqldatafile.lower()
                     and not flag):
                 msg =  "File not found.  New file created: \n" + self.sqldatafile
@@ -624,115 +1243,76 @@ class SettingsDialog(QDialog):
         self.close()
 
 
-def generate_nos(dwg_indexes, partNo):
-    '''
-    Generate a new drawing number and a new part no.
-
-    Parameters
-    ----------
-    dwg_indexes: list
-        A list of tuples derived from the dwg_index column (not the dwg column)
-        of the prtnos table of the dwglog2.db sqlite database file.  The list
-        has a form like: [(202100855,), (202100856,), (202100857,)]
-
-    partNo: str
-        Part no. given by the user.
-
-    Returns
-    -------
-    dwgNo: int
-        A new drawing no. to add to the dwglog2.db file, e.g. 2020051
-    partNo: str
-        Same PartNo as input to this function unless autofill kicks in to
-        change nos. from, for example, '0300' to '0300-2020-051', or
-        '6521' to '6521-2020-051'.
-    new_dwg_index: int
-        ROWID, used by Sqlite, to order data and to generate new part nos.
-        e.g. 202100855.
-    '''
-    year = date.today().year  # current year, e.g. 2021 (an int)
-    int_list = []
-    for x in dwg_indexes:  # dwg_indexes has a form like [(202100855,), (202100856,), (202100857,)]
-        if isinstance(x[0], int) and str(x[0])[:4] == str(year):
-            int_list.append(x[0])  # a list of recent dwg. nos.
-    if int_list:  # list of dwg nos. in the current year
-        largest = max(int_list)
-        new_dwg_index = largest + 1
-        chrs = str(new_dwg_index)[4:]  # e.g., from 202100855 -> "00855"
-        whittled = chrs
-        for x in chrs:                       # whittle off leading zeros
-            if x=='0':
-                whittled = whittled[1:]
-            else:
-                break
-        whittled = whittled.zfill(3)      # e.g. "5" to "005", or "13" to "013"
-        dwgNo = int(str(year) + whittled)
-    else:
-        dwgNo = year*1000 + 1  # if no ints in list, then is 1st dwg no. for a new year
-        d = str(dwgNo)
-        new_dwg_index = int(d[:4] + (9 % len(d))*'0' + d[4:])
-    if ((partNo.isnumeric() and len(partNo) == 4) or
-           (len(partNo) == 5 and partNo[:4].isnumeric() and partNo[-1] == '-')):
-        partNo = partNo[:4] + '-' + str(year) + '-' + str(dwgNo)[4:]
-    return dwgNo, partNo, new_dwg_index
-
-
-def search(searchterm, radio_button_on=False, caller_is_SearchResults=False):
+def search(searchterm, radio_button_on=False):
     '''  As explained in this program's help section, takes input of a form
     like: "09*; 11/*/2020 or 09*; 12/*/2020", parses it according to embedded
     semicolons and "or"s, then passes that info on to sqlite as a query,
     and sqlite then yields search results from the dwglog2.db database.
+    A term like "date:2020-01-01..2020-03-31" finds a range of dates.
+
+    The search is carried out on the database thread.  As soon as the first
+    page of records found is read, a gui window created by the class
+    "SearchResults" shows them; the rest are read while it shows, up to
+    'search_cap' of settings.txt, and more on request.
 
     Parameters
     ----------
     searchterm: str
         A search term to search for.
-
-    caller_is_SearchResults: bool, optional
-        When this function is called upon by the "SearchResults" class, it sets
-        "caller_is_SearchResults" to True  The default is False.
+    radio_button_on: bool, optional
+        AutoCopy is switched on.  The default is False.
 
     Returns
     -------
-    rows: list or SearchResults
-        If caller_is_SearchResults is set to True, returns a list tuples.  Each
-        tuple contains five items: dwg no., pt. no., description, date, and
-        author.  These tuples are found items based upon a users query.  If
-        caller_is_SearchResults is set to False, opens a gui window created by
-        the class "SearchResults" which shows query results.
+    None
     '''
-    searchlistparent = searchterm.split(' or ')
-    searchlistparent = [x.strip('; ') for x in searchlistparent]  # get rid of any junk on ends of str
-    sqlSelect = 'SELECT dwg, part, description, date, author FROM dwgnos WHERE ('
-    for searchtermchild in searchlistparent:
-        searchlistchild = searchtermchild.split(';')
-        searchlistchild = [x.strip() for x in searchlistchild]
-        for i in searchlistchild:
-            sqlSelect +=  '''(dwg GLOB '{0}' OR part GLOB '{0}' OR description GLOB '{0}'
-                              OR author GLOB '{0}'
-                              OR date GLOB '{0}') AND '''.format(i)
-        sqlSelect = sqlSelect[:-5] + ') OR ('
-    sqlSelect = sqlSelect[:-6] + ') ORDER BY dwg_index DESC'
-    try:
-        conn = sqlite3.connect("dwglog2.db")
-        with conn:
-            c = conn.cursor()
-            result = c.execute(sqlSelect)
-        rows = result.fetchall()
-        if caller_is_SearchResults:
-            return rows
-        srch = SearchResults(rows, searchterm, radio_button_on)
+    def found(rows):
+        cap = int(get_settings().get('search_cap', 5000))
+        srch = SearchResults(rows, searchterm, radio_button_on, cap)
+        rows.clear()  # the window keeps its own, compact, copy
+        views.append(srch)
         srch.show()  # https://stackoverflow.com/questions/11920401/pyqt-accesing-main-windows-data-from-a-dialog
         srch.exec_()
-    except Exception:
-        msgbox = QMessageBox()
-        msgbox.setIcon(QMessageBox.Warning)
-        msgbox.setWindowTitle('Error')
-        msgbox.setText('Could not find text searched for.')
-        msgbox.exec_()
+        views.remove(srch)
+        srch.model.generation += 1  # drop pages still being read
+
+    def failed(e):
+        if isinstance(e, (ValueError, DatabaseBusyError)):  # e.g. a date range that doesn't make sense
+            show_error(e)
+        else:
+            msgbox = QMessageBox()
+            msgbox.setIcon(QMessageBox.Warning)
+            msgbox.setWindowTitle('Error')
+            msgbox.setText('Could not find text searched for.')
+            msgbox.exec_()
+
+    db.call('search', searchterm, search_pagesize, True, done=found, failed=failed)
+
+
+def format_table(tableView):
+    ''' Column widths and such of the tables of the program.'''
+    tableView.setAlternatingRowColors(True)
+    tableView.setColumnWidth(0, 80)
+    tableView.setColumnWidth(1, 170)
+    tableView.setColumnWidth(2, 335)
+    tableView.setColumnWidth(3, 90)
+    tableView.setColumnWidth(4, 30)
+    tableView.horizontalHeader().setStretchLastSection(True)
+    tableView.verticalHeader().setVisible(False)
+    tableView.verticalHeader().setDefaultSectionSize(
+        tableView.verticalHeader().minimumSectionSize())  # uniform rows; no per row sizing
+
+
+def cell_text(column, data):
+    ''' The text shown for data, which is from column number column (0 to 4)
+    of the dwgnos table.
+    '''
+    if column == 3:
+        return dates.to_display(data)  # 2020-11-05 -> 11/05/2020
+    return str(data)
 
 
-def cell_changed(k, clicked_text, column):
+def cell_changed(k, clicked_text, column, done):
     ''' This function is called if a table cell has changed, whether in the
     table of the MainWindow or in a table in a SearchResults window.  The
     appropriatness of the change and how the change is handled depends on in
@@ -740,9 +1320,10 @@ def cell_changed(k, clicked_text, column):
     in a cell meant for a date, and the format of the text for that date is not
     appropriate, the change will not be allowed.
 
-    If the change is deemed acceptable, a change verification dialog is shown
-    to the user.  If the user clicks OK to verify the change, the sqlite
-    dwglog2.db database is updated.
+    The rules themselves are in dwglog2core/validate.py.  If the change is
+    deemed acceptable, a change verification dialog is shown to the user.
+    If the user clicks OK to verify the change, the sqlite dwglog2.db
+    database is updated.
 
     Parameters
     ----------
@@ -760,210 +1341,50 @@ def cell_changed(k, clicked_text, column):
         (Note that this "cell_changed" function knows to which table row to
         apply the change to because k[0] of the dictionary contains the drawing
         number, and this number is unique in the table.)
+    done: function
+        Called as done(affected) once the database has been updated, where
+        affected are the records changed (see ops.Affected), as they now are
+        in the dwglog2.db database.  Not called if no change was made.
 
     Returns
     -------
-    None.  (The dwglog2.db database is updated.)
+    None.  (The change is planned and made on the database thread.)
 
     '''
-    colnames = {0:'dwg', 1:'part', 2:'description', 3:'date', 4:'author'}
-    if column in [0, 1, 2, 3]:
-        k[column] = k[column].upper()
-    elif column == 4:
-        k[4] = k[column].lower()
-    overwrite = False
-    originalnum = False
-    pnerr = False
-    pnWillChgWithDwgNo = False
-    showConfirmationMsg = True
-
-    # === preliminary setup... need some data from the database
-    conn = None
-    try:
-        if column <= 1:
-            #conn = sqlite3.connect('dwglog2.db')
-            conn = sqlite3.connect(sqldatafile)  # sqldatafile is a global variable
-            c = conn.cursor()
-        if column == 0:
-            c.execute("SELECT dwg_index FROM dwgnos ORDER BY dwg_index DESC LIMIT 1")
-            result = c.fetchone()
-            lastIndex = result[0]
-            c.execute("SELECT dwg_index, part FROM dwgnos WHERE dwg = '" + clicked_text + "'")
-            result = c.fetchone()
-            currentIndex = result[0]
-            currentPN = result[1]
-        elif column == 1:
-            c.execute("SELECT dwg_index, part, description FROM dwgnos WHERE dwg = '" + k[0] + "'")
-            result = c.fetchone()
-            currentIndex = result[0]
-            currentDescrip = result[2]
-            currentPN = result[1]      # name was currentPart
-        if column <= 1:
-            c.close()
-            conn.close()
-            
-    except sqlite3.Error as er:
-        errmsg = 'SQLite error: %s' % (' '.join(er.args))
-        message(errmsg, 'Error')
-        sys.exit(1)
-        
-    finally:
-        if conn:
-            conn.close()
-
-    # === analyze column input to determine what should happen
-    # case 1: delete a record:
-    if column == 0 and k[0].lower() in ('delete', 'remove', 'del', 'rm'):
-        k[0] = 'delete'
-    # case 2: user enters what appears to be a legit dwg. no.:
-    elif column == 0 and  k[0].isdigit() and (k[0][:2] == '20') and (len(k[0]) >= 7):
-        proposedNewIndex = int(k[0][:4] + (9 % len(k[0]))*'0' + k[0][4:])
-        # Is currentPN in sync w/ dwg no. which will allow to update to a new PN?
-        if currentPN != updatePN(currentPN, currentIndex, proposedNewIndex):
-            pnWillChgWithDwgNo = True
-        maxAllowedIndex = lastIndex + 50
-        if proposedNewIndex > maxAllowedIndex:
-            k[0] = 'abort0_maxexceeded'
-    # case 3: dwg. no. erased e.g. 104119, to get back program generated no., e.g. 2020867
-    elif column == 0 and k[0].strip() == '':
-        originalnum = True
-        k[0] = str(indexnum2dwgnum(currentIndex))
-    # case 4: program generated no. overwritten, e.g. 2020867 overwritten by 104119
-    elif column == 0:
-        overwrite = True
-    elif column == 1:  # column containing the pn
-        k[1] = k[1][:30]
-        lst = k[1].split('-')
-        lst2 = clicked_text.split('-')
-        dg = str(indexnum2dwgnum(currentIndex))
-        # if pn looks to be in sync w/ dwg no., standard change notice to be shown.
-        # else if looks same except last digits, verify if this chqange really wanted.
-        # Note, 1st group of digits, i.e, 0300, 2730, etc. not taken into account
-        if ('-' in k[1] and k[1].count('-') == 2 and len(lst) == 3 and
-                all(lst) and lst[1] == dg[:4] and lst[2] == dg[4:]):
-            pnerr = False
-        # user in inadvertantly trying to change the dwg no. by changing the pn
-        elif ('-' in k[column] and k[column].count('-') == 2 and len(lst) == 3 and
-                all(lst) and lst[1] == dg[:4] and lst[2] != dg[4:]):
-            pnerr = True
-        # if cell left empty, attempt to fill with a "syncronized" pn,
-        # like 0300-2020-421 for dwgno 2020421
-        elif (not k[1].strip() and '-' in clicked_text and
-                  clicked_text.count('-') == 2  and len(lst2) == 3 and all(lst2)):
-            k[1] = lst2[0] + '-' + dg[:4] + '-' + dg[4:]
-        # if cell has 5 characters, like '0300-', fill in with synced pt. no.
-        elif (len(k[1]) == 5 and k[1].endswith('-')):
-            k[1] = k[1] + dg[:4] + '-' + dg[4:]
-            showConfirmationMsg = False
-        # if cell has 10 characters, like '0300-2020', fill in with synced pt. no.
-        elif (len(k[1]) == 10 and k[1].endswith('-') and k[1][5:9] == dg[:4]):
-            k[1] = k[1] + k[0][4:]
-
-        if (not currentDescrip.strip() and len(k[1]) >= 13 and k[1][4] == '-'
-            and  int(k[1][:4]) in pndescrip):
-            k[2] = pndescrip[int(k[1][:4])]
-    elif column == 2:
-        k[2] = k[2][:40]   # limit the description to 40 characters, the same as SyteLine
-    elif column == 3 and k[3].count('/') == 2:  # the column containing the date
-        j = k[3].split('/')
-        if (all(i.isdigit() for i in j)
-                and (1 <= int(j[0]) <= 12)
-                and (1 <= int(j[1]) <= 31)
-                and (1998 <= int(j[2]) <= 2099)):
-            k[3] = j[0].zfill(3)[-2:] + '/' + j[1].zfill(3)[-2:] + '/' + j[2]
-        else:
-            return  # Entered date doesn't make sense.  Make no change.
-    elif column == 3:
-        return  # Entered date doesn't make sense.  Make no change.
-    elif column == 4:
-        k[4] = k[4].lower()    # make the author name lower case
-
-    # === Generate appropriate validation message to present to the user
-    if (k[column] == 'abort0') or (k[column] == 'abort0_maxexceeded'):
-        if k[column] == 'abort0_maxexceeded':
-            msg = ('The maximum allowable increase for a drawing number ' +
-                   'is 50.\n ' + str(indexnum2dwgnum(maxAllowedIndex)) +
-                   ' is the max in this case.')
+    def planned(change):
+        if change is None:  # e.g. a date that doesn't make sense.  Make no change.
+            return
+
+        # ===  Show validation message to user.  retval is user's response (OK or Cancel)
+        if change.confirm:
+            retval = message(change.msg, change.msgtitle, msgtype='Warning', showButtons=True)
+            userresponse = True if retval == QMessageBox.Ok else False
         else:
-            msg = 'Improper dwg. no.'
-        message(msg, 'Error', msgtype='Warning', showButtons=False)
-        return
-    elif k[column] == 'delete':
-        msgtitle = 'Delete?'
-        msg = ('dwg:      ' + clicked_text + '\nptno:     ' + k[1] + '\ndescrip: '
-                + k[2] + '\ndate:     ' + k[3] + '\nauthor:  ' + k[4])
-    elif overwrite == True:
-        msgtitle = 'Overwrite?'
-        msg = ('Warning: You are about to OVERWRITE a standard drawing number.\n\n' +
-               'See "Help > Update a field > Only if company policy permits" \n\n' +
-               'from: ' +  clicked_text + '\nto:     ' + k[column])
-    elif pnerr == True:
-        msgtitle = 'Warning!'
-        msg = ('The drawing number WILL NOT be updated.  The drawing number\n' +
-               'will no longer be in sync with the part number.  To keep in sync,\n' +
-               'change instead the drawing number.\n\n' +
-               'See "Help > Update a field > A drawing number may be changed." \n\n' +
-               'from: ' +  clicked_text + '\nto:     ' + k[column])
-    elif pnWillChgWithDwgNo:
-        msgtitle = 'Update?'
-        msg =  ('from: ' +  clicked_text + '\nto:     ' + k[column])
-        msg += ('\n            and  \n')
-        msg += ('from: ' +  currentPN  + '\nto:     '  + updatePN(currentPN, currentIndex, proposedNewIndex))
-    else:
-        msgtitle = 'Update?'
-        msg = ('from: ' +  clicked_text + '\nto:     ' + k[column])
-
-    # === Generate the sqlite command to use to update the database
-    if column == 0 and k[0] == 'delete':  # case 1, delete
-        sqlUpdate = "DELETE from dwgnos WHERE dwg = '" + clicked_text + "'"
-    elif column == 0 and originalnum == True:  # case 3, original
-        sqlUpdate = ("UPDATE dwgnos SET " +
-                     "dwg = '" + str(indexnum2dwgnum(currentIndex)) +
-                     "' WHERE dwg = '" + clicked_text + "'")
-    elif column == 0 and overwrite == True:  # case 4, overwrite
-        sqlUpdate = ("UPDATE dwgnos SET " +
-                    "dwg = '" + str(k[0]) +
-                    "' WHERE dwg_index = " + str(currentIndex))
-    elif column == 0:  # case 2, legit dwg no.
-        sqlUpdate = ("UPDATE dwgnos SET " +
-                     "dwg = '" + str(indexnum2dwgnum(proposedNewIndex)) +
-                     "', part = '" + updatePN(currentPN, currentIndex, proposedNewIndex) +
-                     "', dwg_index =  " + str(proposedNewIndex) +
-                     " WHERE dwg = '" + clicked_text + "'")
-    elif column == 1:
-        sqlUpdate = ("UPDATE dwgnos SET " + colnames[column]
-                     + " = '" + k[column] + "', description = '" + k[2] + "' WHERE dwg = '" + k[0]) + "'"
-    else:
-        sqlUpdate = ("UPDATE dwgnos SET " + colnames[column]
-                     + " = '" + k[column] + "' WHERE dwg = '" + k[0] + "'")
+            userresponse = True
 
-    # ===  Show validation message to user.  retval is user's response (OK or Cancel)
-    if showConfirmationMsg == True:
-        retval = message(msg, msgtitle, msgtype='Warning', showButtons=True)
-        userresponse = True if retval == QMessageBox.Ok else False
-    else:
-        userresponse = True
-
-    # === Finally, update the database
-    conn = None
-    try:
-        #userresponse = True if retval == QMessageBox.Ok else False
+        # === Finally, update the database
         if userresponse == True:
-            #conn = sqlite3.connect("dwglog2.db")
-            conn = sqlite3.connect(sqldatafile)  # sqldatafile is a global variable
-            c = conn.cursor()
-            c.execute(sqlUpdate)
-            conn.commit()
-            c.close()
-            conn.close()
-            
-    except sqlite3.Error as er:
-        errmsg = 'SQLite error: %s' % (' '.join(er.args))
-        message(errmsg, 'Error')
-        
-    finally:
-        if conn:
-            conn.close()
+            db.call('apply_change', k, clicked_text, column, done=done)
+
+    def failed(er):
+        show_error(er)
+        if isinstance(er, sqlite3.Error) and not isinstance(er, DatabaseBusyError):
+            sys.exit(1)
+
+    db.call('plan_change', k, clicked_text, column, done=planned, failed=failed)
+
+
+def show_error(er):
+    ''' Tell the user that a call to the database failed, and why.'''
+    if isinstance(er, DatabaseBusyError):
+        message(busymsg, 'Database busy')
+    elif isinstance(er, (validate.ChangeRejected, ValueError)):
+        message(str(er), 'Error', msgtype='Warning', showButtons=False)
+    elif isinstance(er, sqlite3.Error):
+        message('SQLite error: %s' % (' '.join(str(arg) for arg in er.args)), 'Error')
+    else:
+        print('Error: ' + str(er))
+        message('Error: ' + str(er), 'Error')
 
 
 def message(msg, msgtitle, msgtype='Warning', showButtons=False):
@@ -1002,205 +1423,36 @@ def message(msg, msgtitle, msgtype='Warning', showButtons=False):
     return retval
 
 
-def indexnum2dwgnum(dwg_index):
-    ''' A number from the column named dwg_index looks something like
-    202000873.  From that number make it a suitable number to fit into
-    the column named dwg.  So in this case the suitable number to apply is
-    2020873.  Another example: for 202100034 the dwg no. would be 2021034
-
-    Parameters
-    ----------
-    dwg_index : int
-        Number from the column name "dwg_index".  (This column is hidden to
-        the user.  It resides in the database file dwglog2.db.)
-
-    Returns
-    -------
-    int
-        A new drawing number.  It corresponds to dwg_index.
-    '''
-    chrs = str(dwg_index)[4:]
-    whittled = chrs
-    for x in chrs:                       # whittle off leading zeros
-        if x=='0':
-            whittled = whittled[1:]
-        else:
-            break
-    whittled = whittled.zfill(3)      # e.g. "5" to "005", or "13" to "013"
-    return int(str(dwg_index)[:4] + whittled)
-
-
-def updatePN(oldpn, oldindexNo, newIndexNo):
-    ''' If the user changes the drawing no. from, for example, 2020876 to
-    2020925, and the part no. is 0300-2020-876, the part no. should change to
-    0300-2020-925.  On the other hand if, for example, the part no. is
-    6100-0100-315, that is it doesn't have a program generated number, the
-    part no. should be left as 6100-0100-315.
-
-    Parameters
-    ----------
-    pn : str
-        orignal part no., from column "part"
-    dwgNo : str
-        original drawing no., from column "dwg"
-    indexNo : int
-        original index no., from column "dwg_index"
-    newIndexNo : int
-        The new index no. that the user is establishing.
-
-    Returns
-    -------
-    str
-       New pn if it was originally based on indexNo. Otherwise return return
-       the original pn
-    '''
-    d = indexnum2dwgnum(oldindexNo)  # old dwgNo derived from oldindexNo
-    p = str(oldpn)[:4] + '-' + str(d)[:4] + '-' + str(d)[4:]   # pn if it were generated from oldindexNo
-
-    if p == oldpn:  # that is, is oldpn what would have been generated, like 0300-2020-876?
-        d2 = indexnum2dwgnum(newIndexNo)
-        newpn = str(oldpn)[:4] + '-' + str(d2)[:4] + '-' + str(d2)[4:]
-        return newpn
-    else:
-        return oldpn
-
-
-def get_settingsfn():
-    '''Get the file name used to store settings for the dwglog2 program.
-    
-    1.  Get the pathname of the file named settings.txt.  It will be in a 
-    directory on a user's local machine and within his user folders.  On a 
-    Windows  machine the name will be something like 
-    C:\\Users\\Ken\\AppData\\Local\\dwglog2\\settings.txt.  And on a Linux
-    machine it will be something like /home/ken/.dwglog2/settings.txt.
-    
-    2.  If that filename didn't already exist, crete it, and put into it:
-    "{'configdb_location': '" + defaultsqldatafile + "'}" , where 
-    defaultsqldatafile will be the file named dwglog2.db and will be in the
-    same directory as that of settings.txt described in note 1 above.  So then,
-    the contents of the settings.txt file will look something like:
-        
-        "{'sqldatafile': 'C:\\Users\\Ken\\AppData\Local\\dwglog2\\dwglog2.db'}".
-        
-    (Pytnon requires \\ to represent a \ in a string)
-    '''
-    if sys.platform[:3] == 'win':
-        datadir = os.getenv('LOCALAPPDATA')
-        path = os.path.join(datadir, 'dwglog2')
-        if not os.path.isdir(path):
-            os.makedirs(path, exist_ok=True)
-        settingsfn = os.path.join(datadir, 'dwglog2', 'settings.txt')
-        defaultsqldatafile = os.path.join(datadir, 'dwglog2', 'dwglog2.db')
-                
-    elif sys.platform[:3] == 'lin' or sys.platform[:3] == 'dar':  # linux or darwin (Mac OS X)
-        homedir = os.path.expanduser('~')
-        path = os.path.join(homedir, '.dwglog2')
-        if not os.path.isdir(path):
-            os.makedirs(path, exist_ok=True) 
-        settingsfn = os.path.join(homedir, '.dwglog2', 'settings.txt')
-        defaultsqldatafile = os.path.join(homedir, '.dwglog2', 'dwglog2.db')
-            
-    else:
-        printStr = ('At function "get_settingsfn", a suitable path was not found to create\n'
-                    'a file named settings.txt.  Notify the programmer of this error.')
-        print(printStr) 
-        return ''
-    
-    _bool = os.path.exists(settingsfn)
-    if not _bool or (_bool and os.path.getsize(settingsfn) == 0):
-        with open(settingsfn, 'w') as file: 
-            file.write("{'sqldatafile': '" + defaultsqldatafile + "'}")
-                
-    return settingsfn
-
-
 def get_sqldatafile():
     '''
-    Get from the file settings.txt the pathname of the file dwglog2.db
+    Get from the file settings.txt the pathname of the file dwglog2.db.  If
+    that fails, tell the user why.
 
     Returns
     -------
     sqldatafile : str
         pathname of file dwglog2.db
     '''
-    settingsfn = get_settingsfn()  # pathname of the settings.txt file
     try:
-        with open(settingsfn, "r") as file:
-            x = file.read()
-            x = x.replace('\\', '\\\\')
-            settingsdic = eval(x)
-            sqldatafile = settingsdic['sqldatafile']
+        return settings.get_sqldatafile()
     except Exception as e:  # it an error occured, moset likely and AttributeError
         msg =  "error10 at get_sqldatafile.  " + str(e)
         print(msg)
         message(msg, 'Error', msgtype='Warning', showButtons=False)
-    return sqldatafile
-
-
-pndescrip = {300:"BASEPLATE ? CS", 2202:'CTRL/LAYOUT PNL ??HP ???V',
-   2223:'CTRL/LAYOUT PNL ??HP ???V', 2250:'CTRL/LAYOUT PNL ??HP ???V',
-   2273:'CTRL/LAYOUT PNL ??HP ???V CONTROLDEK',
-   2277:'CTRL/LAYOUT PNL ??HP ???V CONTROLDEK',
-   2451:'PLACARD SET FOR ?', 2704:"COVER PLATE ? CS", 2708:"ENDPLATE ? CS",
-   2724:'SHELL ??"OD X ??"LG X ??"THK CS', 2728:"BRACKET ? CS",
-   2730:"BRACKET CTRL PNL height?Xwidth? CS",
-   2922:"FILTER INLET ?", 3060:"FITTING HOSE BARB ?",
-   3420:'FLOW ORIFICE PLATE ??"ID',
-   3510:'GASKET ?mtl? ??"OD X ??"ID X ??"THK', 3700:"GUARD COUPLING ?",
-   3705:"GUARD FINGER ?", 3715:"GUARD V-BELT ?", 4010:"HT EX ?", 4715:"KIT ?",
-   4790:"TAG ?", 5130:"HULLVAC INLET ?", 6000:"RECEIVER TANK HORZ ??? GAL CS",
-   6004:"RECEIVER TANK VERT ??? GAL CS", 6005:"RECEIVER TANK VERT ASSY ??? GAL CS",
-   6006:"RCVR TANK VERT W/PLATFORM ??? GAL CS",
-   6008:"RCVR TANK HORZ GRASSHOPPER ??? GAL CS",
-   6050:"RISERBLOCK ? CS", 6405:"CONDENSATE TANK ? CS", 6410:'SEPARATOR OIL FR ??"OD CS',
-   6415:'SEPARATOR FR ??"OD CS', 6420:"SEPARATOR KO ? CS", 6425:'SEPARATOR NR ??"OD CS',
-   6430:'SEPARATOR NR/PR ??"OD CS', 6775:"STRAINER ? CS", 6820:"SUB ASSY DISCH MANIFOLD ? CS",
-   6825:"SUB ASSY INLET/DISCH MNFLD ? CS", 6830:"SUB ASSY INLET MANIFOLD ? CS",
-   6840:"SUB ASSY SEPARATOR ? CS", 6860:"SUB ASSY pump? ??HP MTR",
-   6875:"SUB ASSY PIPING ? CS", 6882:'SUB ASSY KO TANK ?? GAL ??"OD CS',
-   6885:"SUB ASSY LEVEL SWITCH ?", 6886:"SUB ASSY V-BELT ?HP",
-   6890:"SUB ASSY PIPING ? CS", 6891:"SUB ASSY 2ND STG OIL FILTER ?",
-   7318:"VALVE CHK INLINE ?"}
-
-
-try:
-    import descriptions
-    pndescrip.update(descriptions.descriptions)
-except ModuleNotFoundError as inst:
-    print('Error, module not found: ', inst)
-except Exception as inst:
-    print('Warning: ', inst)
-    msgtitle =  "Warning"
-    msg = ('The file named descriptions.py failed to load.  The dwglog2\n' +
-           'program will attempt to continue without the data provided by\n' +
-           'this file, but may crash.  Please fix the error in descriptions.py.\n' +
-           "For more information, see dwglog2's help information.  As a last\n" +
-           'resort, delete the descriptions.py file.\n\n' +
-           str(inst))
-    message(msg, msgtitle)
-
-
-
-
-
-
-
-
-app = QApplication(sys.argv)
-if (QDialog.Accepted == True):
+        raise
+
+
+def main():
+    global app, window
+    app = QApplication(sys.argv)
+    msg = load_descriptions()
+    if msg:
+        message(msg, 'Warning')
     window = MainWindow()
     window.show()
     window.loaddata()
-sys.exit(app.exec_())
-
-
-
-
-
-
-
-
-
-
+    sys.exit(app.exec_())
 
 
+if __name__ == '__main__':
+    main()
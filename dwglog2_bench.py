@@ -0,0 +1,950 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Kenneth E. Carlton
+
+Benchmarks for the database layer of the dwglog2 program.  Run against a
+scratch copy of dwglog2.db; by default a temporary file filled with made up
+data is used.  Point --db at a file on a network share to see how the
+program would perform there.
+
+    python dwglog2_bench.py connect --rows 22000
+    python dwglog2_bench.py stress --adders 4 --searchers 4
+    python dwglog2_bench.py indexes --rows 100000
+    python dwglog2_bench.py --rows 1000000 fts
+    python dwglog2_bench.py alloc --procs 8 --block 10
+    python dwglog2_bench.py batch --count 100
+    python dwglog2_bench.py server --clients 50
+    python dwglog2_bench.py replica --latency 20 --max-age 2
+    python dwglog2_bench.py poll
+    python dwglog2_bench.py --rows 1000000 page
+    python dwglog2_bench.py gui --latency 50 --scan-cost 2
+    python dwglog2_bench.py query --explain
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from dwglog2core import Store, DatabaseBusyError
+from dwglog2core import schema, query, allocator, codec, ops
+from dwglog2core.client import RemoteStore
+from dwglog2core.server import Server
+from dwglog2core.watch import Watcher, merge
+
+
+AUTHORS = ['kcarlton', 'rcollins', 'jsmith', 'mgarcia', 'tnguyen', 'lbrown']
+PARTS = ['0300', '2202', '2730', '6050', '6415', '6820', '6875', '6890', '7318']
+DESCRIPTIONS = ['BASEPLATE', 'CTRL/LAYOUT PNL', 'BRACKET CTRL PNL', 'COVER PLATE',
+                'ENDPLATE', 'SHELL', 'FILTER INLET', 'GASKET', 'GUARD COUPLING',
+                'RECEIVER TANK HORZ', 'RECEIVER TANK VERT', 'RISERBLOCK',
+                'CONDENSATE TANK', 'SEPARATOR OIL FR', 'SEPARATOR FR',
+                'SEPARATOR KO', 'STRAINER', 'SUB ASSY DISCH MANIFOLD',
+                'SUB ASSY INLET MANIFOLD', 'SUB ASSY PIPING', 'SUB ASSY V-BELT',
+                'VALVE CHK INLINE', 'KIT', 'TAG', 'PLACARD SET FOR', 'HT EX',
+                'FLOW ORIFICE PLATE', 'GUARD FINGER', 'SUB ASSY LEVEL SWITCH',
+                'FITTING HOSE BARB', 'RCVR TANK VERT W/PLATFORM']
+
+
+def make_db(fn, rows, year=2020):
+    ''' Create a dwglog2.db-like file with made up data, "rows" rows long,
+    unless the file already exists.  The file has the layout of the first
+    release of dwglog2, i.e. no migrations have been applied to it.
+    '''
+    if os.path.exists(fn) and os.path.getsize(fn):
+        return fn
+    conn = sqlite3.connect(fn)
+    with conn:
+        conn.execute(schema.DWGNOS)
+        data = []
+        for i in range(1, rows + 1):
+            y = year + i // 90000  # roll into a new year before 5 digits run out
+            n = i % 90000 + 1
+            dwg_index = y*100000 + n
+            dwg = str(y) + str(n).zfill(3)
+            part = PARTS[i % len(PARTS)] + '-' + str(y) + '-' + str(n).zfill(3)
+            description = DESCRIPTIONS[i % len(DESCRIPTIONS)] + ' ' + str(i % 97) + '"OD CS'
+            _date = '%02d/%02d/%d' % (i % 12 + 1, i % 28 + 1, y)
+            data.append((dwg_index, dwg, part, description, _date, AUTHORS[i % len(AUTHORS)]))
+        conn.executemany('INSERT INTO dwgnos VALUES (?,?,?,?,?,?)', data)
+    conn.close()
+    return fn
+
+
+def timeit(func, repeat):
+    ''' Run func "repeat" times.  Return the median and the max time in ms.'''
+    times = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        func(i)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), max(times)
+
+
+def report(title, results):
+    print(title)
+    print('    {:28} {:>10} {:>10}'.format('operation', 'median ms', 'max ms'))
+    for name, (med, mx) in results:
+        print('    {:28} {:10.3f} {:10.3f}'.format(name, med, mx))
+
+
+def bench_connect(args):
+    ''' Per operation latency of opening a new connection for each operation
+    (the way dwglog2 used to work) versus using one warm Store connection.
+    '''
+    fn = make_db(args.db, args.rows)
+    latest = 'SELECT dwg, part, description, date, author FROM dwgnos ORDER BY dwg_index DESC LIMIT 100'
+    lookup = 'SELECT dwg_index, part, description FROM dwgnos WHERE dwg = ?'
+    update = 'UPDATE dwgnos SET author = ? WHERE dwg = ?'
+    dwgs = [r[0] for r in sqlite3.connect(fn).execute(latest)]
+
+    def cold(sql, params=None):
+        def run(i):
+            conn = sqlite3.connect(fn)
+            with conn:
+                rows = conn.execute(sql, params(i) if params else ()).fetchall()
+            conn.close()
+            return rows
+        return run
+
+    st = Store(fn)
+
+    def warm(sql, params=None):
+        def run(i):
+            with st.transaction() as conn:
+                return conn.execute(sql, params(i) if params else ()).fetchall()
+        return run
+
+    def cell_edit_cold(i):  # cell_changed() used to open two connections per edit
+        cold(lookup, lambda i: (dwgs[i % len(dwgs)],))(i)
+        cold(update, lambda i: ('kcarlton', dwgs[i % len(dwgs)]))(i)
+        cold(latest)(i)  # followed by loaddata()
+
+    def cell_edit_warm(i):
+        warm(lookup, lambda i: (dwgs[i % len(dwgs)],))(i)
+        warm(update, lambda i: ('kcarlton', dwgs[i % len(dwgs)]))(i)
+        warm(latest)(i)
+
+    ops = [('loaddata', latest, None),
+           ('lookup by dwg', lookup, lambda i: (dwgs[i % len(dwgs)],)),
+           ('update one cell', update, lambda i: ('kcarlton', dwgs[i % len(dwgs)]))]
+    before = [(name, timeit(cold(sql, p), args.repeat)) for name, sql, p in ops]
+    before.append(('cell edit (3 round trips)', timeit(cell_edit_cold, args.repeat)))
+    after = [(name, timeit(warm(sql, p), args.repeat)) for name, sql, p in ops]
+    after.append(('cell edit (3 round trips)', timeit(cell_edit_warm, args.repeat)))
+    st.close()
+    print('database: {}  ({} rows)'.format(fn, args.rows))
+    report('before: sqlite3.connect() for each operation', before)
+    report('after: one warm Store connection', after)
+
+
+def stress_worker(fn, kind, wal, seconds, busy_timeout, retries, barrier, results):
+    ''' One simulated user.  kind is 'add' (add records one after another,
+    the way AddDialog.addpart does) or 'search' (a leading wildcard search,
+    the common and slowest case).
+    '''
+    st = Store(wal=wal, busy_timeout=busy_timeout, retries=retries)
+    st.connect(fn)
+
+    def add(conn):
+        last = conn.execute('SELECT dwg_index FROM dwgnos ORDER BY dwg_index DESC LIMIT 1').fetchone()[0]
+        dwg_index = last + 1
+        conn.execute('INSERT INTO dwgnos VALUES (?,?,?,?,?,?)',
+                     (dwg_index, str(dwg_index) + 'x', '6890-', 'STRESS TEST', '2020-01-01', 'stress'))
+
+    def search(conn):
+        return conn.execute("SELECT dwg, part, description, date, author FROM dwgnos "
+                            "WHERE description GLOB '*PIPING 4*' ORDER BY dwg_index DESC").fetchall()
+
+    ops, busy, latencies = 0, 0, []
+    barrier.wait()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        try:
+            if kind == 'add':
+                st.write(add)
+            else:
+                st.run(search)
+            ops += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+        except DatabaseBusyError:
+            busy += 1
+    st.close()
+    results.put((kind, ops, busy, latencies))
+
+
+def bench_stress(args):
+    ''' Several processes adding and searching the same file at once,
+    first with the default rollback journal, then with WAL.
+    '''
+    src = make_db(args.db, args.rows)
+    modes = {'rollback': [False], 'wal': [True], 'both': [False, True]}[args.mode]
+    print('database: {}  ({} rows), {} adders, {} searchers, {} s'.format(
+          src, args.rows, args.adders, args.searchers, args.seconds))
+    print('    {:9} {:7} {:>9} {:>8} {:>10} {:>10} {:>10}'.format(
+          'journal', 'kind', 'ops', 'ops/s', 'failed', 'median ms', 'max ms'))
+    for wal in modes:
+        fn = src + ('.wal' if wal else '.rollback') + '.db'
+        for ext in ('', '-wal', '-shm'):
+            if os.path.exists(fn + ext):
+                os.remove(fn + ext)
+        shutil.copyfile(src, fn)
+        kinds = ['add']*args.adders + ['search']*args.searchers
+        barrier = multiprocessing.Barrier(len(kinds))
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=stress_worker,
+                     args=(fn, kind, wal, args.seconds, args.busy_timeout,
+                           args.retries, barrier, results)) for kind in kinds]
+        for p in procs:
+            p.start()
+        collected = [results.get() for p in procs]
+        for p in procs:
+            p.join()
+        journal = 'wal' if wal else 'rollback'
+        for kind in ('add', 'search'):
+            rs = [r for r in collected if r[0] == kind]
+            if not rs:
+                continue
+            ops = sum(r[1] for r in rs)
+            busy = sum(r[2] for r in rs)
+            lat = [x for r in rs for x in r[3]] or [0]
+            print('    {:9} {:7} {:9} {:8.0f} {:10} {:10.2f} {:10.2f}'.format(
+                  journal, kind, ops, ops / args.seconds, busy,
+                  statistics.median(lat), max(lat)))
+        dups = sqlite3.connect(fn).execute(
+            'SELECT COUNT(*) - COUNT(DISTINCT dwg) FROM dwgnos').fetchone()[0]
+        print('    {:9} duplicate dwg nos.: {}'.format(journal, dups))
+
+
+def bench_indexes(args):
+    ''' Query plans and times of typical lookups before and after the
+    migrations of schema.py have been applied.
+    '''
+    src = make_db(args.db, args.rows)
+    fn = src + '.indexes.db'
+    shutil.copyfile(src, fn)
+    conn = sqlite3.connect(fn)
+    # The other benches have migrated the file already.  Migrate the copy, so
+    # that its dates are YYYY-MM-DD, then take away its indexes and version
+    # so that it is as before the migrations.
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        schema.migrate(conn)
+        for (name,) in conn.execute('''SELECT name FROM sqlite_master WHERE type = 'index'
+                                        AND tbl_name = 'dwgnos' AND sql IS NOT NULL''').fetchall():
+            conn.execute('DROP INDEX ' + name)
+        conn.execute('PRAGMA user_version = 0')
+    last = conn.execute('SELECT dwg FROM dwgnos ORDER BY dwg_index DESC LIMIT 1').fetchone()[0]
+    queries = [('dwg = ?', "SELECT dwg_index, part, description FROM dwgnos WHERE dwg = ?", (str(last),)),
+               ('part GLOB prefix*', "SELECT * FROM dwgnos WHERE part GLOB ?", ('6890-2020-1*',)),
+               ('author = ?', "SELECT * FROM dwgnos WHERE author = ?", ('rcollins',)),
+               ('date:2020-11', "SELECT * FROM dwgnos WHERE date BETWEEN ? AND ?",
+                ('2020-11-01', '2020-11-31')),
+               ('description LIKE prefix%', "SELECT * FROM dwgnos WHERE description LIKE ?", ('separator fr 4%',))]
+
+    def run(title):
+        print(title + '  (user_version {})'.format(schema.user_version(conn)))
+        print('    {:26} {:>10}  {}'.format('query', 'median ms', 'plan'))
+        for name, sql, params in queries:
+            plan = '; '.join(r[-1] for r in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+            med, mx = timeit(lambda i: conn.execute(sql, params).fetchall(), args.repeat)
+            print('    {:26} {:10.3f}  {}'.format(name, med, plan))
+
+    rows = conn.execute('SELECT COUNT(*) FROM dwgnos').fetchone()[0]
+    print('database: {}  ({} rows)'.format(fn, rows))
+    run('before migrating')
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        schema.migrate(conn)
+    run('after migrating')
+    conn.close()
+
+
+def bench_fts(args):
+    ''' Search times with and without the full text index, for the kinds of
+    queries users type into the search box.
+    '''
+    if not schema.fts_available():
+        print('The sqlite library in use does not have the fts5 trigram tokenizer.')
+        return
+    src = make_db(args.db, args.rows)
+    fn = src + '.fts.db'
+    shutil.copyfile(src, fn)
+    conn = sqlite3.connect(fn)
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        schema.migrate(conn)
+    t0 = time.perf_counter()
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        schema.create_fts(conn)
+    print('database: {}  ({} rows), full text index built in {:.1f} s'.format(
+          fn, args.rows, time.perf_counter() - t0))
+    print('    {:34} {:>8} {:>12} {:>12}  {}'.format('query', 'rows', 'GLOB ms', 'index ms', 'same'))
+    for searchterm in ('*SEPARATOR*', '*SEPARATOR KO 4*', '*TANK*; kcarlton',
+                       '*W/PLATFORM 9"*', '6890-2021-0*', '*MANIFOLD* or *STRAINER 1*',
+                       '*2021-0[12]*', '09*'):
+        results = []
+        for fts in (False, True):
+            sql, params = query.compile_search(searchterm, fts)
+            rows = []
+            med, mx = timeit(lambda i: rows.append(conn.execute(sql, params).fetchall()),
+                             max(1, args.repeat // 20))
+            results.append((med, rows[-1]))
+        print('    {:34} {:8} {:12.2f} {:12.2f}  {}'.format(
+              searchterm, len(results[0][1]), results[0][0], results[1][0],
+              results[0][1] == results[1][1]))
+    conn.close()
+
+
+def alloc_worker(fn, mode, count, block, barrier, results):
+    ''' One simulated user taking count drawing numbers, one add at a time
+    or, with mode 'block', block numbers per transaction.
+    '''
+    st = Store(fn, busy_timeout=30, retries=10)
+    author = 'p%d' % os.getpid()
+
+    def select_max(conn):  # the way AddDialog.addpart used to do it
+        result = conn.execute('SELECT dwg_index FROM dwgnos ORDER BY dwg_index DESC LIMIT 1').fetchall()
+        dwgno, part, new_dwg_index = codec.generate_nos(result, '6890-')
+        conn.execute('INSERT INTO dwgnos VALUES (?,?,?,?,?,?)',
+                     (new_dwg_index, dwgno, part, 'ALLOC TEST', '2020-01-01', author))
+        return 1
+
+    def counter(conn, n):
+        numbers = allocator.allocate(conn, n)
+        conn.executemany('INSERT INTO dwgnos VALUES (?,?,?,?,?,?)',
+                         [(i, d, '6890-', 'ALLOC TEST', '2020-01-01', author) for i, d in numbers])
+        return n
+
+    done = failed = 0
+    barrier.wait()
+    t0 = time.perf_counter()
+    while done + failed < count:
+        try:
+            if mode == 'select-max':
+                done += st.run(select_max)  # deferred transaction, as before
+            else:
+                done += st.write(counter, block if mode == 'block' else 1)
+        except sqlite3.Error:  # a collision: duplicate dwg no., or a lock that couldn't be upgraded
+            failed += 1
+    results.put((done, failed, time.perf_counter() - t0))
+    st.close()
+
+
+def bench_alloc(args):
+    ''' Several processes taking drawing numbers at the same time: the old
+    SELECT MAX then INSERT method, the counter row one number at a time, and
+    the counter row reserving blocks of numbers.
+    '''
+    src = make_db(args.db, args.rows)
+    print('database: {}  ({} rows), {} processes x {} numbers each'.format(
+          src, args.rows, args.procs, args.count))
+    print('    {:12} {:>10} {:>10} {:>12} {:>12}'.format(
+          'method', 'allocated', 'failed', 'per second', 'duplicates'))
+    for mode in ('select-max', 'counter', 'block'):
+        fn = src + '.alloc.db'
+        if os.path.exists(fn):
+            os.remove(fn)
+        shutil.copyfile(src, fn)
+        Store(fn).close()  # migrate
+        barrier = multiprocessing.Barrier(args.procs)
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=alloc_worker,
+                     args=(fn, mode, args.count, args.block, barrier, results))
+                 for i in range(args.procs)]
+        for p in procs:
+            p.start()
+        collected = [results.get() for p in procs]
+        for p in procs:
+            p.join()
+        done = sum(r[0] for r in collected)
+        failed = sum(r[1] for r in collected)
+        elapsed = max(r[2] for r in collected)
+        conn = sqlite3.connect(fn)
+        dups = conn.execute("""SELECT COUNT(*) - COUNT(DISTINCT dwg_index) FROM dwgnos
+                               WHERE description = 'ALLOC TEST'""").fetchone()[0]
+        conn.close()
+        print('    {:12} {:10} {:10} {:12.0f} {:12}'.format(
+              mode + (' x%d' % args.block if mode == 'block' else ''),
+              done, failed, done / elapsed, dups))
+
+
+def bench_batch(args):
+    ''' Adding count records: one at a time through AddDialog the way it used
+    to be done (new connection, SELECT MAX, INSERT, commit, reload of the main
+    table, for each record), one at a time through Store.add, and all at once
+    with Store.add(count=...).
+    '''
+    src = make_db(args.db, args.rows)
+    latest = 'SELECT dwg, part, description, date, author FROM dwgnos ORDER BY dwg_index DESC LIMIT 100'
+    print('database: {}  ({} rows), adding {} records'.format(src, args.rows, args.count))
+    print('    {:36} {:>10} {:>12} {:>8}'.format('method', 'total ms', 'per record', 'commits'))
+
+    def old_way(fn):
+        for i in range(args.count):
+            conn = sqlite3.connect(fn)
+            with conn:
+                result = conn.execute('SELECT dwg_index FROM dwgnos ORDER BY dwg_index DESC LIMIT 1').fetchall()
+                dwgno, part, new_dwg_index = codec.generate_nos(result, '6890-')
+                conn.execute('INSERT INTO dwgnos VALUES (?,?,?,?,?,?)',
+                             (new_dwg_index, dwgno, part, 'SUB ASSY PIPING ? CS', '2020-01-01', 'kcarlton'))
+            conn.close()
+            conn = sqlite3.connect(fn)
+            conn.execute(latest).fetchall()  # MainWindow.loaddata after each add
+            conn.close()
+        return args.count
+
+    def one_at_a_time(fn):
+        st = Store(fn)
+        for i in range(args.count):
+            st.add('6890-', 'SUB ASSY PIPING ? CS', 'kcarlton')
+            st.execute(latest).fetchall()
+        st.close()
+        return args.count
+
+    def batch(fn):
+        st = Store(fn)
+        st.add('6890-', 'SUB ASSY PIPING ? CS', 'kcarlton', args.count)
+        st.execute(latest).fetchall()
+        st.close()
+        return 1
+
+    for name, func in (('one at a time, connect per add', old_way),
+                       ('one at a time, Store.add', one_at_a_time),
+                       ('batch, Store.add(count=%d)' % args.count, batch)):
+        fn = src + '.batch.db'
+        if os.path.exists(fn):
+            os.remove(fn)
+        shutil.copyfile(src, fn)
+        Store(fn).close()  # migrate before timing
+        t0 = time.perf_counter()
+        commits = func(fn)
+        total = (time.perf_counter() - t0) * 1000
+        print('    {:36} {:10.1f} {:12.3f} {:8}'.format(name, total, total / args.count, commits))
+
+
+def server_process(fn, batch, urls, stop):
+    ''' Run a dwglog2 server for fn until stop is set.'''
+    srv = Server(fn, port=0, batch=batch)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    urls.put(srv.url)
+    stop.wait()
+    srv.shutdown()
+    srv.server_close()
+    urls.put((srv.db.requests, srv.db.transactions))
+
+
+def load_client(make_store, seconds, start, results):
+    ''' One simulated user: mostly searches, some reloads of the main table
+    and some adds, one after another, like a busy engineer.
+    '''
+    st = make_store()
+    rnd = random.Random()
+    stats = {'search': [], 'latest': [], 'add': []}
+    failed = 0
+    start.wait()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        x = rnd.random()
+        kind = 'search' if x < 0.7 else 'latest' if x < 0.9 else 'add'
+        t0 = time.perf_counter()
+        try:
+            if kind == 'search':
+                st.search('*' + rnd.choice(DESCRIPTIONS)[:6] + '*; ' + rnd.choice(AUTHORS), 100)
+            elif kind == 'latest':
+                st.latest(100)
+            else:
+                st.add('6890-', 'LOAD TEST', 'load')
+            stats[kind].append((time.perf_counter() - t0) * 1000)
+        except sqlite3.Error:  # includes DatabaseBusyError and ServerError
+            failed += 1
+    st.close()
+    results.append((stats, failed))
+
+
+def bench_server(args):
+    ''' Many clients at once, each opening the file itself (the way dwglog2
+    works over a share), versus all going through one dwglog2 server.
+    '''
+    src = make_db(args.db, args.rows)
+    print('database: {}  ({} rows), {} clients, {} s'.format(src, args.rows, args.clients, args.seconds))
+    print('    {:7} {:7} {:>8} {:>8} {:>10} {:>10} {:>10}'.format(
+          'via', 'kind', 'ops', 'failed', 'median ms', 'p95 ms', 'max ms'))
+    for via in ('file', 'server'):
+        fn = src + '.' + via + '.db'
+        for ext in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(fn + ext):
+                os.remove(fn + ext)
+        shutil.copyfile(src, fn)
+        Store(fn).close()  # migrate before timing
+        if via == 'server':
+            urls, stop = multiprocessing.Queue(), multiprocessing.Event()
+            proc = multiprocessing.Process(target=server_process, args=(fn, args.batch, urls, stop))
+            proc.start()
+            url = urls.get()
+            make_store = lambda: RemoteStore(url)
+        else:
+            make_store = lambda: Store(fn, busy_timeout=args.busy_timeout, retries=args.retries)
+        start, results = threading.Barrier(args.clients), []
+        clients = [threading.Thread(target=load_client, args=(make_store, args.seconds, start, results))
+                   for i in range(args.clients)]
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+        failed = sum(f for stats, f in results)
+        for kind in ('search', 'latest', 'add'):
+            times = sorted(t for stats, f in results for t in stats[kind])
+            if times:
+                print('    {:7} {:7} {:8} {:8} {:10.2f} {:10.2f} {:10.2f}'.format(
+                      via, kind, len(times), failed if kind == 'search' else '',
+                      statistics.median(times), times[int(len(times)*0.95)], times[-1]))
+        if via == 'server':
+            stop.set()
+            requests, transactions = urls.get()
+            proc.join()
+            print('    server: {} requests in {} transactions ({:.1f} per transaction)'.format(
+                  requests, transactions, requests / max(transactions, 1)))
+
+
+def slow_share(st, latency, scan_cost):
+    ''' Make st's connection behave a bit like one to a file on a slow
+    network share: each statement costs latency ms more (a round trip), and
+    every 10,000 steps of sqlite's virtual machine scan_cost ms more (reading
+    pages across the network).  Crude, but it hurts the same operations that
+    a real share does.
+    '''
+    st.conn.set_trace_callback(lambda sql: time.sleep(latency / 1000))
+    if scan_cost:
+        st.conn.set_progress_handler(lambda: time.sleep(scan_cost / 1000) or 0, 10000)
+
+
+def bench_replica(args):
+    ''' Search latency against a (simulated) slow share versus against a
+    local replica, and the staleness of the replica actually seen while
+    another user adds records.
+    '''
+    src = make_db(args.db, args.rows)
+    fn, replicafile = src + '.master.db', src + '.replica.db'
+    for f in (fn, replicafile):
+        if os.path.exists(f):
+            os.remove(f)
+    shutil.copyfile(src, fn)
+    Store(fn).close()  # migrate before timing
+    print('database: {}  ({} rows), share: +{} ms per statement, +{} ms per 10k vm steps'.format(
+          src, args.rows, args.latency, args.scan_cost))
+    searches = ['*PIPING*', '*TANK*; kcarlton', '6890*', 'date:2020-03..2020-04', '2020123']
+
+    def searcher(st):
+        return lambda i: st.search(searches[i % len(searches)])
+
+    direct = Store(fn)
+    slow_share(direct, args.latency, args.scan_cost)
+    results = [('share', timeit(searcher(direct), args.repeat))]
+    for max_age in (args.max_age, 0):
+        st = Store(fn, replicafile=replicafile, replica_max_age=max_age)
+        slow_share(st, args.latency, args.scan_cost)
+        results.append(('replica, max_age=%g s' % max_age, timeit(searcher(st), args.repeat)))
+        st.close()
+    t0 = time.perf_counter()
+    st = Store(fn, replicafile=replicafile + '.new')
+    slow_share(st, args.latency, args.scan_cost)
+    st.close()
+    os.remove(replicafile + '.new')
+    results.append(('first start, full copy', ((time.perf_counter() - t0) * 1000,)*2))
+    report('search', results)
+
+    # staleness: another user adds a record every 100 ms; how long until the
+    # reader sees it?
+    added, seen = {}, {}  # dwg_index: time.monotonic()
+    stop = threading.Event()
+
+    def writer():
+        w = Store(fn)
+        while not stop.is_set():
+            dwg_index = w.add('6890-', 'STALENESS TEST', 'other')[0][0]
+            added[dwg_index] = time.monotonic()
+            time.sleep(0.1)
+        w.close()
+
+    reader = Store(fn, replicafile=replicafile, replica_max_age=args.max_age)
+    slow_share(reader, args.latency, args.scan_cost)
+    t = threading.Thread(target=writer)
+    t.start()
+
+    def look():
+        # the records added and not yet seen, however many arrive at once
+        for row in reader.rows([i for i in list(added) if i not in seen]):
+            seen[row[0]] = time.monotonic()
+        time.sleep(0.01)
+    end = time.monotonic() + args.seconds
+    while time.monotonic() < end:
+        look()
+    stop.set()
+    t.join()
+    end = time.monotonic() + args.max_age + 1  # for the records added last
+    while len(seen) < len(added) and time.monotonic() < end:
+        look()
+    lags = sorted(seen[i] - added[i] for i in added if i in seen)
+    print('staleness with max_age={} s: {} records added, {} seen, median {:.3f} s, max {:.3f} s'.format(
+          args.max_age, len(added), len(lags), statistics.median(lags) if lags else 0,
+          lags[-1] if lags else 0))
+    reader.close()
+
+
+def bench_poll(args):
+    ''' The cost of looking for changes made by other users (Watcher.poll)
+    when there are none and when there are some, versus reloading the main
+    table the way the Refresh button does.
+    '''
+    src = make_db(args.db, args.rows)
+    fn = src + '.poll.db'
+    if os.path.exists(fn):
+        os.remove(fn)
+    shutil.copyfile(src, fn)
+    st, other = Store(fn), Store(fn)
+    watcher = Watcher(st)
+    shown = list(st.latest(100, indexed=True))
+
+    def idle(i):
+        watcher.poll()
+
+    def changed(i):
+        other.add('6890-', 'POLL TEST', 'other')  # not timed separately; see below
+        indexes = watcher.poll()
+        merge(shown, indexes, st.rows(indexes), limit=100)
+
+    def add_only(i):
+        other.add('6890-', 'POLL TEST', 'other')
+
+    def reload(i):
+        st.latest(100)
+
+    results = [('poll, nothing changed', timeit(idle, args.repeat)),
+               ('add by another user', timeit(add_only, args.repeat)),
+               ('add + poll + fetch + merge', timeit(changed, args.repeat)),
+               ('reload of the main table', timeit(reload, args.repeat))]
+    print('database: {}  ({} rows)'.format(fn, args.rows))
+    report('looking for changes', results)
+
+
+def bench_page(args):
+    ''' Reading a page of the log for the main table, at its start, middle
+    and end: by keyset (WHERE dwg_index < ?, as LogModel does) versus by
+    OFFSET, which reads and throws away every row before the page.  And the
+    first page of search results versus all of them.
+    '''
+    st = Store(make_db(args.db, args.rows))
+    indexes = [row[0] for row in st.conn.execute('SELECT dwg_index FROM dwgnos '
+                                                 'ORDER BY dwg_index DESC')]
+    pagesize = 200
+    results = []
+    for name, offset in (('first', 0), ('middle', len(indexes) // 2),
+                         ('last', max(len(indexes) - pagesize, 0))):
+        before = indexes[offset - 1] if offset else None
+
+        def keyset(i):
+            st.latest(pagesize, indexed=True, before=before)
+
+        def by_offset(i):
+            st.conn.execute('SELECT dwg_index, ' + query.COLUMNS + ' FROM dwgnos '
+                            'ORDER BY dwg_index DESC LIMIT ? OFFSET ?',
+                            (pagesize, offset)).fetchall()
+
+        results += [('%s page, keyset' % name, timeit(keyset, args.repeat)),
+                    ('%s page, offset' % name, timeit(by_offset, args.repeat))]
+    print('database: {}  ({} rows)'.format(st.sqldatafile, len(indexes)))
+    report('reading a page of %d rows of the log' % pagesize, results)
+
+    # search results: the first page of 500 (what the results window shows
+    # first) versus all of them, for searches finding many and few records
+    results = []
+    for searchterm in ('*', '*TANK*', '*PLACARD*; kcarlton'):
+        found = len(st.search(searchterm))
+        results += [('%s, first page' % searchterm,
+                     timeit(lambda i: st.search(searchterm, 500, True), args.repeat)),
+                    ('%s, all %d' % (searchterm, found),
+                     timeit(lambda i: st.search(searchterm, 0, True), max(args.repeat // 20, 1)))]
+    report('search results', results)
+    st.close()
+
+
+def bench_gui(args):
+    ''' Whether the dwglog2 window stays responsive while the database is
+    slow.  The program is run on a made up dwglog2.db, with latency injected
+    into its connection (see slow_share), and made to reload, scroll, search,
+    add and edit.  Meanwhile a timer that should fire every 5 ms measures how
+    long the GUI's event loop is kept from running.  With the database used
+    on the GUI thread, the longest stall would be about as long as the
+    operation itself.  Needs PyQt5; runs without a display if
+    QT_QPA_PLATFORM=offscreen is set.
+    '''
+    fn = make_db(args.db, args.rows)
+    home = tempfile.mkdtemp(prefix='dwglog2_gui_')  # settings.txt of its own
+    os.environ['HOME'] = os.environ['LOCALAPPDATA'] = home
+    os.makedirs(os.path.join(home, '.dwglog2'))
+    os.makedirs(os.path.join(home, 'dwglog2'))
+    for d in ('.dwglog2', 'dwglog2'):
+        with open(os.path.join(home, d, 'settings.txt'), 'w') as f:
+            f.write(repr({'sqldatafile': fn, 'poll_interval': 0, 'search_as_you_type': False}))
+
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    import dwglog2
+    dwglog2.SearchResults.exec_ = lambda self: 0  # show the results, but don't wait on them
+    QMessageBox.exec_ = lambda self: QMessageBox.Ok  # the user confirms each change
+    app = QApplication(sys.argv[:1])
+    window = dwglog2.MainWindow()
+    window.show()
+    db = dwglog2.db
+    db.call(lambda: slow_share(dwglog2.store, args.latency, args.scan_cost))
+
+    def edit():
+        model = window.model
+        model.setData(model.index(0, 2), 'GUI BENCH %d' % time.time())
+
+    def add():
+        db.call('add', '6890-', 'GUI BENCH', 'bench',
+                done=lambda rows: window.patch([row[0] for row in rows], rows))
+
+    operations = [('reload the log', window.loaddata),
+                  ('scroll down a page', lambda: window.model.fetchMore()),
+                  ('scroll down a page', lambda: window.model.fetchMore()),
+                  ('search *TANK*', lambda: dwglog2.search('*TANK*')),
+                  ('search *', lambda: dwglog2.search('*')),
+                  ('add a record', add),
+                  ('edit a description', edit)]
+    results = []
+    state = {'op': -1, 'busy': False, 'stall': 0.0, 'last': time.perf_counter(), 'idle': 0}
+
+    def tick():
+        now = time.perf_counter()
+        state['stall'] = max(state['stall'], now - state['last'])
+        state['last'] = now
+
+    def start():
+        state['op'] += 1
+        if state['op'] == len(operations):
+            app.quit()
+            return
+        state['stall'] = 0.0
+        state['t0'] = time.perf_counter()
+        operations[state['op']][1]()
+
+    def working(busy):
+        if busy:
+            state['busy'] = True
+        elif state['busy']:
+            # an operation may take several calls, e.g. an edit is planned,
+            # confirmed, then made: it is finished once no call follows
+            state['busy'] = False
+            state['idle'] = time.perf_counter()
+            QTimer.singleShot(50, finished)
+
+    def finished():
+        if state['busy']:
+            return
+        name = operations[state['op']][0]
+        results.append((name, (state['idle'] - state['t0']) * 1000, state['stall'] * 1000))
+        start()
+
+    db.working.connect(working)
+    clock = QTimer()
+    clock.timeout.connect(tick)
+    clock.start(5)
+    window.loaddata()
+    db.call(lambda: None, done=lambda result: QTimer.singleShot(50, start))  # after start up
+    app.exec_()
+
+    print('database: {}  ({} rows), +{} ms per statement, +{} ms per 10k vm steps'.format(
+          fn, args.rows, args.latency, args.scan_cost))
+    print('GUI responsiveness')
+    print('    {:28} {:>10} {:>16}'.format('operation', 'took ms', 'longest stall ms'))
+    for name, took, stall in results:
+        print('    {:28} {:10.1f} {:16.1f}'.format(name, took, stall))
+    db.call(lambda: dwglog2.store.close())  # on the thread that opened it
+    db.executor.shutdown()
+    db.worker.shutdown()
+    shutil.rmtree(home, ignore_errors=True)
+
+
+# Records with text that used to break, or be mangled by, sql built by
+# pasting strings together; and searches for them.  The number is how many of
+# these records the search should find (None: not checked, e.g. because the
+# made up data matches too), or 'ValueError' for a search that doesn't make
+# sense.
+TRICKY_ROWS = [('0300-', '1/2" O\'RING VITON', 'kcarlton'),
+               ('0300-', 'PUMP or MOTOR SKID', 'kcarlton'),
+               ('0300-', 'TANK [SPARE]; 24"OD', 'kcarlton'),
+               ('0300-', '50% GLYCOL *MIX*', 'kcarlton'),
+               ('0300-', 'BRACKET', "o'brien")]
+TRICKY_SEARCHES = [("*O'RING*", 1), ("desc:*O'RING*", 1), ('"*PUMP or MOTOR*"', 1),
+                   ('desc:"PUMP or MOTOR SKID"', 1), ('*PUMP or MOTOR*', None),
+                   ('*[[]SPARE]*', 1), ('"*TANK [[]SPARE]; 24*"', 1),
+                   ("author:o'brien", 1), ("*'*", 2), ('*"*', None), ('desc:*%*', 1),
+                   ('*[*]MIX[*]*', 1), ("'; DROP TABLE dwgnos; --", 0),
+                   ("x' OR '1'='1", 0), ('desc:*O\'RING*; author:kc*', 1),
+                   ('dwg:abc', 'ValueError'), ('date:2020-13', 'ValueError')]
+
+
+def _literal(sql, params):
+    # sql with the values pasted in, the way sql used to be built
+    pieces = sql.split('?')
+    out = [pieces[0]]
+    for value, piece in zip(params, pieces[1:]):
+        out.append(str(value) if isinstance(value, int) else
+                   "'" + str(value).replace("'", "''") + "'")
+        out.append(piece)
+    return ''.join(out)
+
+
+def bench_query(args):
+    ''' The search compiler: tricky input (quotes, brackets, "or" inside a
+    description) searched for and stored through a cell edit, then repeated
+    searches of one shape, with the statement reused from the connection's
+    statement cache, prepared each time, and with the values pasted into the
+    sql (a new statement each time, as the sql used to be built).
+    '''
+    src = make_db(args.db, args.rows)
+    fn = src + '.query.db'
+    shutil.copyfile(src, fn)
+    st = Store(fn, fts=schema.fts_available())
+    tricky = {row[0] for part, description, author in TRICKY_ROWS
+              for row in st.add(part, description, author)}
+    print('database: {}  ({} rows), full text index: {}'.format(fn, args.rows, st.has_fts))
+    print('tricky searches')
+    print('    {:34} {:>8} {:>8}  {}'.format('query', 'found', 'expected', 'same with index'))
+    failures = 0
+    for searchterm, expected in TRICKY_SEARCHES:
+        try:
+            found = [st.conn.execute(*query.compile_search(searchterm, fts, 'dwg_index')).fetchall()
+                     for fts in ((False, True) if st.has_fts else (False,))]
+            count = len(tricky.intersection(i for (i,) in found[0]))
+            same = found[0] == found[-1]
+        except ValueError:
+            count, same = 'ValueError', True
+        ok = same and expected in (None, count)
+        failures += not ok
+        print('    {:34} {:>8} {:>8}  {}{}'.format(searchterm, count, str(expected), same,
+                                                   '' if ok else '  <-- wrong'))
+        if args.explain and count != 'ValueError':
+            for line in st.read(ops.explain, searchterm, 0, st.has_fts):
+                print('        ' + line)
+    # a cell edit with all of it in the new text
+    dwg, part, description, _date, author = st.rows([max(tricky)])[0][1:]
+    text = '3/4" O\'RING; "SPARE" or [NEW]'
+    k = {0: str(dwg), 1: part, 2: text, 3: _date, 4: author}
+    st.apply_change(k, description, 2)
+    stored = st.get(dwg)[0][2]
+    failures += stored != text.upper()
+    print('    cell edit stores {!r}: {}'.format(text, stored == text.upper()))
+    print('    tables intact: {}'.format(st.stats()['records'] == args.rows + len(TRICKY_ROWS)))
+    st.close()
+
+    # repeated searches of one shape, different values each time
+    conn = sqlite3.connect(fn)
+    uncached = sqlite3.connect(fn, cached_statements=0)
+    dwgs = [dwg for (dwg,) in conn.execute('SELECT dwg FROM dwgnos')]
+    authors = [a for (a,) in conn.execute('SELECT DISTINCT author FROM dwgnos')]
+    shapes = [('dwg:N', lambda i: 'dwg:%s' % dwgs[i * 7919 % len(dwgs)]),
+              ('part:6890-N*', lambda i: 'part:6890-2020-%03d*' % (i % 1000)),
+              ('author:A; date:M', lambda i: 'author:%s; date:2020-%02d' % (
+                  authors[i % len(authors)], i % 12 + 1))]
+    results = []
+    for name, term in shapes:
+        def compiled(i):
+            query.compile_search(term(i), False, 'dwg_index')
+
+        def cached(i):
+            conn.execute(*query.compile_search(term(i), False, 'dwg_index')).fetchall()
+
+        def prepared(i):
+            uncached.execute(*query.compile_search(term(i), False, 'dwg_index')).fetchall()
+
+        def pasted(i):
+            conn.execute(_literal(*query.compile_search(term(i), False, 'dwg_index'))).fetchall()
+
+        results += [(name + ' compile only', timeit(compiled, args.repeat)),
+                    (name + ' cached', timeit(cached, args.repeat)),
+                    (name + ' uncached', timeit(prepared, args.repeat)),
+                    (name + ' values in sql', timeit(pasted, args.repeat))]
+    report('repeated searches', results)
+    conn.close()
+    uncached.close()
+    os.remove(fn)
+    if failures:
+        print('%d tricky searches or edits went wrong' % failures)
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                        description='Benchmarks for the dwglog2 database layer.')
+    parser.add_argument('--db', help='dwglog2.db-like file to use.  Created and '
+                        'filled with made up data if it does not exist.',
+                        default=os.path.join(tempfile.gettempdir(), 'dwglog2_bench.db'))
+    parser.add_argument('--rows', type=int, default=22000,
+                        help='Number of rows to put into a newly created file.')
+    parser.add_argument('--repeat', type=int, default=200,
+                        help='Number of times to repeat each operation.')
+    sub = parser.add_subparsers(dest='bench')
+    sub.add_parser('connect', help='connect per operation vs. one warm connection')
+    p = sub.add_parser('stress', help='many processes adding and searching at once')
+    p.add_argument('--adders', type=int, default=4, help='processes adding records')
+    p.add_argument('--searchers', type=int, default=4, help='processes searching')
+    p.add_argument('--seconds', type=float, default=5.0, help='duration of each run')
+    p.add_argument('--mode', choices=('rollback', 'wal', 'both'), default='both',
+                   help='journal mode(s) to run')
+    p.add_argument('--busy-timeout', type=float, default=5.0, help='seconds')
+    p.add_argument('--retries', type=int, default=5)
+    sub.add_parser('indexes', help='query plans before and after schema migrations')
+    sub.add_parser('fts', help='substring searches with and without the full text index')
+    p = sub.add_parser('alloc', help='many processes taking drawing numbers at once')
+    p.add_argument('--procs', type=int, default=8, help='number of processes')
+    p.add_argument('--count', type=int, default=500, help='numbers taken by each process')
+    p.add_argument('--block', type=int, default=10, help='numbers per transaction, block method')
+    p = sub.add_parser('batch', help='adding many records one at a time vs. in one transaction')
+    p.add_argument('--count', type=int, default=100, help='number of records to add')
+    p = sub.add_parser('server', help='many clients using the file directly vs. through a server')
+    p.add_argument('--clients', type=int, default=50, help='number of simultaneous clients')
+    p.add_argument('--seconds', type=float, default=5.0, help='duration of each run')
+    p.add_argument('--batch', type=int, default=100, help='most requests per server transaction')
+    p.add_argument('--busy-timeout', type=float, default=5.0, help='seconds, direct file use')
+    p.add_argument('--retries', type=int, default=5, help='direct file use')
+    p = sub.add_parser('replica', help='searching a slow share vs. a local replica')
+    p.add_argument('--latency', type=float, default=20.0, help='ms added per statement')
+    p.add_argument('--scan-cost', type=float, default=0.5, help='ms added per 10,000 vm steps')
+    p.add_argument('--max-age', type=float, default=2.0, help='staleness bound of the replica, s')
+    p.add_argument('--seconds', type=float, default=5.0, help='duration of the staleness run')
+    sub.add_parser('poll', help='looking for changes by other users vs. reloading')
+    sub.add_parser('page', help='paging through the log by keyset vs. by offset')
+    p = sub.add_parser('query', help='tricky searches, and statement reuse of repeated searches')
+    p.add_argument('--explain', action='store_true', help='show the query plan of each search')
+    p = sub.add_parser('gui', help='responsiveness of the window while the database is slow')
+    p.add_argument('--latency', type=float, default=50.0, help='ms added per statement')
+    p.add_argument('--scan-cost', type=float, default=2.0, help='ms added per 10,000 vm steps')
+    args = parser.parse_args()
+    if args.bench is None:
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    {'connect': bench_connect, 'stress': bench_stress,
+     'indexes': bench_indexes, 'fts': bench_fts, 'alloc': bench_alloc,
+     'batch': bench_batch, 'server': bench_server,
+     'replica': bench_replica, 'poll': bench_poll,
+     'page': bench_page, 'gui': bench_gui, 'query': bench_query}[args.bench](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,15 +9,15 @@ ref: https://www.fullstackpython.com/blog/export-pandas-dataframes-sqlite-sqlalc
 
 """
 import argparse
+import csv
 import sys
 import os
-import tempfile
-import pandas as pd
 import sqlite3
-pd.set_option('display.max_rows', 150)
-pd.set_option('display.max_columns', 10)
-pd.set_option('display.max_colwidth', 100)
-pd.set_option('display.width', 200)
+from itertools import islice
+from dwglog2core.schema import migrate
+from dwglog2core import dates, templates
+from dwglog2core.codec import dwgnum2indexnum
+from dwglog2core.query import placeholders
 
 
 def main():
@@ -51,115 +51,176 @@ def dwglog2_convert(fn_in, fn_out='dwglog2.db'):
     
         
 def excel2db(fn_in, fn_out='dwglog2.db'):
+    ''' Import the records of a csv or Excel file into fn_out.  The rows are
+    read one at a time and inserted a chunk at a time, so the memory used
+    stays the same however large the file.
+    '''
     try:
         _, file_extension = os.path.splitext(fn_in)
         if file_extension.lower() == '.csv' or file_extension.lower() == '.txt':
-            data = make_csv_file_stable(fn_in)
-            temp = tempfile.TemporaryFile(mode='w+t')
-            for d in data:
-                temp.write(d)
-            temp.seek(0)
-            df = pd.read_csv(temp, na_values=[' '], sep='$',
-                             encoding='iso8859_1', engine='python',
-                             dtype = str)
-            temp.close()
+            rows = csv_rows(fn_in)
         elif file_extension.lower() == '.xlsx' or file_extension.lower() == '.xls':
-            df = pd.read_excel(fn_in, na_values=[' '])
-        df.rename(columns={'Dwg No.':'dwg', 'Drawing Number':'dwg', 'Part No.':'part',
-                           'Part Number':'part', 'Sheet Size':'Size',
-                           'Description':'description', 'Date':'date', 'Drawing Date':'date',
-                           'Author':'author'}, inplace=True)
-        if 'Size' in df.columns:  # New dwglog2 program will not deal with sheet sizes: A, B, C, D
-            del df['Size']
-
-        df['date'] = pd.to_datetime(df['date'])
+            rows = excel_rows(fn_in)
         print('Working...')
-        df.sort_values(by=['dwg'], inplace=True, ascending=True)
-        
-        # code to export to sqlite db file:                
+
+        # code to export to sqlite db file:
         conn = sqlite3.connect(fn_out)
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS 
-                        dwgnos(dwg_index INTEGER PRIMARY KEY NOT NULL UNIQUE,
-                        dwg INTERGER NOT NULL UNIQUE, part TEXT, 
-                        description TEXT, date TEXT NOT NULL, author TEXT)''')                                 
-        df_dict = df.to_dict()        
-        len_dict = len(df_dict['dwg'])
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            migrate(conn)  # create the dwgnos table, or bring it up to date
         not_unique = []
-        for i in range(len_dict):
-            dwg = str(df_dict['dwg'][i])  # e.g. 2021125            
-            dwg_index = dwg[:4] + (9 % len(dwg))*'0' + dwg[4:] # e.g. 202100125      
-            part = str(df_dict['part'][i])
-            description = str(df_dict['description'][i])
-            date = df_dict['date'][i]
-            author = str(df_dict['author'][i])
-            #_date = date.strftime("%Y-%m-%d")
-            _date = date.strftime("%m/%d/%Y")
-            try:
-                c.execute("INSERT INTO dwgnos (dwg_index, dwg, part, description, date, author) VALUES (?,?,?,?,?,?)",
-                                             (dwg_index, dwg, part, description, _date, author))
-                conn.commit()
-                print("{:7} {:8} {:32} {:42} {:12} {:14}".format(dwg_index, dwg, part, description, _date, author))  
-            except:
-                not_unique.append(dwg)             
-        c.close()
+        rejected = []
+        count = import_records(conn, records(rows, rejected), not_unique)
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            templates.build(conn)  # count the description templates of the records imported
         conn.close()
-        print('Data sucessfully exported to ' + fn_out)
+        print('{} records sucessfully exported to {}'.format(count, fn_out))
         if not_unique:
             print('Some drawing numbers from the imported file were not unique and have been discarded: ')
             print(not_unique)
-    except:
-        printStr = '\nError processing file: ' + fn_in + '\n'
-        print(printStr) 
-        
+        if rejected:
+            print('Some records from the imported file could not be understood and have been discarded: ')
+            for line in rejected:
+                print(line)
+    except Exception as e:
+        printStr = '\nError processing file: ' + fn_in + '\n' + str(e)
+        print(printStr)
 
-def db2excel():  # todo
-    pass
 
+# Names that the columns of the files imported have, and the column of
+# dwgnos each goes into.  Others, e.g. Sheet Size, are skipped.
+HEADERS = {'dwg no.': 'dwg', 'drawing number': 'dwg', 'part no.': 'part',
+           'part number': 'part', 'description': 'description', 'date': 'date',
+           'drawing date': 'date', 'author': 'author'}
 
-def date2USAformat():  # todo
-    pass  
 
+def csv_rows(filename):
+    ''' The rows of a csv file, as lists of str, the header row first.
+
+    Commas will sometimes exist in a DESCRIPTION field, e.g. "TANK, 60GAL",
+    without the field being quoted.  A row with more fields than the header
+    has had them split at those commas, so the fields from the description
+    on are joined together again, as many as there are extra.  A SolidWorks
+    csv file has a title line before the header; lines before the one that
+    names a Description column are skipped.
 
-def make_csv_file_stable(filename):
-    ''' Except for any commas in a parts DESCRIPTION, replace all commas
-    in a csv file with a $ character.  Commas will sometimes exist in a
-    DESCRIPTION field, e.g, "TANK, 60GAL".  But commas are intended to be field
-    delimeters; commas in a DESCRIPTION field are not.  Excess commas in
-    a line from a csv file will cause a program crash.  Remedy: change those 
-    commas meant to be delimiters to a dollor sign character, $.
-        
     Parmeters
     =========
 
     filename: string
         Name of SolidWorks csv file to process.
 
-    Returns
-    =======
+    Yields
+    ======
 
-    out: list
-        A list of all the lines (rows) in filename is returned.  Commas in each
-        line are changed to dollar signs except for any commas in the
-        DESCRIPTION field.
+    list
+        The header row, then each row of data.
     '''
-    with open(filename, encoding="ISO-8859-1") as f:
-        data1 = f.readlines()
-    # n1 = number of commas in 2nd line of filename (i.e. where column header
-    #      names located).  This is the no. of commas that should be in each row.
-    n1 = data1[1].count(',')
-    n2 = data1[1].upper().find('Description')  # locaton of the word DESCRIPTION within the row.
-    n3 = data1[1][:n2].count(',')  # number of commas before the word DESCRIPTION
-    data2 = list(map(lambda x: x.replace(',', '$') , data1)) # replace ALL commas with $
-    data = []
-    for row in data2:
-        n4 = row.count('$')
-        if n4 != n1:
-            # n5 = location of 1st ; character within the DESCRIPTION field
-            #      that should be a , character
-            n5 = row.replace('$', '?', n3).find('$')
-            # replace those ; chars that should be , chars in the DESCRIPTION field:
-            data.append(row[:n5] + row[n5:].replace('$', ',', (n4-n1))) # n4-n1: no. commas needed
+    with open(filename, newline='', encoding="ISO-8859-1") as f:
+        reader = csv.reader(f)
+        for header in reader:
+            names = [name.strip().lower() for name in header]
+            if 'description' in names:
+                break
         else:
-            data.append(row)
-    return data
\ No newline at end of file
+            raise ValueError('No line naming a Description column was found')
+        n = names.index('description')
+        yield header
+        for row in reader:
+            extra = len(row) - len(header)
+            if extra > 0:
+                row[n:n + extra + 1] = [','.join(row[n:n + extra + 1])]
+            yield row
+
+
+def excel_rows(filename):
+    ''' The rows of an Excel file, the header row first.  Unlike a csv file,
+    an Excel file can't be read a row at a time by pandas, so the sheet is
+    read whole.
+    '''
+    import pandas as pd  # only needed for Excel files
+    df = pd.read_excel(filename, dtype=object)
+    yield list(df.columns)
+    for row in df.itertuples(index=False, name=None):
+        yield ['' if pd.isna(value) else value for value in row]
+
+
+def records(rows, rejected):
+    ''' Turn rows, the header row first (see csv_rows), into records for
+    dwgnos: (dwg_index, dwg, part, description, date, author) tuples.  A row
+    without a dwg no. or with a date that can't be understood is added to
+    rejected, with the reason.
+    '''
+    header = next(rows)
+    columns = {}  # dwgnos column: its position in the row
+    for i, name in enumerate(header):
+        column = HEADERS.get(str(name).strip().lower())
+        if column and column not in columns:
+            columns[column] = i
+    missing = [c for c in ('dwg', 'part', 'description', 'date', 'author') if c not in columns]
+    if missing:
+        raise ValueError('The file has no column for: ' + ', '.join(missing))
+
+    def field(row, column):
+        i = columns[column]
+        return str(row[i]).strip() if i < len(row) else ''
+
+    for row in rows:
+        if not any(str(value).strip() for value in row):
+            continue  # an empty line
+        dwg = field(row, 'dwg')  # e.g. 2021125
+        value = row[columns['date']] if columns['date'] < len(row) else ''
+        try:
+            if not dwg.isdigit():
+                raise ValueError('Not a dwg no.: ' + dwg)
+            if hasattr(value, 'strftime'):  # a date read from an Excel file
+                _date = value.strftime('%Y-%m-%d')
+            else:
+                _date = dates.to_iso(str(value).split()[0] if str(value).strip() else '')
+        except ValueError as e:
+            rejected.append('{}  ({})'.format(', '.join(str(value) for value in row), e))
+            continue
+        yield (dwgnum2indexnum(dwg), dwg, field(row, 'part'), field(row, 'description'),
+               _date, field(row, 'author'))
+
+
+def import_records(conn, records, not_unique, chunk=5000):
+    ''' Insert records into dwgnos, chunk records per transaction.  Those
+    whose dwg no. is already in dwgnos, or came earlier in records, are
+    skipped and their dwg no. added to not_unique.
+
+    Returns
+    -------
+    int
+        The number of records inserted.
+    '''
+    count = 0
+    for batch in iter(lambda: list(islice(records, chunk)), []):
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            taken = set()
+            for i in range(0, len(batch), 500):  # stay below sqlite's limit of variables
+                marks, params = placeholders([row[1] for row in batch[i:i+500]])
+                taken.update(str(dwg) for (dwg,) in
+                             conn.execute('SELECT dwg FROM dwgnos WHERE dwg IN (%s)' % marks, params))
+            fresh = []
+            for row in batch:
+                if row[1] in taken:
+                    not_unique.append(row[1])
+                else:
+                    taken.add(row[1])
+                    fresh.append(row)
+            cursor = conn.executemany('INSERT OR IGNORE INTO dwgnos (dwg_index, dwg, part, '
+                                      'description, date, author) VALUES (?,?,?,?,?,?)', fresh)
+            count += cursor.rowcount
+        print('{} records imported'.format(count))
+    return count
+
+
+def db2excel():  # todo
+    pass
+
+
+def date2USAformat():  # todo
+    pass  
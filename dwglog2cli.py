@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Command line version of dwglog2, for use by scripts.  See dwglog2core/cli.py.
+Built by pyinstall.bat into a console program named dwglog2cli.exe.
+"""
+
+import sys
+
+from dwglog2core.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
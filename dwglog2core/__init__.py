@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Kenneth E. Carlton
+
+Core, non-GUI, parts of the dwglog2 program.  Nothing in this package imports
+PyQt5, so it can be used by scripts and benchmarks without starting a GUI.
+
+    store      the connection to dwglog2.db and adding of new records
+    codec      drawing no. <-> index no., part no. rules
+    query      turns what a user types in the search box into sql
+    validate   rules for changing a field of a record
+    settings   settings.txt
+    descrip    default part descriptions
+"""
+
+from .store import Store, DatabaseBusyError, default_store
+from .codec import generate_nos, indexnum2dwgnum, dwgnum2indexnum, updatePN
+from .query import compile_search
+from .validate import Change, ChangeRejected, plan_change
+
+__all__ = ['Store', 'DatabaseBusyError', 'default_store', 'generate_nos',
+           'indexnum2dwgnum', 'dwgnum2indexnum', 'updatePN', 'compile_search',
+           'Change', 'ChangeRejected', 'plan_change']
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+python -m dwglog2core runs the command line interface; see cli.py.
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
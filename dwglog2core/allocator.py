@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Kenneth E. Carlton
+
+Hands out new drawing numbers.  The last dwg_index handed out each year is
+kept in the dwgcounter table (see schema.py).  Taking numbers means bumping
+that one row under a write lock, so two users adding a record at the same
+moment can never get the same number, and the lock is held only for as long
+as the insert of the new records takes.
+"""
+
+from datetime import date
+
+from . import codec
+
+
+def allocate(conn, count=1, year=None):
+    ''' Reserve count consecutive drawing numbers.  Call inside of a write
+    transaction (BEGIN IMMEDIATE, e.g. via Store.write) and insert the new
+    records in that same transaction; if the transaction is rolled back, the
+    numbers are given back.
+
+    Parameters
+    ----------
+    conn: sqlite3.Connection
+        connection to a dwglog2.db file
+    count: int, optional
+        How many numbers to reserve.  The default is 1.
+    year: int, optional
+        Year of the drawing numbers.  The default is the current year.
+
+    Returns
+    -------
+    list
+        count tuples of (dwg_index, dwgNo), e.g.
+        [(202100855, 2021855), (202100856, 2021856)]
+    '''
+    if count < 1:
+        raise ValueError('count must be 1 or more')
+    year = year or date.today().year
+    last = _last_index(conn, year)
+    conn.execute('''INSERT INTO dwgcounter(year, last_index) VALUES (?, ?)
+                    ON CONFLICT(year) DO UPDATE SET last_index = excluded.last_index''',
+                 (year, last + count))
+    return [(i, codec.indexnum2dwgnum(i)) for i in range(last + 1, last + count + 1)]
+
+
+def peek(conn, count=1, year=None):
+    ''' The drawing numbers that allocate() would hand out next, without
+    reserving them.  Another user may take them first.
+
+    Returns
+    -------
+    list
+        count tuples of (dwg_index, dwgNo); see allocate().
+    '''
+    if count < 1:
+        raise ValueError('count must be 1 or more')
+    last = _last_index(conn, year or date.today().year)
+    return [(i, codec.indexnum2dwgnum(i)) for i in range(last + 1, last + count + 1)]
+
+
+def _last_index(conn, year):
+    row = conn.execute('SELECT last_index FROM dwgcounter WHERE year = ?', (year,)).fetchone()
+    return row[0] if row else year*100000  # the first no. of a year is e.g. 202100001
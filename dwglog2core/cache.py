@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+A cache of search results.  Engineers run the same few searches over and
+over: their own name, 0300-*, this month.  Unless someone changed the log in
+the meantime, the answer is the same as last time, so it is kept in memory,
+least recently used searches being dropped first once the cache is full.
+
+All entries are of one version of the database (see Store.search_version).
+When the version moves on, i.e. anyone committed a change, the whole cache
+is emptied: working out which searches a change affects would cost more
+than searching again.
+"""
+
+import sys
+from collections import OrderedDict
+
+
+def estimate_size(rows):
+    ''' Bytes that rows, a list of tuples of ints and strs, take up, roughly:
+    worked out from a sample of the rows.
+    '''
+    if not rows:
+        return sys.getsizeof(rows)
+    sample = rows[:100]
+    per_row = sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+                  for row in sample) / len(sample)
+    return int(sys.getsizeof(rows) + per_row * len(rows))
+
+
+class SearchCache:
+    ''' Results of searches, for one version of the database.
+
+    Parameters
+    ----------
+    maxbytes: int, optional
+        Most memory for the rows kept, roughly.  0 switches the cache off.
+        The default is 32 MB.
+    '''
+    def __init__(self, maxbytes=32*1024*1024):
+        self.maxbytes = maxbytes
+        self.version = None  # of the database the entries were read from
+        self.bytes = 0
+        self._entries = OrderedDict()  # key: (rows, size), least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0  # times the cache was emptied by a change
+        self.evictions = 0      # entries dropped to stay within maxbytes
+
+    def get(self, key, version):
+        ''' The rows cached for key, or None.  version is the database's
+        current version; if it differs from that of the entries, they are
+        all dropped.
+        '''
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self.clear()
+            self.version = version
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, version, rows):
+        ''' Keep rows, found for key in version version of the database.'''
+        if version != self.version:
+            return  # the database changed while the rows were read
+        size = estimate_size(rows)
+        if size > self.maxbytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (rows, size)
+        self.bytes += size
+        while self.bytes > self.maxbytes:
+            _, (_, dropped) = self._entries.popitem(last=False)
+            self.bytes -= dropped
+            self.evictions += 1
+
+    def clear(self):
+        ''' Drop all entries, e.g. when another database is opened.'''
+        self._entries.clear()
+        self.bytes = 0
+        self.version = None
+
+    def stats(self):
+        ''' Counters and size of the cache, a dictionary.'''
+        lookups = self.hits + self.misses
+        return {'entries': len(self._entries), 'bytes': self.bytes, 'maxbytes': self.maxbytes,
+                'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations, 'evictions': self.evictions}
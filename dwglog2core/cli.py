@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Command line interface to the dwglog2.db database, for CAD macros and ERP
+scripts that need drawing numbers or want to look records up.  It uses the
+same dwglog2.db as the dwglog2 program (see settings.txt) and the same rules
+for making drawing and part numbers, but doesn't load PyQt5, so it starts
+quickly enough to be called in a loop.
+
+    python -m dwglog2core search "*TANK*; kcarlton"
+    python -m dwglog2core next --part 0300-
+    python -m dwglog2core add --part 6410- --description "SEPARATOR OIL FR" --count 3
+    python -m dwglog2core get 2020867
+    python -m dwglog2core --format csv stats
+    python -m dwglog2core serve --host 0.0.0.0 --port 8765
+
+Results are written to stdout as JSON (the default) or CSV.  Dates are
+given as YYYY-MM-DD.  Exit status: 0 ok, 1 not found or bad input, 2 the
+database stayed locked by other users.
+"""
+
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+
+from . import settings
+from .store import DatabaseBusyError
+
+
+FIELDS = ['dwg', 'part', 'description', 'date', 'author']
+
+
+def records(rows):
+    ''' Tuples of (dwg, part, description, date, author) to dictionaries.'''
+    return [dict(zip(FIELDS, row)) for row in rows]
+
+
+def cmd_search(store, args):
+    return records(store.search(args.term, args.limit))
+
+
+def cmd_next(store, args):
+    return [{'dwg': dwgno, 'part': part} for dwgno, part in store.peek(args.part, args.count)]
+
+
+def cmd_add(store, args):
+    # as the Add Record dialog does; padded text would miss templates and
+    # similar descriptions
+    rows = store.add(args.part.strip().upper(), args.description.strip().upper()[:40].rstrip(),
+                     args.author.strip().lower(), args.count)
+    return records(row[1:] for row in rows)
+
+
+def cmd_get(store, args):
+    return records(store.get(args.dwg))
+
+
+def cmd_stats(store, args):
+    return [store.stats()]
+
+
+def serve(args, settingsdic):
+    from .server import Server
+    from .store import Store
+    local = Store()
+    settings.configure_store(local, settingsdic)
+    local.configure(wal=True)  # the server is the only user of the file, on its own disk
+    server = Server(args.db or settings.get_sqldatafile(), args.host, args.port,
+                    args.batch, local)
+    print('dwglog2 server for %s at %s' % (local.sqldatafile, server.url), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    return 0
+
+
+def write(results, fmt, out=sys.stdout):
+    ''' Write results, a list of dictionaries, to out as JSON or CSV.'''
+    if fmt == 'csv':
+        if results:
+            writer = csv.DictWriter(out, fieldnames=list(results[0]), lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        json.dump(results, out, indent=1)
+        out.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='dwglog2',
+                        description='Look up and add records of the dwglog2.db database.')
+    parser.add_argument('--db', help='dwglog2.db file to use.  The default is the '
+                        'sqldatafile of settings.txt (or its server, if one is set).')
+    parser.add_argument('--format', choices=('json', 'csv'), default='json',
+                        help='output format (default: json)')
+    sub = parser.add_subparsers(dest='command')
+    p = sub.add_parser('search', help='search like the search box of dwglog2')
+    p.add_argument('term', help='e.g. "*TANK*; kcarlton" or "date:2020-01..2020-06"')
+    p.add_argument('--limit', type=int, default=0, help='at most this many records')
+    p = sub.add_parser('next', help='show, without taking, the next drawing no.')
+    p.add_argument('--part', default='', help='part no. or prefix, e.g. 0300-')
+    p.add_argument('--count', type=int, default=1, help='how many numbers to show')
+    p = sub.add_parser('add', help='add new records and print them')
+    p.add_argument('--part', default='', help='part no. or prefix, e.g. 0300-')
+    p.add_argument('--description', default='', help='description')
+    p.add_argument('--author', default=settings.default_author(), help='author')
+    p.add_argument('--count', type=int, default=1, help='number of records to add')
+    p = sub.add_parser('get', help='the record of a drawing no.')
+    p.add_argument('dwg', help='drawing no., e.g. 2020867')
+    sub.add_parser('stats', help='facts about the database')
+    p = sub.add_parser('serve', help='run a dwglog2 server for the database (see server.py)')
+    p.add_argument('--host', default='127.0.0.1',
+                   help='address to listen on; 0.0.0.0 to serve other machines (no passwords!)')
+    p.add_argument('--port', type=int, default=8765)
+    p.add_argument('--batch', type=int, default=100,
+                   help='most requests carried out in one transaction')
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help(sys.stderr)
+        return 1
+
+    settingsdic = settings.get_settings()
+    if args.command == 'serve':
+        return serve(args, settingsdic)
+    if args.db:
+        settingsdic = dict(settingsdic, server='')  # use the file named
+    try:
+        store = settings.open_store(settingsdic, args.db or settings.get_sqldatafile())
+        results = {'search': cmd_search, 'next': cmd_next, 'add': cmd_add,
+                   'get': cmd_get, 'stats': cmd_stats}[args.command](store, args)
+    except DatabaseBusyError:
+        print('dwglog2: the database stayed locked by other users; try again', file=sys.stderr)
+        return 2
+    except (ValueError, sqlite3.Error) as er:
+        print('dwglog2: %s' % er, file=sys.stderr)
+        return 1
+    write(results, args.format)
+    return 0 if results else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Client of the dwglog2 server (see server.py).  RemoteStore has the same
+operations as Store (latest, search, add, ...), so the dwglog2 program
+works the same whether it talks to the server or opens dwglog2.db itself.
+"""
+
+import http.client
+import json
+import sqlite3
+import threading
+from urllib.parse import urlsplit
+
+from .ops import Affected, WRITES
+from .store import DatabaseBusyError
+from .validate import Change, ChangeRejected
+
+
+class ServerError(sqlite3.OperationalError):
+    ''' The server could not be reached, or failed.'''
+
+
+ERRORS = {'busy': DatabaseBusyError, 'rejected': ChangeRejected,
+          'value': ValueError, 'sqlite': sqlite3.Error}
+
+
+class RemoteStore:
+    ''' Talks to a dwglog2 server.
+
+    Parameters
+    ----------
+    url: str
+        e.g. http://cadserver:8765
+    timeout: float, optional
+        Seconds to wait for the server.  The default is 30.
+    '''
+    has_fts = False      # searches are compiled by the server
+    journal_mode = None
+
+    def __init__(self, url, timeout=30.0):
+        parts = urlsplit(url if '//' in url else 'http://' + url)
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.sqldatafile = url
+        self._local = threading.local()  # one http connection per thread
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _post(self, body, write=False):
+        ''' Send body to the server and return its reply.  A kept-alive
+        connection may have been closed by the server in the meantime, so a
+        failed request is sent once more.  Not so a write (add, apply_change,
+        delete) that may have reached the server: it may have been carried
+        out with only the reply lost, and a second add would take a second
+        drawing no.  A write is sent again only if sending it failed on a
+        kept-alive connection; else ServerError is raised, and the caller
+        can check with get or changes what was done.
+        '''
+        data = json.dumps(body).encode('utf-8')
+        for attempt in range(2):
+            conn = self._connection()
+            reused = conn.sock is not None  # kept alive from an earlier request
+            sent = False
+            try:
+                conn.request('POST', '/api', data, {'Content-Type': 'application/json'})
+                sent = True
+                response = conn.getresponse()
+                payload = response.read()
+                if response.status != 200:
+                    raise ServerError('dwglog2 server %s: %s %s' % (self.url, response.status,
+                                                                    response.reason))
+                return json.loads(payload)
+            except (OSError, http.client.HTTPException) as er:
+                conn.close()
+                self._local.conn = None
+                if write and sent:
+                    raise ServerError('dwglog2 server %s did not reply, the change may or may '
+                                      'not have been made: %s' % (self.url, er)) from er
+                if attempt or (write and not reused):
+                    raise ServerError('dwglog2 server %s not reachable: %s' % (self.url, er)) from er
+
+    @staticmethod
+    def _result(op, reply):
+        if 'error' in reply:
+            raise ERRORS.get(reply.get('type'), ServerError)(reply['error'])
+        result = reply['result']
+        if op == 'plan_change':
+            return Change(**result) if result else None
+        if op == 'apply_change':
+            return Affected(result['changed'], [tuple(row) for row in result['rows']])
+        if isinstance(result, list):
+            return [tuple(row) if isinstance(row, list) else row for row in result]
+        return result
+
+    def call(self, op, **args):
+        ''' Carry out one operation of ops.py on the server.'''
+        return self._result(op, self._post({'op': op, 'args': args}, op in WRITES))
+
+    def batch(self, requests):
+        ''' Carry out several operations in one round trip and one
+        transaction.  requests: a list of (op, args dictionary).  Returns the
+        results in order; the first error raised.
+        '''
+        replies = self._post([{'op': op, 'args': args} for op, args in requests],
+                             any(op in WRITES for op, args in requests))
+        return [self._result(op, reply) for (op, args), reply in zip(requests, replies)]
+
+    def connect(self, sqldatafile=None):
+        ''' Check that the server answers.  sqldatafile is ignored: the server
+        decides which file is used.
+        '''
+        conn = self._connection()
+        try:
+            conn.request('GET', '/api')
+            return json.loads(conn.getresponse().read())
+        except (OSError, http.client.HTTPException, ValueError) as er:
+            conn.close()
+            self._local.conn = None
+            raise ServerError('dwglog2 server %s not reachable: %s' % (self.url, er)) from er
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def latest(self, limit=100, indexed=False, before=None):
+        return self.call('latest', limit=limit, indexed=indexed, before=before)
+
+    def search(self, searchterm, limit=0, indexed=False, before=None):
+        return self.call('search', searchterm=searchterm, limit=limit, indexed=indexed,
+                         before=before)
+
+    def rows(self, indexes, searchterm=''):
+        return self.call('rows', indexes=indexes, searchterm=searchterm)
+
+    def data_version(self):
+        ''' See Store.data_version.  One small request to the server.'''
+        return self.last_change()
+
+    def changes(self, since):
+        return tuple(self.call('changes', since=since))
+
+    def last_change(self):
+        return self.call('last_change')
+
+    def get(self, dwg):
+        return self.call('get', dwg=dwg)
+
+    def parts(self):
+        return self.call('parts')
+
+    def descriptions(self):
+        return self.call('descriptions')
+
+    def templates_used(self):
+        return self.call('templates_used')
+
+    def peek(self, part='', count=1):
+        return self.call('peek', part=part, count=count)
+
+    def stats(self):
+        return self.call('stats')
+
+    def add(self, part, description, author, count=1):
+        return self.call('add', part=part, description=description, author=author, count=count)
+
+    def plan_change(self, k, clicked_text, column):
+        return self.call('plan_change', k=k, clicked_text=clicked_text, column=column)
+
+    def apply_change(self, k, clicked_text, column):
+        return self.call('apply_change', k=k, clicked_text=clicked_text, column=column)
+
+    def delete(self, dwg):
+        return self.call('delete', dwg=dwg)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Kenneth E. Carlton
+
+Drawing numbers and part numbers.  A drawing number like 2020873 is stored
+alongside a hidden index number, dwg_index, 202000873, that sorts properly
+and from which the next drawing number is generated.  Part numbers can be
+generated from the drawing number, e.g. 0300 -> 0300-2020-873.
+"""
+
+from datetime import date
+
+
+def generate_nos(dwg_indexes, partNo):
+    '''
+    Generate a new drawing number and a new part no.
+
+    Parameters
+    ----------
+    dwg_indexes: list
+        A list of tuples derived from the dwg_index column (not the dwg column)
+        of the prtnos table of the dwglog2.db sqlite database file.  The list
+        has a form like: [(202100855,), (202100856,), (202100857,)]
+
+    partNo: str
+        Part no. given by the user.
+
+    Returns
+    -------
+    dwgNo: int
+        A new drawing no. to add to the dwglog2.db file, e.g. 2020051
+    partNo: str
+        Same PartNo as input to this function unless autofill kicks in to
+        change nos. from, for example, '0300' to '0300-2020-051', or
+        '6521' to '6521-2020-051'.
+    new_dwg_index: int
+        ROWID, used by Sqlite, to order data and to generate new part nos.
+        e.g. 202100855.
+    '''
+    year = date.today().year  # current year, e.g. 2021 (an int)
+    int_list = []
+    for x in dwg_indexes:  # dwg_indexes has a form like [(202100855,), (202100856,), (202100857,)]
+        if isinstance(x[0], int) and str(x[0])[:4] == str(year):
+            int_list.append(x[0])  # a list of recent dwg. nos.
+    if int_list:  # list of dwg nos. in the current year
+        largest = max(int_list)
+        new_dwg_index = largest + 1
+        chrs = str(new_dwg_index)[4:]  # e.g., from 202100855 -> "00855"
+        whittled = chrs
+        for x in chrs:                       # whittle off leading zeros
+            if x=='0':
+                whittled = whittled[1:]
+            else:
+                break
+        whittled = whittled.zfill(3)      # e.g. "5" to "005", or "13" to "013"
+        dwgNo = int(str(year) + whittled)
+    else:
+        dwgNo = year*1000 + 1  # if no ints in list, then is 1st dwg no. for a new year
+        d = str(dwgNo)
+        new_dwg_index = int(d[:4] + (9 % len(d))*'0' + d[4:])
+    partNo = autofill_part(partNo, dwgNo)
+    return dwgNo, partNo, new_dwg_index
+
+
+def autofill_part(partNo, dwgNo):
+    ''' If the user gave only the first four digits of a part no., e.g. 0300
+    or 0300-, fill in the rest from the drawing no.: 0300-2020-051 for drawing
+    no. 2020051.  Otherwise return partNo unchanged.
+    '''
+    if ((partNo.isnumeric() and len(partNo) == 4) or
+           (len(partNo) == 5 and partNo[:4].isnumeric() and partNo[-1] == '-')):
+        partNo = partNo[:4] + '-' + str(dwgNo)[:4] + '-' + str(dwgNo)[4:]
+    return partNo
+
+
+def dwgnum2indexnum(dwgNo):
+    ''' The reverse of indexnum2dwgnum: 2020873 -> 202000873, and
+    2021034 -> 202100034.
+
+    Parameters
+    ----------
+    dwgNo : int or str
+        A drawing no. from the column named "dwg"
+
+    Returns
+    -------
+    int
+        The corresponding number for the column named "dwg_index".
+    '''
+    d = str(dwgNo)
+    return int(d[:4] + (9 % len(d))*'0' + d[4:])
+
+
+def indexnum2dwgnum(dwg_index):
+    ''' A number from the column named dwg_index looks something like
+    202000873.  From that number make it a suitable number to fit into
+    the column named dwg.  So in this case the suitable number to apply is
+    2020873.  Another example: for 202100034 the dwg no. would be 2021034
+
+    Parameters
+    ----------
+    dwg_index : int
+        Number from the column name "dwg_index".  (This column is hidden to
+        the user.  It resides in the database file dwglog2.db.)
+
+    Returns
+    -------
+    int
+        A new drawing number.  It corresponds to dwg_index.
+    '''
+    chrs = str(dwg_index)[4:]
+    whittled = chrs
+    for x in chrs:                       # whittle off leading zeros
+        if x=='0':
+            whittled = whittled[1:]
+        else:
+            break
+    whittled = whittled.zfill(3)      # e.g. "5" to "005", or "13" to "013"
+    return int(str(dwg_index)[:4] + whittled)
+
+
+def updatePN(oldpn, oldindexNo, newIndexNo):
+    ''' If the user changes the drawing no. from, for example, 2020876 to
+    2020925, and the part no. is 0300-2020-876, the part no. should change to
+    0300-2020-925.  On the other hand if, for example, the part no. is
+    6100-0100-315, that is it doesn't have a program generated number, the
+    part no. should be left as 6100-0100-315.
+
+    Parameters
+    ----------
+    pn : str
+        orignal part no., from column "part"
+    dwgNo : str
+        original drawing no., from column "dwg"
+    indexNo : int
+        original index no., from column "dwg_index"
+    newIndexNo : int
+        The new index no. that the user is establishing.
+
+    Returns
+    -------
+    str
+       New pn if it was originally based on indexNo. Otherwise return return
+       the original pn
+    '''
+    d = indexnum2dwgnum(oldindexNo)  # old dwgNo derived from oldindexNo
+    p = str(oldpn)[:4] + '-' + str(d)[:4] + '-' + str(d)[4:]   # pn if it were generated from oldindexNo
+
+    if p == oldpn:  # that is, is oldpn what would have been generated, like 0300-2020-876?
+        d2 = indexnum2dwgnum(newIndexNo)
+        newpn = str(oldpn)[:4] + '-' + str(d2)[:4] + '-' + str(d2)[4:]
+        return newpn
+    else:
+        return oldpn
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+A compact store for the rows a table shows.  A search like * or 2020* finds
+tens of thousands of records.  Held as a list of tuples, each row costs a
+tuple, and each of its strings a str object of its own, even though most
+descriptions, dates and authors are repeated many times over.  ColumnStore
+instead keeps one list per column, the dwg_index in an array of integers,
+and only one copy of each repeated string.  The pool of those copies is
+rebuilt from the rows kept once enough rows have been replaced or
+deleted, so that values no longer shown don't stay alive.
+"""
+
+from array import array
+
+
+class ColumnStore:
+    ''' Rows of (dwg_index, dwg, part, description, date, author), held
+    column by column.  Acts like a list of such tuples (len, indexing,
+    iteration, insert, del, pop), so watch.merge can work on it.
+
+    Parameters
+    ----------
+    rows: iterable, optional
+        Rows to start with, each a tuple as above.
+    '''
+    def __init__(self, rows=()):
+        self.dwg_index = array('q')
+        self.columns = ([], [], [], [], [])  # dwg, part, description, date, author
+        self._pool = {}  # one copy of each repeated value; None: to be built (see _shared)
+        self._dropped = 0  # rows replaced or deleted since the pool was built
+        self.extend(rows)
+
+    def _shared(self, value):
+        if self._pool is None or self._dropped > len(self):
+            # values of rows that are gone may be all that's left in the pool
+            self._pool = {v: v for column in self.columns[2:] for v in column}
+            self._dropped = 0
+        return self._pool.setdefault(value, value)
+
+    def extend(self, rows):
+        shared = self._shared
+        dwg, part, description, _date, author = self.columns
+        for row in rows:
+            self.dwg_index.append(row[0])
+            dwg.append(row[1])
+            part.append(row[2])
+            description.append(shared(row[3]))
+            _date.append(shared(row[4]))
+            author.append(shared(row[5]))
+
+    def value(self, row, column):
+        ''' The value of column number column (0 to 4, dwg to author) of row
+        number row.
+        '''
+        return self.columns[column][row]
+
+    def __len__(self):
+        return len(self.dwg_index)
+
+    def __getitem__(self, pos):
+        return (self.dwg_index[pos],) + tuple(column[pos] for column in self.columns)
+
+    def __iter__(self):
+        return iter(zip(self.dwg_index, *self.columns))
+
+    def _values(self, row):
+        # dwg and part are unique to a record; the rest are shared
+        return row[1], row[2], self._shared(row[3]), self._shared(row[4]), self._shared(row[5])
+
+    def __setitem__(self, pos, row):
+        self._dropped += 1
+        self.dwg_index[pos] = row[0]
+        for column, value in zip(self.columns, self._values(row)):
+            column[pos] = value
+
+    def __delitem__(self, pos):
+        self._dropped += 1
+        del self.dwg_index[pos]
+        for column in self.columns:
+            del column[pos]
+
+    def insert(self, pos, row):
+        self.dwg_index.insert(pos, row[0])
+        for column, value in zip(self.columns, self._values(row)):
+            column.insert(pos, value)
+
+    def pop(self, pos=-1):
+        row = self[pos]
+        del self[pos]
+        return row
+
+    def copy(self):
+        ''' A copy, sharing the values but not the columns, nor the pool: the
+        copy's is built from its own rows if it is given any.
+        '''
+        other = ColumnStore()
+        other.dwg_index = array('q', self.dwg_index)
+        other.columns = tuple(list(column) for column in self.columns)
+        other._pool = None
+        return other
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Kenneth E. Carlton
+
+Dates are stored in dwglog2.db in the sortable ISO 8601 form, YYYY-MM-DD, so
+that date ranges can be found with an index.  Users see, and type, dates as
+MM/DD/YYYY.  The functions here convert between the two.
+"""
+
+import re
+from datetime import date
+
+_iso = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+_usa = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+_partial = re.compile(r'^(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?$')
+
+
+def to_iso(text):
+    ''' Convert a date typed by a user to the form stored in dwglog2.db.
+
+    Parameters
+    ----------
+    text: str
+        A date like 11/5/2020, 11/05/2020, or 2020-11-05
+
+    Returns
+    -------
+    str
+        e.g. '2020-11-05'.  If text is not a date in one of the above forms,
+        or is no day of the calendar, e.g. 02/31/2020, ValueError is raised.
+    '''
+    text = text.strip()
+    m = _iso.match(text)
+    if m:
+        y, mo, d = m.groups()
+    else:
+        m = _usa.match(text)
+        if not m:
+            raise ValueError('Not a date: ' + text)
+        mo, d, y = m.groups()
+    try:
+        date(int(y), int(mo), int(d))
+    except ValueError:
+        raise ValueError('Not a date: ' + text) from None
+    return y + '-' + mo.zfill(2) + '-' + d.zfill(2)
+
+
+def to_display(value):
+    ''' Convert a date stored in dwglog2.db, e.g. 2020-11-05, to the form
+    shown to users, 11/05/2020.  Anything that is not an ISO date is returned
+    unchanged (as a str).
+    '''
+    value = str(value)
+    m = _iso.match(value)
+    if m:
+        y, mo, d = m.groups()
+        return mo.zfill(2) + '/' + d.zfill(2) + '/' + y
+    return value
+
+
+def glob_to_iso(pattern):
+    ''' Before dates were stored as YYYY-MM-DD, users searched for dates with
+    patterns like 11/*/2020 or 1[12]/*/2020.  Convert such a pattern so that
+    it matches ISO dates: 2020-11-*, 2020-1[12]-*.
+
+    Returns
+    -------
+    str or None
+        The converted pattern, or None if pattern doesn't look like a
+        MM/DD/YYYY date pattern.
+    '''
+    parts = pattern.split('/')
+    if len(parts) != 3 or not all(parts):
+        return None
+    mo, d, y = [p.zfill(2) if p.isdigit() else p for p in parts]
+    return y + '-' + mo + '-' + d
+
+
+def _bound(text, upper):
+    ''' Lower or upper bound of a (possibly partial) date: 2020 -> 2020-01-01
+    or 2020-12-31; 2020-03 -> 2020-03-01 or 2020-03-31.
+    '''
+    text = text.strip()
+    m = _partial.match(text)
+    if not m:
+        return to_iso(text)
+    y, mo, d = m.groups()
+    if d:
+        return to_iso(text)
+    if mo:
+        if not 1 <= int(mo) <= 12:
+            raise ValueError('Not a date: ' + text)
+        return y + '-' + mo.zfill(2) + ('-31' if upper else '-01')
+    return y + ('-12-31' if upper else '-01-01')
+
+
+def date_range(spec):
+    ''' Parse a date range like 2020-01-01..2020-03-31.  Either end may be
+    left off (2020-01-01.. means from that date on), or be partial (2020..2021
+    means all of 2020 and 2021), or be MM/DD/YYYY.  Without '..', spec is a
+    single day, month, or year.
+
+    Returns
+    -------
+    tuple
+        (first, last) as ISO dates.  Either may be None for an open range.
+        ValueError is raised if spec doesn't make sense.
+    '''
+    if '..' in spec:
+        lo, hi = spec.split('..', 1)
+        lo = _bound(lo, False) if lo.strip() else None
+        hi = _bound(hi, True) if hi.strip() else None
+        if lo is None and hi is None:
+            raise ValueError('Date range has no dates: ' + spec)
+        return lo, hi
+    return _bound(spec, False), _bound(spec, True)
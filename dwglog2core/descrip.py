@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Default part descriptions.  The first four digits of a part no. tell what
+kind of part it is, e.g. 6410-2020-123 is an oil separator.  When a user
+enters just those digits, the description is filled in from the pndescrip
+dictionary below.  An administrator can add to or change these with a file
+named descriptions.py (see the dwglog2 help).
+"""
+
+pndescrip = {300:"BASEPLATE ? CS", 2202:'CTRL/LAYOUT PNL ??HP ???V',
+   2223:'CTRL/LAYOUT PNL ??HP ???V', 2250:'CTRL/LAYOUT PNL ??HP ???V',
+   2273:'CTRL/LAYOUT PNL ??HP ???V CONTROLDEK',
+   2277:'CTRL/LAYOUT PNL ??HP ???V CONTROLDEK',
+   2451:'PLACARD SET FOR ?', 2704:"COVER PLATE ? CS", 2708:"ENDPLATE ? CS",
+   2724:'SHELL ??"OD X ??"LG X ??"THK CS', 2728:"BRACKET ? CS",
+   2730:"BRACKET CTRL PNL height?Xwidth? CS",
+   2922:"FILTER INLET ?", 3060:"FITTING HOSE BARB ?",
+   3420:'FLOW ORIFICE PLATE ??"ID',
+   3510:'GASKET ?mtl? ??"OD X ??"ID X ??"THK', 3700:"GUARD COUPLING ?",
+   3705:"GUARD FINGER ?", 3715:"GUARD V-BELT ?", 4010:"HT EX ?", 4715:"KIT ?",
+   4790:"TAG ?", 5130:"HULLVAC INLET ?", 6000:"RECEIVER TANK HORZ ??? GAL CS",
+   6004:"RECEIVER TANK VERT ??? GAL CS", 6005:"RECEIVER TANK VERT ASSY ??? GAL CS",
+   6006:"RCVR TANK VERT W/PLATFORM ??? GAL CS",
+   6008:"RCVR TANK HORZ GRASSHOPPER ??? GAL CS",
+   6050:"RISERBLOCK ? CS", 6405:"CONDENSATE TANK ? CS", 6410:'SEPARATOR OIL FR ??"OD CS',
+   6415:'SEPARATOR FR ??"OD CS', 6420:"SEPARATOR KO ? CS", 6425:'SEPARATOR NR ??"OD CS',
+   6430:'SEPARATOR NR/PR ??"OD CS', 6775:"STRAINER ? CS", 6820:"SUB ASSY DISCH MANIFOLD ? CS",
+   6825:"SUB ASSY INLET/DISCH MNFLD ? CS", 6830:"SUB ASSY INLET MANIFOLD ? CS",
+   6840:"SUB ASSY SEPARATOR ? CS", 6860:"SUB ASSY pump? ??HP MTR",
+   6875:"SUB ASSY PIPING ? CS", 6882:'SUB ASSY KO TANK ?? GAL ??"OD CS',
+   6885:"SUB ASSY LEVEL SWITCH ?", 6886:"SUB ASSY V-BELT ?HP",
+   6890:"SUB ASSY PIPING ? CS", 6891:"SUB ASSY 2ND STG OIL FILTER ?",
+   7318:"VALVE CHK INLINE ?"}
+
+
+
+def load_descriptions():
+    ''' Merge the descriptions from descriptions.py, if that file exists,
+    into pndescrip.
+
+    Returns
+    -------
+    str
+        '' if all went well (or if there is no descriptions.py), else an
+        error message to show to the user.
+    '''
+    try:
+        import descriptions
+        pndescrip.update(descriptions.descriptions)
+    except ModuleNotFoundError as inst:
+        print('Error, module not found: ', inst)
+    except Exception as inst:
+        print('Warning: ', inst)
+        return ('The file named descriptions.py failed to load.  The dwglog2\n' +
+                'program will attempt to continue without the data provided by\n' +
+                'this file, but may crash.  Please fix the error in descriptions.py.\n' +
+                "For more information, see dwglog2's help information.  As a last\n" +
+                'resort, delete the descriptions.py file.\n\n' +
+                str(inst))
+    return ''
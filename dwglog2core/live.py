@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Search as you type.  A search that reads the whole table can take a while,
+on a network share or with a large log, so searches are run on a thread of
+their own rather than in the GUI.  The rows found are handed back a chunk at
+a time, as they are read, so the first rows show at once.  Each key stroke
+makes the search running obsolete; it is then stopped with
+Connection.interrupt() rather than left to finish.
+"""
+
+import sqlite3
+import threading
+
+from . import ops, query
+
+
+class LiveSearch:
+    ''' Runs searches on a thread of its own.  Only the latest search
+    submitted matters: one that is running when another is submitted is
+    interrupted, and one waiting to run is dropped.
+
+    Parameters
+    ----------
+    store: Store or RemoteStore
+        What to search.  For a Store, the search thread has a connection of
+        its own to the same file, or to its replica if it has one.  The
+        replica is searched as it is; it is the store's own reads, e.g. of
+        the changes that poll finds, that make it catch up (see
+        Store.read).  A search that finds the file locked is retried as the
+        store's reads are (see Store.retry).  Searches sent to a dwglog2
+        server can't be interrupted; their rows are dropped if no longer
+        wanted.
+    found: function
+        Called, on the search thread, as found(generation, rows, done, error)
+        for each chunk of rows found: generation is the number that submit()
+        returned for the search, rows a list of rows with their dwg_index
+        first, done True for the last chunk, and error a message if the
+        search failed, else ''.
+    chunk: int, optional
+        Rows handed over at a time.  The default is 200.
+    '''
+    def __init__(self, store, found, chunk=200):
+        self.store = store
+        self.found = found
+        self.chunk = chunk
+        self.generation = 0  # of the latest search submitted
+        self._pending = None
+        self._stop = False
+        self._cond = threading.Condition()
+        self._conn = None
+        if hasattr(store, 'conn'):
+            replica = store.replica
+            # made here and used by the search thread; interrupted from the GUI thread
+            self._conn = sqlite3.connect(replica.replicafile if replica else store.sqldatafile,
+                                         timeout=store.busy_timeout, check_same_thread=False)
+        self._thread = threading.Thread(target=self._work, name='dwglog2 live search', daemon=True)
+        self._thread.start()
+
+    def submit(self, searchterm):
+        ''' Search for searchterm (see query.compile_search) instead of
+        whatever is being searched for now.  Returns the search's generation.
+        '''
+        with self._cond:
+            self.generation += 1
+            self._pending = (self.generation, searchterm)
+            self._interrupt()
+            self._cond.notify()
+            return self.generation
+
+    def cancel(self):
+        ''' Stop the search running, if any, and drop its rows.'''
+        with self._cond:
+            self.generation += 1
+            self._pending = None
+            self._interrupt()
+
+    def _interrupt(self):
+        # harmless if nothing is running: sqlite only interrupts statements
+        # that are running at the time
+        if self._conn is not None:
+            self._conn.interrupt()
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._interrupt()
+            self._cond.notify()
+        self._thread.join(5)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    break
+                generation, searchterm = self._pending
+                self._pending = None
+            self._search(generation, searchterm)
+        if self._conn is not None:
+            self._conn.close()
+
+    def _search(self, generation, searchterm):
+        def wanted():
+            return generation == self.generation
+        cursor = None
+        try:
+            if self._conn is None:  # a RemoteStore
+                rows = self.store.search(searchterm, indexed=True)
+                if wanted():
+                    self.found(generation, rows, True, '')
+                return
+            sql, params = query.compile_search(searchterm, self.store.has_fts, ops.INDEXED)
+            if self.store.explain:
+                print('EXPLAIN QUERY PLAN of search ' + repr(searchterm) + ':\n    ' + '\n    '.join(
+                      row[3] for row in self._conn.execute('EXPLAIN QUERY PLAN ' + sql, params)))
+
+            def execute():
+                if not wanted():  # e.g. another key stroke while waiting to retry
+                    raise sqlite3.OperationalError('interrupted')
+                return self._conn.execute(sql, params)
+            cursor = self.store.retry(execute)
+            while wanted():
+                rows = cursor.fetchmany(self.chunk)
+                done = len(rows) < self.chunk
+                self.found(generation, rows, done, '')
+                if done:
+                    break
+        except (ValueError, sqlite3.Error) as er:  # a bad term, busy, or interrupted
+            if wanted():
+                self.found(generation, [], True, str(er))
+        finally:
+            if cursor is not None:
+                cursor.close()
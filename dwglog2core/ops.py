@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+The operations that the dwglog2 program performs on dwglog2.db: show the
+latest records, search, add, change and delete.  Each is a function of an
+open connection, to be called inside of a transaction (see Store.run and
+Store.write).  The same functions serve the GUI directly (via Store) and
+remote clients via the dwglog2 server (see server.py), so a record added
+through the server gets exactly the same number that it would have gotten
+from the file.
+"""
+
+from collections import namedtuple
+from datetime import date
+
+from . import allocator, codec, query, schema, templates, validate
+
+
+INDEXED = 'dwg_index, ' + query.COLUMNS
+
+Affected = namedtuple('Affected', 'changed rows')
+Affected.__doc__ = ''' What a write did: changed, the dwg_index of every record
+added, altered or deleted, and rows, the current rows, dwg_index first, of
+those that still exist.  A view brings itself up to date with these rather
+than by reading everything again; see watch.merge.'''
+
+
+def latest(conn, limit=100, indexed=False, before=None):
+    ''' The newest records, tuples of (dwg, part, description, date, author).
+    If indexed, each tuple starts with the record's dwg_index.  If before is
+    given, the newest records older than the one with dwg_index before, i.e.
+    the next page of the log; unlike OFFSET, this costs the same however
+    deep into the log the page is.
+    '''
+    columns = INDEXED if indexed else query.COLUMNS
+    if before is None:
+        return conn.execute('SELECT ' + columns + ' FROM dwgnos '
+                            'ORDER BY dwg_index DESC LIMIT ?', (limit,)).fetchall()
+    return conn.execute('SELECT ' + columns + ' FROM dwgnos WHERE dwg_index < ? '
+                        'ORDER BY dwg_index DESC LIMIT ?', (before, limit)).fetchall()
+
+
+def search(conn, searchterm, limit=0, fts=False, indexed=False, before=None):
+    ''' Records found by searchterm (see query.compile_search), newest first.
+    limit: at most this many; 0 for all.  indexed, before: as for latest(),
+    so the results can be read a page at a time.  sqlite walks the table
+    newest first and stops once limit rows are found, so a page of a search
+    that finds most of the log costs no more than one that finds a few.
+    ValueError for a bad search term.
+    '''
+    sql, params = _search(searchterm, limit, fts, indexed, before)
+    return conn.execute(sql, params).fetchall()
+
+
+def _search(searchterm, limit, fts, indexed, before):
+    sql, params = query.compile_search(searchterm, fts, INDEXED if indexed else query.COLUMNS,
+                                       before=before)
+    if limit:
+        sql += ' LIMIT ?'  # not in the sql, so each page size doesn't make another statement
+        params.append(int(limit))
+    return sql, params
+
+
+def explain(conn, searchterm, limit=0, fts=False, indexed=False, before=None):
+    ''' How sqlite would carry out search(): the lines of EXPLAIN QUERY PLAN
+    for its statement, e.g. ['SEARCH dwgnos USING INDEX dwgnos_author
+    (author=?)'].  A line with SCAN dwgnos means every row is read.
+    '''
+    sql, params = _search(searchterm, limit, fts, indexed, before)
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def get(conn, dwg):
+    ''' The record of drawing no. dwg, as a list of zero or one tuple.'''
+    return conn.execute('SELECT ' + query.COLUMNS + ' FROM dwgnos WHERE dwg = ?',
+                        (dwg,)).fetchall()
+
+
+def last_change(conn):
+    ''' seq of the latest entry of the dwgchanges journal.'''
+    return schema.last_change(conn)
+
+
+def changes(conn, since):
+    ''' Records changed since entry since of the dwgchanges journal.
+
+    Returns
+    -------
+    tuple
+        (seq of the latest entry, sorted list of changed dwg_index values).
+        Instead of the list None if the journal no longer goes back to since
+        (see schema._prune_dwgchanges): anything may have changed.
+    '''
+    log = conn.execute('SELECT seq, dwg_index FROM dwgchanges WHERE seq > ? ORDER BY seq',
+                       (since,)).fetchall()
+    if not log:
+        return since, []
+    if log[0][0] > since + 1:  # seq has no gaps, but for the entries pruned
+        return log[-1][0], None
+    return log[-1][0], sorted({dwg_index for seq, dwg_index in log})
+
+
+def rows(conn, indexes, searchterm='', fts=False):
+    ''' The records, with their dwg_index first, of those of indexes that
+    still exist and, if searchterm is given, that it finds.  Newest first.
+    '''
+    found = []
+    for i in range(0, len(indexes), 500):  # stay below sqlite's limit of variables
+        chunk = list(indexes[i:i+500])
+        if searchterm:
+            sql, params = query.compile_search(searchterm, fts, INDEXED, chunk)
+        else:
+            marks, params = query.placeholders(chunk)
+            sql = ('SELECT ' + INDEXED + ' FROM dwgnos WHERE dwg_index IN (%s) '
+                   'ORDER BY dwg_index DESC' % marks)
+        found += conn.execute(sql, params).fetchall()
+    return sorted(found, reverse=True)
+
+
+def parts(conn):
+    ''' The part no. and description of every record that has a part no.,
+    oldest first; see parts.PartIndex.
+    '''
+    return conn.execute("SELECT part, description FROM dwgnos WHERE part != '' "
+                        'ORDER BY dwg_index').fetchall()
+
+
+def descriptions(conn):
+    ''' (dwg_index, dwg, part, description) of every record; see
+    similar.SimilarIndex.
+    '''
+    return conn.execute('SELECT dwg_index, dwg, part, description FROM dwgnos').fetchall()
+
+
+def templates_used(conn):
+    ''' (prefix, template, uses) of every description template of the
+    dwgtemplates table; see templates.Suggestions.
+    '''
+    return conn.execute('SELECT prefix, template, uses FROM dwgtemplates').fetchall()
+
+
+def peek(conn, part='', count=1):
+    ''' The next count drawing nos. and part nos. that add() would give,
+    without reserving them.  Tuples of (dwg, part).
+    '''
+    return [(dwgno, codec.autofill_part(part, dwgno))
+            for dwg_index, dwgno in allocator.peek(conn, count)]
+
+
+def stats(conn):
+    ''' Facts about the database, a dictionary.'''
+    count, first, last = conn.execute('SELECT COUNT(*), MIN(dwg_index), '
+                                      'MAX(dwg_index) FROM dwgnos').fetchone()
+    authors = conn.execute('SELECT COUNT(DISTINCT author) FROM dwgnos').fetchone()[0]
+    return {'sqldatafile': conn.execute('PRAGMA database_list').fetchone()[2],
+            'records': count,
+            'first_dwg': codec.indexnum2dwgnum(first) if first else None,
+            'last_dwg': codec.indexnum2dwgnum(last) if last else None,
+            'authors': authors,
+            'schema_version': schema.user_version(conn),
+            'journal_mode': conn.execute('PRAGMA journal_mode').fetchone()[0],
+            'fts': schema.has_fts(conn)}
+
+
+def add(conn, part, description, author, count=1):
+    ''' Add count new records, each with its own new drawing no.  Call inside
+    of a write transaction.  If part is just the first four digits of a part
+    no., e.g. 6890-, the rest of each record's part no. is filled in from its
+    drawing no.
+
+    Returns
+    -------
+    list
+        The new records, tuples of (dwg_index, dwg, part, description,
+        date, author), in order of drawing no.
+    '''
+    _date = date.today().isoformat()
+    rows = [(dwg_index, dwgno, codec.autofill_part(part, dwgno), description, _date, author)
+            for dwg_index, dwgno in allocator.allocate(conn, count)]
+    conn.executemany('INSERT INTO dwgnos (dwg_index, dwg, part, description, date, author) '
+                     'VALUES (?,?,?,?,?,?)', rows)
+    templates.count(conn, [(row[2], row[3]) for row in rows])
+    return rows
+
+
+def plan_change(conn, k, clicked_text, column):
+    ''' What changing a cell would do; see validate.plan_change.  k is not
+    modified.
+    '''
+    return validate.plan_change(conn, _row(k), clicked_text, column)
+
+
+def apply_change(conn, k, clicked_text, column):
+    ''' Carry out the change that plan_change() describes.  Call inside of a
+    write transaction with the same arguments that were given to
+    plan_change(); the change is worked out again against the database as it
+    is now.
+
+    Returns
+    -------
+    Affected
+        The records changed, read back from the database.  A change of the
+        dwg. no. may also change a record's dwg_index; both the old and the
+        new dwg_index are then in changed.
+    '''
+    change = validate.plan_change(conn, _row(k), clicked_text, column)
+    if change is None:
+        return Affected([], [])
+    # the record as it is, for dwgtemplates; k[0] is its dwg. no. unless that was the cell changed
+    before = conn.execute('SELECT part, description FROM dwgnos WHERE dwg = ?',
+                          (clicked_text if int(column) == 0 else _row(k)[0],)).fetchall()
+    seq = schema.last_change(conn)
+    conn.execute(change.sql, change.params)
+    # the dwgchanges journal lists whatever the change touched
+    changed = [i for (i,) in conn.execute('SELECT DISTINCT dwg_index FROM dwgchanges '
+                                          'WHERE seq > ? ORDER BY dwg_index DESC', (seq,))]
+    after = rows(conn, changed)
+    templates.count(conn, before, -1)
+    templates.count(conn, [(row[2], row[3]) for row in after])
+    return Affected(changed, after)
+
+
+def delete(conn, dwg):
+    ''' Delete the record of drawing no. dwg.  True if there was one.'''
+    before = conn.execute('SELECT part, description FROM dwgnos WHERE dwg = ?', (dwg,)).fetchall()
+    templates.count(conn, before, -1)
+    return conn.execute('DELETE FROM dwgnos WHERE dwg = ?', (dwg,)).rowcount > 0
+
+
+def _row(k):
+    # a copy of k; keys may have become strings, '0' to '4', on the way through json
+    return {int(key): value for key, value in k.items()}
+
+
+WRITES = {'add', 'apply_change', 'delete'}  # operations that need a write lock
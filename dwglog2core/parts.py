@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Part no. completion for the Add Record dialog.  While the user types a part
+no., the part nos. already in the log that begin with what was typed are
+offered, each with its description.  Asking sqlite on each key stroke would
+wait on the network share, so all distinct part nos. are read once, on the
+database thread, into a sorted list.  The part nos. beginning with a prefix
+are then a slice of that list, found with two binary searches (bisect): a
+few microseconds however long the log.
+"""
+
+from bisect import bisect_left
+
+END = '\U0010ffff'  # sorts after any character a part no. has
+
+
+def part_prefix(part):
+    ''' The first four digits and dash of a part no., e.g. 6890- of
+    6890-2020-401, or '' if part doesn't begin that way.
+    '''
+    if len(part) >= 5 and part[:4].isdigit() and part[4] == '-':
+        return part[:5]
+    return ''
+
+
+class PartIndex:
+    ''' The distinct part nos. of the log, sorted, each with the description
+    of its newest record.
+
+    Parameters
+    ----------
+    rows: iterable, optional
+        (part, description) tuples, oldest record first, e.g. from
+        Store.parts().
+    '''
+    def __init__(self, rows=()):
+        latest = {}
+        for part, description in rows:
+            if part:
+                latest[part] = description or ''  # a newer record's replaces an older's
+        self.parts = sorted(latest)
+        self.descriptions = [latest[part] for part in self.parts]
+        self._prefixes = {part_prefix(part) for part in self.parts} - {''}
+
+    def __len__(self):
+        return len(self.parts)
+
+    def add(self, part, description):
+        ''' Add a part no., or give one already there description.'''
+        if not part:
+            return
+        i = bisect_left(self.parts, part)
+        if i < len(self.parts) and self.parts[i] == part:
+            self.descriptions[i] = description or ''
+        else:
+            self.parts.insert(i, part)
+            self.descriptions.insert(i, description or '')
+            if part_prefix(part):
+                self._prefixes.add(part_prefix(part))
+
+    def update(self, rows):
+        ''' Add the part nos. of rows, records with their dwg_index first,
+        e.g. those that Store.add() returns.
+        '''
+        for row in rows:
+            self.add(row[2], row[3])
+
+    def _span(self, prefix):
+        return (bisect_left(self.parts, prefix),
+                bisect_left(self.parts, prefix + END))
+
+    def count(self, prefix):
+        ''' The number of part nos. beginning with prefix.'''
+        i, j = self._span(prefix)
+        return j - i
+
+    def complete(self, prefix, limit=50):
+        ''' The part nos. beginning with prefix, in order, with their
+        descriptions: a list of at most limit (part, description) tuples.
+        '''
+        i, j = self._span(prefix)
+        j = min(j, i + limit)
+        return list(zip(self.parts[i:j], self.descriptions[i:j]))
+
+    def describe(self, part):
+        ''' The description of part no. part, or None if it isn't in the log.'''
+        i = bisect_left(self.parts, part)
+        if i < len(self.parts) and self.parts[i] == part:
+            return self.descriptions[i]
+        return None
+
+    def prefixes(self):
+        ''' The distinct four digit prefixes, e.g. 6890-, of the log's part
+        nos., sorted.
+        '''
+        return sorted(self._prefixes)
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Kenneth E. Carlton
+
+Turns what a user types into the search box into an sqlite query.  See the
+"Search the database" section of dwglog2_help.html for the syntax.
+
+A search is first parsed into a tree (parse), which is then compiled to sql
+(to_sql).  What the user typed only ever goes into the parameters, never
+into the sql itself: a quote or a bracket can't break the statement, and
+searches of the same shape, e.g. any two searches for one word, give the
+same sql.  sqlite3 keeps the statements it has prepared, by sql, in the
+connection's statement cache, so a search of a shape already seen is not
+parsed and planned again.
+"""
+
+import re
+from collections import namedtuple
+
+from . import dates
+
+COLUMNS = 'dwg, part, description, date, author'
+
+# A trigram index can only narrow down a GLOB pattern that has at least this
+# many characters in a row that are not wildcards.
+MIN_LITERAL = 3
+
+# Field prefixes that limit a search term to one column, e.g. author:rcollins
+SCOPES = {'dwg': 'dwg', 'part': 'part', 'desc': 'description',
+          'description': 'description', 'date': 'date', 'author': 'author'}
+
+WILDCARDS = '*?['
+
+Term = namedtuple('Term', 'column pattern')
+Term.__doc__ = ''' One search term: pattern, a GLOB pattern (or for dwg and
+date a range, e.g. 2020400..2020450), to look for in column, or in every
+column if column is None.'''
+
+_SCOPE = re.compile(r'\s*([A-Za-z]+):')
+
+
+def longest_literal(pattern):
+    ''' Length of the longest run of non-wildcard characters in a GLOB
+    pattern, e.g. 7 for *PIPING*, 2 for 09*, 3 for 1[12]/*/2020.
+    '''
+    longest = run = i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch in '*?':
+            run = 0
+        elif ch == '[':  # a character class, e.g. [12] or [^]a]
+            run = 0
+            j = i + 1
+            if pattern[j:j+1] == '^':
+                j += 1
+            if pattern[j:j+1] == ']':
+                j += 1
+            k = pattern.find(']', j)
+            i = len(pattern) if k == -1 else k
+        else:
+            run += 1
+            longest = max(longest, run)
+        i += 1
+    return longest
+
+
+def parse(searchterm):
+    ''' Parse a search like "09*; 11/*/2020 or desc:*TANK*" into a tree.
+
+    Groups separated by " or " are alternatives (OR); the terms of a group,
+    separated by ;, must all match (AND).  A term may start with a field
+    prefix, e.g. author:rcollins (see SCOPES).  A pattern in double quotes,
+    e.g. desc:"*PUMP or MOTOR*", is taken as it is, ; and " or " included.
+    (A double quote elsewhere, as in 24"OD, is an ordinary character.)
+    Empty terms and groups are left out.
+
+    Returns
+    -------
+    tuple
+        Groups, each a tuple of Terms.  A search with no terms at all gives
+        one group of one Term with an empty pattern.
+    '''
+    groups, terms = [], []
+    i = 0
+    while True:
+        term, i = _term(searchterm, i)
+        if term.pattern:
+            terms.append(term)
+        if i >= len(searchterm):
+            break
+        if searchterm[i] == ';':
+            i += 1
+        else:  # " or "
+            if terms:
+                groups.append(tuple(terms))
+            terms = []
+            i += 4
+    if terms:
+        groups.append(tuple(terms))
+    return tuple(groups) or ((Term(None, ''),),)
+
+
+def _separator(searchterm, i):
+    # position of the ; or " or " that ends the term starting at i
+    ends = [j for j in (searchterm.find(';', i), searchterm.find(' or ', i)) if j != -1]
+    return min(ends) if ends else len(searchterm)
+
+
+def _term(searchterm, i):
+    # the term starting at position i, and the position of what ends it
+    column, start = None, i
+    m = _SCOPE.match(searchterm, i)
+    if m and m.group(1).lower() in SCOPES:
+        column, start = SCOPES[m.group(1).lower()], m.end()
+    rest = searchterm[start:].lstrip()
+    if rest[:1] == '"':
+        begin = len(searchterm) - len(rest) + 1
+        close = searchterm.find('"', begin)
+        while close != -1:
+            end = _separator(searchterm, close + 1)
+            if not searchterm[close + 1:end].strip():
+                return Term(column, searchterm[begin:close]), end
+            close = searchterm.find('"', close + 1)
+    end = _separator(searchterm, start)
+    if column is None:
+        return Term(None, searchterm[i:end].strip()), end
+    return Term(column, searchterm[start:end].strip()), end
+
+
+def unparse(groups):
+    ''' The search, as it would be typed, that parses to groups.'''
+    names = {column: name for name, column in SCOPES.items() if name != 'description'}
+    texts = []
+    for terms in groups:
+        words = []
+        for column, pattern in terms:
+            if (';' in pattern or ' or ' in pattern or pattern[:1] == '"'
+                    or pattern != pattern.strip()
+                    or (column is None and _SCOPE.match(pattern)
+                        and _SCOPE.match(pattern).group(1).lower() in SCOPES)):
+                pattern = '"' + pattern + '"'
+            words.append(pattern if column is None else names[column] + ':' + pattern)
+        texts.append('; '.join(words))
+    return ' or '.join(texts)
+
+
+def placeholders(values):
+    ''' "?,?,...", and values to go with it, for an IN (...) list.  values is
+    padded, by repeating its last value, to a power of two, so that lists of
+    many lengths share a few statements in the statement cache.
+    '''
+    values = list(values)
+    size = 1
+    while size < len(values):
+        size *= 2
+    values += values[-1:] * (size - len(values))
+    return ','.join('?' * len(values)), values
+
+
+def compile_range(column, spec):
+    ''' Compile dwg:2020400..2020450 (spec is 2020400..2020450) or date:... to
+    an sqlite expression.  Either end may be left off.  ValueError is raised
+    if spec doesn't make sense.
+    '''
+    if column == 'date':
+        lo, hi = dates.date_range(spec)
+    else:
+        lo, hi = (_dwg(bound) if bound.strip() else None for bound in spec.split('..', 1))
+        if lo is None and hi is None:
+            raise ValueError('Drawing no. range has no numbers: ' + spec)
+    if lo is None:
+        return column + ' <= ?', [hi]
+    if hi is None:
+        return column + ' >= ?', [lo]
+    return column + ' BETWEEN ? AND ?', [lo, hi]
+
+
+def _dwg(number):
+    number = number.strip()
+    if not number.isdigit():
+        raise ValueError('Not a drawing no.: ' + number)
+    return int(number)  # dwg has numeric affinity; compare numbers, not text
+
+
+def compile_scoped(column, pattern, fts=False):
+    ''' Compile a term limited to one column, e.g. part:6890-*, to a single
+    predicate on that column, so that sqlite can use the column's index.
+
+    Parameters
+    ----------
+    column: str
+        dwg, part, description, date or author; see split_scope.
+    pattern: str
+        What to look for in the column: a GLOB pattern, or for dwg and date
+        a range like 2020400..2020450.
+    fts: bool, optional
+        As for compile_term.  Only used for a pattern that the column's own
+        index can't narrow down, like *TANK*.
+
+    Returns
+    -------
+    tuple
+        (expression, parameters)
+    '''
+    wild = any(ch in pattern for ch in WILDCARDS)
+    if column == 'date':
+        if not wild:
+            return compile_range(column, pattern)
+        pattern = dates.glob_to_iso(pattern) or pattern  # e.g. 11/*/2020 -> 2020-11-*
+    elif column == 'dwg':
+        if '..' in pattern:
+            return compile_range(column, pattern)
+        if not wild:
+            return 'dwg = ?', [_dwg(pattern)]
+    if not wild:
+        if column == 'description':  # its index is case insensitive
+            return 'description = ? COLLATE NOCASE AND description = ?', [pattern, pattern]
+        return column + ' = ?', [pattern]
+    if (fts and pattern[:1] in WILDCARDS and column != 'date'
+            and longest_literal(pattern) >= MIN_LITERAL):
+        return ('dwg_index IN (SELECT rowid FROM dwgnos_fts WHERE %s GLOB ?)' % column,
+                [pattern])
+    # a pattern that starts with a literal, like 6890-*, is a range of the
+    # column's index
+    return column + ' GLOB ?', [pattern]
+
+
+def compile_term(term, fts=False):
+    ''' Compile one search term, e.g. BASEPLATE*, date:2020-01..2020-03 or
+    author:rcollins, to an sqlite expression.  A term with a field prefix
+    looks in that column only; one without looks in all of them.
+
+    Parameters
+    ----------
+    term: Term
+        one search term; see parse
+    fts: bool, optional
+        The full text index dwgnos_fts exists.  Use it for GLOB patterns that
+        it can narrow down.  The default is False.
+
+    Returns
+    -------
+    tuple
+        (expression, parameters)
+    '''
+    if term.column is not None:
+        return compile_scoped(term.column, term.pattern, fts)
+    term = term.pattern
+    datepattern = dates.glob_to_iso(term) or term  # e.g. 11/*/2020 -> 2020-11-*
+    if fts and min(longest_literal(term), longest_literal(datepattern)) >= MIN_LITERAL:
+        # Same result as the GLOBs below, but found via the trigram index
+        # rather than by reading every row of dwgnos.
+        return ('dwg_index IN (SELECT rowid FROM dwgnos_fts WHERE dwg GLOB ? '
+                'UNION ALL SELECT rowid FROM dwgnos_fts WHERE part GLOB ? '
+                'UNION ALL SELECT rowid FROM dwgnos_fts WHERE description GLOB ? '
+                'UNION ALL SELECT rowid FROM dwgnos_fts WHERE author GLOB ? '
+                'UNION ALL SELECT rowid FROM dwgnos_fts WHERE date GLOB ?)',
+                [term, term, term, term, datepattern])
+    return ('(dwg GLOB ? OR part GLOB ? OR description GLOB ? OR author GLOB ? '
+            'OR date GLOB ?)', [term, term, term, term, datepattern])
+
+
+def compile_search(searchterm, fts=False, columns=COLUMNS, indexes=None, before=None):
+    ''' Compile a search query like "09*; 11/*/2020 or 09*; 12/*/2020" into
+    an sqlite SELECT statement.  Terms separated by ; must all match (AND);
+    groups separated by " or " are alternatives (OR).  See parse.
+
+    Parameters
+    ----------
+    searchterm: str
+        What the user typed into the search box.
+    fts: bool, optional
+        Use the full text index dwgnos_fts where it helps.  Otherwise, or if
+        no term is suitable, patterns are matched with GLOB against every
+        row.  The results are the same either way.  The default is False.
+    columns: str, optional
+        Columns to select.  The default is COLUMNS.
+    indexes: list, optional
+        Only look at the records having these dwg_index values, e.g. to see
+        which of some changed records the search finds.  The default is None.
+    before: int, optional
+        Only look at records older than the one with this dwg_index, e.g. to
+        read the next page of results (see ops.search).  The default is None.
+
+    Returns
+    -------
+    tuple
+        (sql, parameters).  ValueError is raised if a term, like a date
+        range, doesn't make sense.
+    '''
+    return to_sql(parse(searchterm), fts, columns, indexes, before)
+
+
+def to_sql(groups, fts=False, columns=COLUMNS, indexes=None, before=None):
+    ''' Compile groups, a search parsed by parse, into an sqlite SELECT
+    statement.  The arguments and result are as for compile_search.
+    '''
+    expressions, params = [], []
+    for terms in groups:
+        # Of terms that must all match, look up just one via the full text
+        # index and check the others against the rows found.  Prefer a
+        # substring search (*TANK*) over an exact one (kcarlton): the latter
+        # usually matches many rows of one column.
+        indexed = max(terms, key=_rank) if fts else None
+        ands = []
+        for term in terms:
+            expression, p = compile_term(term, term is indexed)
+            ands.append(expression)
+            params.extend(p)
+        expressions.append('(' + ' AND '.join(ands) + ')')
+    where = ' OR '.join(expressions)
+    if indexes is not None:
+        marks, values = placeholders(indexes)
+        where = 'dwg_index IN (%s) AND (%s)' % (marks, where)
+        params = values + params
+    if before is not None:
+        where = 'dwg_index < ? AND (%s)' % where
+        params = [before] + params
+    sql = 'SELECT ' + columns + ' FROM dwgnos WHERE ' + where + ' ORDER BY dwg_index DESC'
+    return sql, params
+
+
+def _rank(term):
+    return term.pattern[:1] in ('*', '?'), longest_literal(term.pattern)
+
+
+def as_you_type(searchterm):
+    ''' The search run while the user is still typing searchterm.  Terms
+    without a wildcard are looked for anywhere in a field, e.g. BASEP as
+    *BASEP* and desc:TAN as desc:*TAN*, so that rows show before a whole
+    word is typed.
+    '''
+    groups = []
+    for terms in parse(searchterm):
+        typed = []
+        for column, pattern in terms:
+            if not pattern:  # nothing typed yet
+                continue
+            # dates and dwg nos. are left as they are: ranges, or exact
+            if column not in ('date', 'dwg') and not any(ch in pattern for ch in WILDCARDS):
+                pattern = '*' + pattern + '*'
+            typed.append(Term(column, pattern))
+        if typed:
+            groups.append(tuple(typed))
+    return unparse(groups)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+A local copy, a replica, of a dwglog2.db that is on a network share.  Every
+query against the share pays the network's latency, and a search that reads
+the whole table pays it many times over.  So, optionally, searches and the
+main table are read from a replica kept in the user's own data directory
+(next to settings.txt), while adds and changes still go to the master file
+on the share.
+
+The replica catches up from the dwgchanges journal of the master (see
+schema._dwgchanges): it asks for the dwg_index of every record changed
+since the last time, then copies over just those records.  When nothing has
+changed that is a single small query.  It does so before a read if its last
+catch-up is more than max_age seconds old, and right after this program
+writes to the master, so users always see their own changes at once and
+other users' changes within max_age seconds.
+"""
+
+import os
+import sqlite3
+import time
+
+from . import schema
+
+
+class Replica:
+    ''' A local copy of the master database of store.
+
+    Parameters
+    ----------
+    store: Store
+        The Store connected to the master dwglog2.db.
+    replicafile: str
+        pathname of the local copy, e.g. ~/.dwglog2/replica.db.  Created if
+        it doesn't exist.
+    max_age: float, optional
+        Staleness bound: seconds that may pass before the replica must catch
+        up with the master again.  0 means catch up before every read.  The
+        default is 2.0.
+    '''
+    def __init__(self, store, replicafile, max_age=2.0):
+        self.store = store
+        self.replicafile = replicafile
+        self.max_age = max_age
+        self.synced_at = 0.0  # time.monotonic() of the last catch up
+        self.last_seq = 0     # the master's dwgchanges seq the replica is up to
+        self.copies = 0       # full copies made; for the benchmark
+        self._conn = sqlite3.connect(replicafile)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS replica_state(master TEXT, last_seq INTEGER)')
+        row = self._conn.execute('SELECT master, last_seq FROM replica_state').fetchone()
+        if row and row[0] == os.path.abspath(store.sqldatafile):
+            self.last_seq = row[1]
+        else:
+            self.copy()
+
+    @property
+    def conn(self):
+        return self._conn
+
+    def staleness(self):
+        ''' Seconds since the replica last caught up with the master.'''
+        return time.monotonic() - self.synced_at
+
+    def expire(self):
+        ''' Make the next read catch up first, e.g. after a write to the master.'''
+        self.synced_at = 0.0
+
+    def copy(self):
+        ''' Replace the replica by a complete copy of the master.'''
+        self.store.retry(self.store.conn.backup, self._conn)
+        with self._conn:
+            # the journal's triggers would only make the replica grow
+            for trigger in ('dwgchanges_insert', 'dwgchanges_delete', 'dwgchanges_update'):
+                self._conn.execute('DROP TRIGGER IF EXISTS ' + trigger)
+            self._conn.execute('CREATE TABLE IF NOT EXISTS replica_state(master TEXT, last_seq INTEGER)')
+            self.last_seq = schema.last_change(self._conn)
+            self._conn.execute('DELETE FROM dwgchanges')
+            self._conn.execute('DELETE FROM replica_state')
+            self._conn.execute('INSERT INTO replica_state VALUES (?, ?)',
+                               (os.path.abspath(self.store.sqldatafile), self.last_seq))
+        self.copies += 1
+        self.synced_at = time.monotonic()
+
+    def sync(self):
+        ''' Catch up with the master.
+
+        Returns
+        -------
+        int
+            Number of records copied over or removed.  -1 if a complete copy
+            of the master was made.
+        '''
+        version = schema.user_version(self._conn)
+        since = self.last_seq
+        t0 = time.monotonic()
+
+        def changes(conn):
+            # one statement, i.e. one round trip, if nothing changed
+            first, last, master_version = conn.execute(
+                'SELECT MIN(seq), MAX(seq), (SELECT user_version FROM pragma_user_version) '
+                'FROM dwgchanges').fetchone()
+            if master_version != version:
+                return None  # the master was migrated; copy it anew
+            if last is not None and (last < since or first > since + 1):
+                return None  # the journal was cut short, or the file replaced
+            if last is None or last == since:
+                return since, [], []
+            log = conn.execute('SELECT seq, dwg_index FROM dwgchanges WHERE seq > ? '
+                               'ORDER BY seq', (since,)).fetchall()
+            indexes = sorted({dwg_index for seq, dwg_index in log})
+            rows = []
+            for i in range(0, len(indexes), 500):  # stay below sqlite's limit of variables
+                chunk = indexes[i:i+500]
+                rows += conn.execute('SELECT * FROM dwgnos WHERE dwg_index IN (%s)'
+                                     % ','.join('?'*len(chunk)), chunk).fetchall()
+            return log[-1][0], indexes, rows
+
+        pulled = self.store.run(changes)
+        if pulled is None:
+            self.copy()
+            return -1
+        seq, indexes, rows = pulled
+        if indexes:
+            with self._conn:
+                for i in range(0, len(indexes), 500):
+                    chunk = indexes[i:i+500]
+                    self._conn.execute('DELETE FROM dwgnos WHERE dwg_index IN (%s)'
+                                       % ','.join('?'*len(chunk)), chunk)
+                if rows:
+                    self._conn.executemany('INSERT INTO dwgnos VALUES (%s)'
+                                           % ','.join('?'*len(rows[0])), rows)
+                self._conn.execute('UPDATE replica_state SET last_seq = ?', (seq,))
+        self.last_seq = seq
+        self.synced_at = t0  # what the replica now holds was current at t0
+        return len(indexes)
+
+    def run(self, func, *args):
+        ''' Call func(conn, *args) on the replica, after catching up if the
+        last catch up is more than max_age seconds old.
+        '''
+        if self.staleness() > self.max_age:
+            self.sync()
+        with self._conn:
+            return func(self._conn, *args)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Kenneth E. Carlton
+
+The one place where the layout of the dwglog2.db database is defined.
+
+A database file records, in PRAGMA user_version, the number of migrations
+that have been applied to it.  migrate() applies, in order, those that have
+not.  So an existing dwglog2.db is upgraded in place the first time a newer
+dwglog2 program opens it.  To change the layout, append a function to
+MIGRATIONS; never alter one that has already been released.
+"""
+
+import re
+import sqlite3
+
+from . import dates
+
+# The dwgnos table as it was created by the first release of dwglog2
+# (migration 0).  Later changes are made by the functions in MIGRATIONS.
+DWGNOS = '''CREATE TABLE IF NOT EXISTS
+            dwgnos(dwg_index INTEGER PRIMARY KEY NOT NULL UNIQUE,
+            dwg KEY NOT NULL UNIQUE, part TEXT,
+            description TEXT, date TEXT NOT NULL, author TEXT)'''
+
+
+def _add_indexes(conn):
+    ''' Searches on part, author, and date, and case insensitive searches on
+    description, were table scans.  (dwg and dwg_index are already indexed.)
+    '''
+    conn.execute('CREATE INDEX IF NOT EXISTS dwgnos_part ON dwgnos(part)')
+    conn.execute('CREATE INDEX IF NOT EXISTS dwgnos_author ON dwgnos(author)')
+    conn.execute('CREATE INDEX IF NOT EXISTS dwgnos_date ON dwgnos(date)')
+    conn.execute('''CREATE INDEX IF NOT EXISTS dwgnos_description_nocase
+                    ON dwgnos(description COLLATE NOCASE)''')
+
+
+def _iso_dates(conn):
+    ''' Dates were stored as MM/DD/YYYY, which neither sorts nor can be
+    searched by range with an index.  Store them as YYYY-MM-DD.  A date that
+    can't be understood is left as it is.
+    '''
+    rows = conn.execute("SELECT dwg_index, date FROM dwgnos WHERE date LIKE '%/%'").fetchall()
+    updates = []
+    for dwg_index, _date in rows:
+        try:
+            updates.append((dates.to_iso(_date), dwg_index))
+        except ValueError:
+            pass
+    conn.executemany('UPDATE dwgnos SET date = ? WHERE dwg_index = ?', updates)
+
+
+def _dwgcounter(conn):
+    ''' Drawing numbers were found with SELECT ... ORDER BY dwg_index DESC
+    LIMIT 1 followed by an INSERT, so two users adding at once could collide.
+    Keep the last dwg_index of each year in a counter row instead (see
+    allocator.py).  The triggers keep the counter ahead of any dwg_index put
+    into dwgnos some other way: a drawing no. changed by hand, an import, or
+    an older dwglog2 program.
+    '''
+    conn.execute('''CREATE TABLE IF NOT EXISTS
+                    dwgcounter(year INTEGER PRIMARY KEY NOT NULL,
+                    last_index INTEGER NOT NULL)''')
+    conn.execute('''INSERT OR IGNORE INTO dwgcounter(year, last_index)
+                    SELECT dwg_index / 100000, MAX(dwg_index) FROM dwgnos
+                    WHERE dwg_index BETWEEN 100000000 AND 999999999
+                    GROUP BY dwg_index / 100000''')
+    bump = '''INSERT INTO dwgcounter(year, last_index)
+              SELECT new.dwg_index / 100000, new.dwg_index
+              WHERE new.dwg_index BETWEEN 100000000 AND 999999999
+              ON CONFLICT(year) DO UPDATE SET last_index = excluded.last_index
+              WHERE excluded.last_index > last_index;'''
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgcounter_insert
+                    AFTER INSERT ON dwgnos BEGIN %s END''' % bump)
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgcounter_update
+                    AFTER UPDATE OF dwg_index ON dwgnos BEGIN %s END''' % bump)
+
+
+def _dwgchanges(conn):
+    ''' A journal of changed records, for local replicas (see replica.py) and
+    for refreshing open views: each insert, update, or delete of a record
+    appends the record's dwg_index to dwgchanges.  seq only goes up
+    (AUTOINCREMENT), so "what changed since seq N" is one indexed query.  An
+    update that changes dwg_index logs both the old and the new dwg_index.
+    '''
+    conn.execute('''CREATE TABLE IF NOT EXISTS
+                    dwgchanges(seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    dwg_index INTEGER NOT NULL)''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgchanges_insert AFTER INSERT ON dwgnos BEGIN
+                        INSERT INTO dwgchanges(dwg_index) VALUES (new.dwg_index);
+                    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgchanges_delete AFTER DELETE ON dwgnos BEGIN
+                        INSERT INTO dwgchanges(dwg_index) VALUES (old.dwg_index);
+                    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgchanges_update AFTER UPDATE ON dwgnos BEGIN
+                        INSERT INTO dwgchanges(dwg_index) VALUES (old.dwg_index);
+                        INSERT INTO dwgchanges(dwg_index) SELECT new.dwg_index
+                            WHERE new.dwg_index <> old.dwg_index;
+                    END''')
+
+
+def _dwgtemplates(conn):
+    ''' Description suggestions for the Add Record dialog were only those of
+    pndescrip, kept up by hand.  Keep how often each description template
+    is used for each four digit prefix of a part no. (see templates.py).
+    The templates are counted here as templates.py counted them at the
+    time, so that later changes to templates.py don't change this
+    migration.
+    '''
+    conn.execute('''CREATE TABLE IF NOT EXISTS
+                    dwgtemplates(prefix INTEGER NOT NULL, template TEXT NOT NULL,
+                    uses INTEGER NOT NULL, PRIMARY KEY(prefix, template)) WITHOUT ROWID''')
+    number = re.compile(r'\d+(?:[./]\d+)*')
+    uses = {}
+    for part, description in conn.execute(
+            "SELECT part, description FROM dwgnos WHERE part LIKE '____-%'"):
+        if part[:4].isdigit() and description and description.strip():
+            key = (int(part[:4]), number.sub('?', description.strip()))
+            uses[key] = uses.get(key, 0) + 1
+    conn.execute('DELETE FROM dwgtemplates')
+    conn.executemany('INSERT INTO dwgtemplates(prefix, template, uses) VALUES (?,?,?)',
+                     [key + (n,) for key, n in uses.items()])
+
+
+def _iso_dates_trigger(conn):
+    ''' _iso_dates converted the dates there were, but an older dwglog2
+    program, still used by some users, goes on writing MM/DD/YYYY.  Such a
+    date would fall outside every date range searched for and sort wrongly.
+    Convert each one as it is written.  A date that isn't a date, e.g.
+    02/31/2020, is left as it is.
+    '''
+    usa = "new.date GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'"
+    iso = "substr(new.date, 7, 4) || '-' || substr(new.date, 1, 2) || '-' || substr(new.date, 4, 2)"
+    convert = '''WHEN %s AND date(%s, '+0 days') = %s BEGIN
+                   UPDATE dwgnos SET date = %s WHERE dwg_index = new.dwg_index;
+                 END''' % (usa, iso, iso, iso)
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgnos_iso_date_insert
+                    AFTER INSERT ON dwgnos %s''' % convert)
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgnos_iso_date_update
+                    AFTER UPDATE OF date ON dwgnos %s''' % convert)
+
+
+def _prune_dwgchanges(conn):
+    ''' Nothing removed entries from the dwgchanges journal, so on a file in
+    use for years it would grow as large as the log.  Keep only the latest
+    10,000 entries, pruning the older ones every 1,000 entries.  A replica or
+    an open view that falls further behind than that reads everything again
+    (see replica.Replica.sync and ops.changes).
+    '''
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgchanges_prune AFTER INSERT ON dwgchanges
+                    WHEN new.seq % 1000 = 0 BEGIN
+                        DELETE FROM dwgchanges WHERE seq <= new.seq - 10000;
+                    END''')
+    conn.execute('''DELETE FROM dwgchanges
+                    WHERE seq <= (SELECT MAX(seq) FROM dwgchanges) - 10000''')
+
+
+MIGRATIONS = [_add_indexes, _iso_dates, _dwgcounter, _dwgchanges, _dwgtemplates,
+              _iso_dates_trigger, _prune_dwgchanges]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def user_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def last_change(conn):
+    ''' seq of the latest entry of the dwgchanges journal; 0 if none.'''
+    return conn.execute('SELECT MAX(seq) FROM dwgchanges').fetchone()[0] or 0
+
+
+def needs_migration(conn):
+    ''' True if the database file is older than this program.  Cheap; only
+    reads the database header.
+    '''
+    return user_version(conn) < SCHEMA_VERSION
+
+
+def migrate(conn):
+    ''' Create the dwgnos table if it doesn't exist, then apply any
+    migrations not yet applied.  Call inside of a write transaction (e.g. via
+    Store.write) so that two users starting dwglog2 at the same moment don't
+    both apply the same migration.
+
+    Parameters
+    ----------
+    conn: sqlite3.Connection
+        connection to a dwglog2.db file
+
+    Returns
+    -------
+    int
+        The schema version of the database after migrating.
+    '''
+    conn.execute(DWGNOS)
+    version = user_version(conn)
+    for v in range(version, SCHEMA_VERSION):
+        MIGRATIONS[v](conn)
+        conn.execute('PRAGMA user_version = %d' % (v + 1))
+    return max(version, SCHEMA_VERSION)
+
+
+# Optional full text index, for fast substring searches (e.g. *SEPARATOR*).
+# It is not one of the MIGRATIONS because every dwglog2 program writing to
+# the database must be able to load the fts5 trigram tokenizer (SQLite 3.34
+# or later); the triggers below otherwise make its writes fail.  So an
+# administrator switches it on, with 'fts' in settings.txt, once all users
+# have a dwglog2 program that supports it.
+FTS_COLUMNS = ('dwg', 'part', 'description', 'author', 'date')
+
+
+def fts_available():
+    ''' Does the sqlite library in use have the fts5 trigram tokenizer?'''
+    try:
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x, tokenize='trigram')")
+        conn.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def has_fts(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'dwgnos_fts'").fetchone() is not None
+
+
+def create_fts(conn):
+    ''' Create the full text index dwgnos_fts, fill it from dwgnos, and add
+    triggers that keep it in step with dwgnos.  The index holds no copy of the
+    data (content='dwgnos'), just trigrams.  The trigram tokenizer is case
+    sensitive, like the GLOB searches it serves.  Call inside of a write
+    transaction.
+    '''
+    cols = ', '.join(FTS_COLUMNS)
+    new = ', '.join('new.' + c for c in FTS_COLUMNS)
+    old = ', '.join('old.' + c for c in FTS_COLUMNS)
+    conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS dwgnos_fts USING fts5(
+                    %s, content='dwgnos', content_rowid='dwg_index',
+                    tokenize='trigram case_sensitive 1')''' % cols)
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgnos_fts_insert AFTER INSERT ON dwgnos BEGIN
+                        INSERT INTO dwgnos_fts(rowid, %s) VALUES (new.dwg_index, %s);
+                    END''' % (cols, new))
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgnos_fts_delete AFTER DELETE ON dwgnos BEGIN
+                        INSERT INTO dwgnos_fts(dwgnos_fts, rowid, %s) VALUES ('delete', old.dwg_index, %s);
+                    END''' % (cols, old))
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS dwgnos_fts_update AFTER UPDATE ON dwgnos BEGIN
+                        INSERT INTO dwgnos_fts(dwgnos_fts, rowid, %s) VALUES ('delete', old.dwg_index, %s);
+                        INSERT INTO dwgnos_fts(rowid, %s) VALUES (new.dwg_index, %s);
+                    END''' % (cols, old, cols, new))
+    conn.execute("INSERT INTO dwgnos_fts(dwgnos_fts) VALUES ('rebuild')")
+
+
+def drop_fts(conn):
+    ''' Remove the full text index and its triggers.'''
+    for trigger in ('dwgnos_fts_insert', 'dwgnos_fts_delete', 'dwgnos_fts_update'):
+        conn.execute('DROP TRIGGER IF EXISTS ' + trigger)
+    conn.execute('DROP TABLE IF EXISTS dwgnos_fts')
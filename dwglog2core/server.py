@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Server mode.  Over an SMB share every dwglog2 client locks dwglog2.db
+across the network, and one slow client holds up all the others.  Instead
+one server process, run on the machine that has dwglog2.db on its local
+disk, can hold the only connection to the file.  dwglog2 clients then send
+their requests to it, as JSON over HTTP:
+
+    python -m dwglog2core serve --port 8765
+
+and, in each user's settings.txt, 'server': 'http://cadserver:8765'.
+
+POST /api with a body of one request, {"op": "search", "args": {...}}, or a
+list of them, which are then carried out in one transaction.  The reply is
+{"result": ...} or {"error": "...", "type": "..."} per request, in the same
+form (one or a list).  The operations are those of ops.py.  GET /api returns
+the server's version.
+
+HTTP requests are handled by one thread each, but all database work is done
+by a single thread that owns the connection.  That thread takes all
+requests waiting in its queue at once and carries them out in a single
+transaction, so that under load many adds cost one commit, i.e. one flush to
+disk, rather than one each.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import ops, validate
+from .store import Store, DatabaseBusyError
+
+
+VERSION = 1
+OPERATIONS = ('latest', 'search', 'get', 'peek', 'stats', 'add',
+              'plan_change', 'apply_change', 'delete', 'last_change', 'changes', 'rows',
+              'parts', 'descriptions', 'templates_used')
+
+
+class Job:
+    ''' One request, waiting for the database thread.'''
+    def __init__(self, op, args):
+        self.op = op
+        self.args = args
+        self.reply = None
+        self.done = threading.Event()
+
+
+def error(er):
+    ''' The reply for a request that raised the exception er.'''
+    if isinstance(er, DatabaseBusyError):
+        kind = 'busy'
+    elif isinstance(er, validate.ChangeRejected):
+        kind = 'rejected'
+    elif isinstance(er, (ValueError, TypeError, KeyError)):
+        kind = 'value'
+    elif isinstance(er, sqlite3.Error):
+        kind = 'sqlite'
+    else:
+        kind = 'error'
+    return {'error': str(er), 'type': kind}
+
+
+def jsonable(op, result):
+    ''' Results of ops functions in a form that json can send.'''
+    if op == 'plan_change':
+        return result._asdict() if result else None
+    if op == 'apply_change':
+        return result._asdict()
+    return result
+
+
+class DatabaseThread(threading.Thread):
+    ''' Owns the Store.  Carries out the lists of Jobs put into self.jobs
+    (see submit).
+
+    Parameters
+    ----------
+    store: Store
+        A Store that has not been used by any other thread.  Its connection
+        is opened by this thread.
+    sqldatafile: str
+        pathname of the dwglog2.db file
+    batch: int, optional
+        Most requests carried out in one transaction.  The default is 100.
+    '''
+    def __init__(self, store, sqldatafile, batch=100):
+        super().__init__(name='dwglog2 database', daemon=True)
+        self.store = store
+        self.sqldatafile = sqldatafile
+        self.batch = batch
+        self.jobs = queue.Queue()
+        self.ready = threading.Event()
+        self.failure = None  # why the file could not be opened
+        self.transactions = 0  # for the benchmark: requests / transactions
+        self.requests = 0
+
+    def run(self):
+        try:
+            self.store.connect(self.sqldatafile)
+        except Exception as er:
+            self.failure = er
+            return
+        finally:
+            self.ready.set()
+        while True:
+            jobs = self.jobs.get()  # a list of Jobs, or None to stop
+            stop = jobs is None
+            jobs = list(jobs or [])
+            while not stop and len(jobs) < self.batch:
+                try:
+                    more = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                else:
+                    jobs.extend(more)
+            if jobs:
+                self.carry_out(jobs)
+            if stop:
+                self.store.close()
+                return
+
+    def carry_out(self, jobs):
+        ''' Carry out jobs in one transaction.  Each job is wrapped in a
+        savepoint, so one that fails doesn't undo the others.
+        '''
+        def batch(conn):
+            replies = []
+            for job in jobs:
+                conn.execute('SAVEPOINT job')
+                try:
+                    func = getattr(ops, job.op)
+                    if job.op in ('search', 'rows'):
+                        job.args['fts'] = self.store.has_fts
+                    replies.append({'result': jsonable(job.op, func(conn, **job.args))})
+                    conn.execute('RELEASE job')
+                except Exception as er:
+                    conn.execute('ROLLBACK TO job')
+                    conn.execute('RELEASE job')
+                    replies.append(error(er))
+            return replies
+
+        writes = any(job.op in ops.WRITES for job in jobs)
+        try:
+            replies = (self.store.write if writes else self.store.run)(batch)
+        except Exception as er:
+            replies = [error(er)] * len(jobs)
+        self.transactions += 1
+        self.requests += len(jobs)
+        for job, reply in zip(jobs, replies):
+            job.reply = reply
+            job.done.set()
+
+    def submit(self, requests):
+        ''' Queue requests, a list of (op, args), to be carried out in one
+        transaction, and wait for their replies.
+        '''
+        jobs = [Job(op, dict(args or {})) for op, args in requests]
+        for job in jobs:
+            if job.op not in OPERATIONS:
+                job.reply = {'error': 'unknown operation: %s' % job.op, 'type': 'value'}
+                job.done.set()
+        self.jobs.put([job for job in jobs if not job.done.is_set()])
+        for job in jobs:
+            job.done.wait()
+        return [job.reply for job in jobs]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so clients reuse a connection
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/api':
+            return self.send_error(404)
+        self.reply({'server': 'dwglog2', 'version': VERSION})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/api':
+            return self.send_error(404)
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length))
+        except ValueError as er:
+            return self.reply({'error': 'bad request: %s' % er, 'type': 'value'})
+        requests = body if isinstance(body, list) else [body]
+        if not all(isinstance(r, dict) and isinstance(r.get('args') or {}, dict) for r in requests):
+            return self.reply({'error': 'bad request: not an {"op": ..., "args": ...} object',
+                               'type': 'value'})
+        replies = self.server.db.submit([(r.get('op'), r.get('args')) for r in requests])
+        self.reply(replies if isinstance(body, list) else replies[0])
+
+    def reply(self, obj):
+        data = json.dumps(obj).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # don't print a line per request
+
+
+class Server(ThreadingHTTPServer):
+    ''' The dwglog2 server.
+
+    Parameters
+    ----------
+    sqldatafile: str
+        pathname of the dwglog2.db file; should be on a local disk.
+    host: str, optional
+        Address to listen on.  The default is '127.0.0.1'; use '0.0.0.0'
+        to serve other machines.
+    port: int, optional
+        The default is 8765.  0 picks a free port (see self.server_address).
+    batch: int, optional
+        Most requests carried out in one transaction.  The default is 100.
+    store: Store, optional
+        Store to use, e.g. one configured from settings.txt.  The default is
+        a new Store with WAL switched on.
+    '''
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 refuses connections when many clients start at once
+
+    def __init__(self, sqldatafile, host='127.0.0.1', port=8765, batch=100, store=None):
+        super().__init__((host, port), Handler)
+        self.db = DatabaseThread(store or Store(wal=True), sqldatafile, batch)
+        self.db.start()
+        self.db.ready.wait()
+        if self.db.failure:
+            super().server_close()
+            raise self.db.failure
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def server_close(self):
+        super().server_close()
+        if self.db.is_alive():
+            self.db.jobs.put(None)
+            self.db.join()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Where the dwglog2 program keeps its settings, settings.txt, and how they
+are read.  Used by the GUI and by scripts alike.
+"""
+
+import os
+import sys
+
+
+def default_author():
+    ''' The user name of the person running the program, lower case, e.g.
+    kcarlton.  Used as the author of new records.
+    '''
+    if os.getenv('USERNAME'):
+        author = os.getenv('USERNAME')  # Works only on MS Windows
+        return author.replace('_', '').lower()
+    elif sys.platform[:3] == 'lin':  # I'm working on my Linux system
+        return 'kcarlton'
+    return 'unknown'
+
+
+def get_settingsfn():
+    '''Get the file name used to store settings for the dwglog2 program.
+    
+    1.  Get the pathname of the file named settings.txt.  It will be in a 
+    directory on a user's local machine and within his user folders.  On a 
+    Windows  machine the name will be something like 
+    C:\\Users\\Ken\\AppData\\Local\\dwglog2\\settings.txt.  And on a Linux
+    machine it will be something like /home/ken/.dwglog2/settings.txt.
+    
+    2.  If that filename didn't already exist, crete it, and put into it:
+    "{'configdb_location': '" + defaultsqldatafile + "'}" , where 
+    defaultsqldatafile will be the file named dwglog2.db and will be in the
+    same directory as that of settings.txt described in note 1 above.  So then,
+    the contents of the settings.txt file will look something like:
+        
+        "{'sqldatafile': 'C:\\Users\\Ken\\AppData\Local\\dwglog2\\dwglog2.db'}".
+        
+    (Pytnon requires \\ to represent a \ in a string)
+    '''
+    if sys.platform[:3] == 'win':
+        datadir = os.getenv('LOCALAPPDATA')
+        path = os.path.join(datadir, 'dwglog2')
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+        settingsfn = os.path.join(datadir, 'dwglog2', 'settings.txt')
+        defaultsqldatafile = os.path.join(datadir, 'dwglog2', 'dwglog2.db')
+                
+    elif sys.platform[:3] == 'lin' or sys.platform[:3] == 'dar':  # linux or darwin (Mac OS X)
+        homedir = os.path.expanduser('~')
+        path = os.path.join(homedir, '.dwglog2')
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True) 
+        settingsfn = os.path.join(homedir, '.dwglog2', 'settings.txt')
+        defaultsqldatafile = os.path.join(homedir, '.dwglog2', 'dwglog2.db')
+            
+    else:
+        printStr = ('At function "get_settingsfn", a suitable path was not found to create\n'
+                    'a file named settings.txt.  Notify the programmer of this error.')
+        print(printStr) 
+        return ''
+    
+    _bool = os.path.exists(settingsfn)
+    if not _bool or (_bool and os.path.getsize(settingsfn) == 0):
+        with open(settingsfn, 'w') as file: 
+            file.write("{'sqldatafile': '" + defaultsqldatafile + "'}")
+                
+    return settingsfn
+
+
+def get_settings():
+    '''
+    Get the settings stored in the file settings.txt.  Besides 'sqldatafile',
+    the settings that an administrator can put into settings.txt are:
+
+        'wal': True or False.  Use WAL journal mode, so that users reading
+            the database do not block a user writing to it.  Only switched on
+            if dwglog2.db is on a local disk.  Default: False
+        'busy_timeout': seconds to wait for another user's lock.  Default: 5
+        'retries': times to retry if the database stayed locked.  Default: 5
+        'fts': True or False.  Create a full text index for fast substring
+            searches like *SEPARATOR*.  Default: False
+        'replica': True or False.  Keep a copy of dwglog2.db in the folder of
+            settings.txt and search that, rather than the file on the network
+            share.  Default: False
+        'replica_max_age': seconds that the copy may lag behind dwglog2.db.
+            Default: 2
+        'poll_interval': seconds between looks for changes made by other
+            users, which are then shown in open tables.  0 = never.  Default: 2
+        'search_as_you_type': True or False.  Show what the search box
+            finds while the user types.  Default: True
+        'explain': True or False.  For debugging: print how sqlite carries
+            out each search (EXPLAIN QUERY PLAN).  Default: False
+        'search_cache_mb': megabytes of memory for the results of recent
+            searches, which are used again until the log changes.  0 = no
+            cache.  Default: 32
+        'search_cap': most rows a search results window reads before asking
+            the user whether to load more.  0 = no limit.  Default: 5000
+        'server': URL of a dwglog2 server, e.g. 'http://cadserver:8765'.  If
+            set, dwglog2.db is used through the server.  Default: ''
+
+    Returns
+    -------
+    settingsdic : dict
+        settings, e.g. {'sqldatafile': 'C:\\dwglog2.db', 'wal': True}
+    '''
+    settingsdic = {}
+    try:
+        with open(get_settingsfn(), "r") as file:
+            x = file.read()
+            x = x.replace('\\', '\\\\')
+            settingsdic = eval(x)
+    except Exception as e:  # it an error occured, moset likely and AttributeError
+        print("error11 at get_settings.  " + str(e))
+    return settingsdic
+
+
+def get_sqldatafile():
+    '''
+    Get from the file settings.txt the pathname of the file dwglog2.db
+
+    Returns
+    -------
+    sqldatafile : str
+        pathname of file dwglog2.db
+
+    Raises
+    ------
+    Exception
+        If settings.txt can't be read or has no 'sqldatafile' entry.
+    '''
+    with open(get_settingsfn(), "r") as file:
+        x = file.read()
+        x = x.replace('\\', '\\\\')
+        settingsdic = eval(x)
+    return settingsdic['sqldatafile']
+
+
+def configure_store(store, settingsdic):
+    ''' Apply the concurrency settings from settings.txt to store.'''
+    replicafile = ''
+    if settingsdic.get('replica'):
+        replicafile = os.path.join(os.path.dirname(get_settingsfn()), 'replica.db')
+    store.configure(wal=settingsdic.get('wal', False),
+                    busy_timeout=settingsdic.get('busy_timeout', 5.0),
+                    retries=settingsdic.get('retries', 5),
+                    fts=settingsdic.get('fts', False),
+                    replicafile=replicafile,
+                    replica_max_age=settingsdic.get('replica_max_age', 2.0),
+                    cache_mb=settingsdic.get('search_cache_mb', 32))
+    store.explain = bool(settingsdic.get('explain', False))
+
+
+def open_store(settingsdic, sqldatafile):
+    ''' The store to use: if settings.txt names a dwglog2 server, e.g.
+    'server': 'http://cadserver:8765', a RemoteStore talking to it, else the
+    shared Store, configured from settingsdic and connected to sqldatafile.
+    '''
+    if settingsdic.get('server'):
+        from .client import RemoteStore
+        remote = RemoteStore(settingsdic['server'])
+        remote.connect()
+        return remote
+    from .store import default_store
+    configure_store(default_store, settingsdic)
+    default_store.connect(sqldatafile)
+    return default_store
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Near duplicate descriptions.  Before a record is added, the Add Record
+dialog looks for records whose description is much like the new one, e.g.
+BRKT CTRL PNL 24X24 CS for BRACKET CTRL PNL 24X24 CS, in case the part
+already has a drawing.
+
+Descriptions that differ only in their numbers, SUB ASSY PIPING 4"OD CS and
+SUB ASSY PIPING 6"OD CS, are different parts, not duplicates: adding one
+of those is what filling in a suggested template does (see templates.py).
+So descriptions are compared by their templates, with the numbers replaced
+by ?, and are only taken as alike when their numbers are the same too.
+
+Templates are compared by their trigrams, the three character pieces they
+are made of.  An inverted index maps each trigram to the templates that
+have it, so only templates sharing trigrams with the new one are looked at.
+Trigrams had by a great many templates, like " CS", tell little and would
+cost the most to count, so they're skipped while looking for candidates.
+The candidates sharing the most trigrams are then ranked by their Jaccard
+similarity to the new description's template.
+"""
+
+from array import array
+from collections import Counter
+
+from .templates import NUMBER, template
+
+
+def normalize(description):
+    ''' description in upper case, with single spaces between words.'''
+    return ' '.join((description or '').upper().split())
+
+
+def trigrams(description):
+    ''' The set of trigrams of a normalized description, with a space before
+    and after it so that the starts and ends of words count too.
+    '''
+    padded = ' ' + description + ' '
+    return {padded[i:i+3] for i in range(len(padded) - 2)}
+
+
+def numbers(description):
+    ''' The numbers of a description, in order, e.g. ('24', '24') of
+    BRKT CTRL PNL 24X24 CS.
+    '''
+    return tuple(NUMBER.findall(description))
+
+
+def similarity(a, b):
+    ''' Jaccard similarity of two sets of trigrams, 0 to 1.'''
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class SimilarIndex:
+    ''' Trigram index of the descriptions of the log.
+
+    Parameters
+    ----------
+    rows: iterable, optional
+        Records, (dwg_index, dwg, part, description, ...) tuples, e.g. from
+        Store.descriptions().
+    common: float, optional
+        A trigram had by more than this fraction of the templates is skipped
+        while looking for candidates.  The default is 0.05.
+    '''
+    def __init__(self, rows=(), common=0.05):
+        self.common = common
+        self._ids = {}           # normalized description: its id
+        self._descriptions = []  # id: normalized description
+        self._holders = []       # id: list of the dwg_index of records that have it
+        self._template_ids = {}  # template: its id
+        self._templates = []     # template id: template
+        self._variants = []      # template id: {numbers: id of the description}
+        self._postings = {}      # trigram: array of ids of templates that have it
+        self._records = {}       # dwg_index: (dwg, part, id)
+        self.update(rows)
+
+    def __len__(self):
+        return len(self._records)
+
+    def update(self, rows, changed=()):
+        ''' Bring the index up to date with rows, records added or changed,
+        and changed, the dwg_index of records added, changed or deleted
+        (see watch.Watcher): those of changed not in rows are dropped.
+        '''
+        found = set()
+        for row in rows:
+            self._drop(row[0])
+            self._add(row[0], row[1], row[2], row[3])
+            found.add(row[0])
+        for dwg_index in changed:
+            if dwg_index not in found:
+                self._drop(dwg_index)
+
+    def _add(self, dwg_index, dwg, part, description):
+        description = normalize(description)
+        if not description:
+            return
+        i = self._ids.get(description)
+        if i is None:
+            i = self._ids[description] = len(self._descriptions)
+            self._descriptions.append(description)
+            self._holders.append([])
+            self._variants[self._template_id(template(description))][numbers(description)] = i
+        self._holders[i].append(dwg_index)
+        self._records[dwg_index] = (dwg, part, i)
+
+    def _template_id(self, _template):
+        t = self._template_ids.get(_template)
+        if t is None:
+            t = self._template_ids[_template] = len(self._templates)
+            self._templates.append(_template)
+            self._variants.append({})
+            for gram in trigrams(_template):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array('i')
+                postings.append(t)
+        return t
+
+    def _drop(self, dwg_index):
+        record = self._records.pop(dwg_index, None)
+        if record is not None:  # the description stays indexed, but without records
+            self._holders[record[2]].remove(dwg_index)
+
+    def find(self, description, most=5, threshold=0.65, candidates=50):
+        ''' The records whose descriptions are most like description, and
+        have the same numbers.
+
+        Parameters
+        ----------
+        description: str
+            e.g. BRKT CTRL PNL 24X24 CS
+        most: int, optional
+            Most records returned.  The default is 5.
+        threshold: float, optional
+            Least similarity of the template of a description returned, 0 to
+            1.  The default is 0.65: BRKT CTRL PNL ?X? CS and BRACKET CTRL
+            PNL ?X? CS score 0.65, RECEIVER TANK HORZ ?"OD CS and RECEIVER
+            TANK VERT ?"OD CS 0.64.
+        candidates: int, optional
+            Templates, of those sharing the most trigrams, whose similarity
+            is worked out.  The default is 50.
+
+        Returns
+        -------
+        list
+            (similarity, dwg, part, description) tuples, most similar first,
+            and of equal similarity, newest first.
+        '''
+        description = normalize(description)
+        grams = trigrams(template(description))
+        wanted = numbers(description)
+        limit = max(100, self.common * len(self._templates))
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        rare = [p for p in postings if len(p) <= limit] or postings
+        shared = Counter()
+        for p in rare:
+            shared.update(p)
+        ranked = []
+        for t, _ in shared.most_common(candidates):
+            i = self._variants[t].get(wanted)
+            if i is not None and self._holders[i]:
+                score = similarity(grams, trigrams(self._templates[t]))
+                if score >= threshold:
+                    ranked.append((score, i))
+        found = []
+        for score, i in sorted(ranked, reverse=True):
+            for dwg_index in sorted(self._holders[i], reverse=True):
+                dwg, part, _ = self._records[dwg_index]
+                found.append((score, dwg, part, self._descriptions[i]))
+                if len(found) == most:
+                    return found
+        return found
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Kenneth E. Carlton
+
+The connection manager for the dwglog2.db database file.  Opening an sqlite
+file that is on a network share is slow: each open costs a file open, file
+locking, and a read of the schema, all over the network.  So rather than
+calling sqlite3.connect() for each operation, the dwglog2 program keeps one
+warm connection per process, owned by the Store object found here.
+
+Many engineers use the same dwglog2.db at once.  So that one user's search
+does not make another user's add fail, the Store waits on a locked database
+(busy timeout) and, if the lock persists, retries with an exponential backoff.
+Optionally WAL journal mode can be switched on so that readers and a writer
+don't block one another.  WAL requires shared memory between all processes
+using the file, which network file systems don't provide, so WAL is only
+switched on for files on a local disk.
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+
+from . import ops, query, schema
+from .cache import SearchCache
+from .replica import Replica
+
+
+class DatabaseBusyError(sqlite3.OperationalError):
+    ''' The database stayed locked by other users through all retries.'''
+
+
+def is_locked_error(er):
+    ''' Is er an sqlite3 error caused by another connection holding a lock?'''
+    msg = str(er).lower()
+    return 'locked' in msg or 'busy' in msg
+
+
+def is_network_path(path):
+    ''' Guess whether path is on a network file system (e.g. an SMB share).
+
+    Parameters
+    ----------
+    path: str
+        pathname of a file
+
+    Returns
+    -------
+    bool
+        True if the file appears to be on a network file system.
+    '''
+    path = os.path.abspath(path)
+    if path.startswith('\\\\') or path.startswith('//'):  # UNC path, \\server\share
+        return True
+    if sys.platform[:3] == 'win':
+        import ctypes
+        drive = os.path.splitdrive(path)[0] + '\\'
+        return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+    try:
+        with open('/proc/mounts') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    mountpoint, fstype = '', ''
+    for mp, fs in mounts:
+        if ((path == mp or path.startswith(mp.rstrip('/') + '/'))
+                and len(mp) > len(mountpoint)):
+            mountpoint, fstype = mp, fs
+    return fstype in ('cifs', 'smb3', 'smbfs', 'nfs', 'nfs4', 'fuse.sshfs')
+
+
+class Store:
+    ''' Owns the one long-lived connection to the dwglog2.db database file.
+    All database access of the dwglog2 program goes through an object of this
+    class.  If the location of dwglog2.db changes (see the Settings dialog
+    box), call connect() with the new location; the old connection is closed
+    and a new one opened.  On connecting, the database is upgraded to the
+    layout that this program expects (see schema.py).
+
+    Parameters
+    ----------
+    sqldatafile: str, optional
+        pathname of the dwglog2.db file.  The default is None.
+    wal: bool, optional
+        Switch on WAL journal mode if the file is on a local disk.  The
+        default is False.
+    busy_timeout: float, optional
+        Seconds sqlite waits for a lock held by another user before giving
+        up.  The default is 5.0.
+    retries: int, optional
+        Number of times an operation that failed because the database was
+        locked is retried.  The default is 5.
+    backoff: float, optional
+        Seconds to wait before the first retry.  The wait doubles with each
+        retry.  The default is 0.05.
+    fts: bool, optional
+        Create the full text index (see schema.create_fts) if it doesn't
+        exist.  Whether or not set, an existing index is used for searches.
+        The default is False.
+    replicafile: str, optional
+        If given, serve latest(), search() and get() from a local copy of
+        the database kept in this file (see replica.py).  The default is None.
+    replica_max_age: float, optional
+        Seconds the local copy may lag behind.  The default is 2.0.
+    '''
+    def __init__(self, sqldatafile=None, wal=False, busy_timeout=5.0,
+                 retries=5, backoff=0.05, fts=False, replicafile=None,
+                 replica_max_age=2.0, cache_mb=32):
+        self.sqldatafile = None
+        self.wal = wal
+        self.busy_timeout = busy_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.fts = fts
+        self.replicafile = replicafile
+        self.replica_max_age = replica_max_age
+        self.replica = None
+        self.writes = 0  # own commits; PRAGMA data_version doesn't count them
+        self.has_fts = False  # the full text index exists and can be used
+        self.journal_mode = None
+        self.explain = False  # print how sqlite carries out each search
+        self.cache = SearchCache(int(cache_mb * 1024 * 1024))  # see search
+        self._conn = None
+        if sqldatafile:
+            self.connect(sqldatafile)
+
+    def configure(self, wal=None, busy_timeout=None, retries=None, backoff=None,
+                  fts=None, replicafile=None, replica_max_age=None, cache_mb=None):
+        ''' Change the concurrency settings.  Arguments left as None are
+        unchanged; replicafile='' switches the replica off.  An open
+        connection is reopened with the new settings.
+        '''
+        if wal is not None:
+            self.wal = bool(wal)
+        if busy_timeout is not None:
+            self.busy_timeout = float(busy_timeout)
+        if retries is not None:
+            self.retries = int(retries)
+        if backoff is not None:
+            self.backoff = float(backoff)
+        if fts is not None:
+            self.fts = bool(fts)
+        if replicafile is not None:
+            self.replicafile = replicafile or None
+        if replica_max_age is not None:
+            self.replica_max_age = float(replica_max_age)
+        if cache_mb is not None:
+            self.cache.maxbytes = int(float(cache_mb) * 1024 * 1024)
+        if self._conn is not None:
+            sqldatafile = self.sqldatafile
+            self.close()
+            self.connect(sqldatafile)
+
+    def connect(self, sqldatafile):
+        ''' Open a connection to sqldatafile.  If a connection to that same
+        file is already open, it is reused.
+
+        Parameters
+        ----------
+        sqldatafile: str
+            pathname of the dwglog2.db file
+
+        Returns
+        -------
+        sqlite3.Connection
+        '''
+        if self._conn is not None and sqldatafile == self.sqldatafile:
+            return self._conn
+        self.close()
+        self._conn = sqlite3.connect(sqldatafile, timeout=self.busy_timeout)
+        self.sqldatafile = sqldatafile
+        self.journal_mode = self.retry(self._set_journal_mode)
+        if self.retry(schema.needs_migration, self._conn):
+            self.write(schema.migrate)
+        self.has_fts = False
+        if schema.fts_available():
+            if self.fts and not self.retry(schema.has_fts, self._conn):
+                self.write(schema.create_fts)
+            self.has_fts = self.retry(schema.has_fts, self._conn)
+        if self.replicafile:
+            self.replica = Replica(self, self.replicafile, self.replica_max_age)
+        return self._conn
+
+    def _set_journal_mode(self):
+        if self.wal and not is_network_path(self.sqldatafile):
+            return self._conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        return self._conn.execute('PRAGMA journal_mode').fetchone()[0]
+
+    def close(self):
+        self.cache.clear()
+        if self.replica is not None:
+            self.replica.close()
+            self.replica = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def conn(self):
+        ''' The open connection.  Raises sqlite3.ProgrammingError if connect()
+        has not yet been called.
+        '''
+        if self._conn is None:
+            if not self.sqldatafile:
+                raise sqlite3.ProgrammingError('Store: no database file has been set')
+            self.connect(self.sqldatafile)
+        return self._conn
+
+    def retry(self, func, *args, **kwargs):
+        ''' Call func(*args, **kwargs).  If it fails because the database is
+        locked, wait and try again, doubling the wait each time.  After
+        self.retries retries, raise DatabaseBusyError.
+        '''
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as er:
+                if not is_locked_error(er):
+                    raise
+                if attempt == self.retries:
+                    raise DatabaseBusyError(str(er)) from er
+            time.sleep(delay * (1 + random.random()))  # jitter so that clients don't retry in step
+            delay *= 2
+
+    def run(self, func, *args):
+        ''' Call func(conn, *args) inside of a transaction and return its
+        result.  The transaction is retried if the database is locked.  Use
+        for reads.
+        '''
+        def attempt():
+            with self.transaction() as conn:
+                return func(conn, *args)
+        return self.retry(attempt)
+
+    def write(self, func, *args):
+        ''' Like run(), but the transaction is started with BEGIN IMMEDIATE,
+        i.e. the write lock is taken up front.  A deferred transaction that
+        reads and then writes can otherwise fail, without waiting, if another
+        user is also reading.  Use for writes.
+        '''
+        def attempt():
+            with self.transaction() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                return func(conn, *args)
+        result = self.retry(attempt)
+        # only once committed: a failed write changed nothing, so searches
+        # cached and tables shown (see search_version) stay as they are
+        self.writes += 1
+        if self.replica is not None:
+            self.replica.expire()  # so that the user sees the change at once
+        return result
+
+    def read(self, func, *args):
+        ''' Like run(), but served from the local replica if there is one.'''
+        if self.replica is not None:
+            return self.replica.run(func, *args)
+        return self.run(func, *args)
+
+    def execute(self, sql, parameters=()):
+        return self.retry(self.conn.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.retry(self.conn.executemany, sql, seq_of_parameters)
+
+    @contextmanager
+    def transaction(self):
+        ''' Commit on success, roll back on an exception.  Same as using
+        "with conn:" on an sqlite3 connection.
+        '''
+        conn = self.conn
+        with conn:
+            yield conn
+
+    def add(self, part, description, author, count=1):
+        ''' Add count new records, each with its own new drawing no., all in
+        one transaction.  If part is just the first four digits of a part no.,
+        e.g. 6890-, the rest of each record's part no. is filled in from its
+        drawing no.
+
+        Parameters
+        ----------
+        part: str
+            part no., e.g. 0300-2020-401, or a prefix like 0300-
+        description: str
+            description; the same for all records
+        author: str
+            user name of the author
+        count: int, optional
+            number of records to add.  The default is 1.
+
+        Returns
+        -------
+        list
+            The new records, tuples of (dwg_index, dwg, part, description,
+            date, author), in order of drawing no.
+        '''
+        return self.write(ops.add, part, description, author, count)
+
+    # The operations of ops.py.  RemoteStore (see client.py) has these same
+    # methods, so the GUI works the same with either.
+
+    def latest(self, limit=100, indexed=False, before=None):
+        return self.read(ops.latest, limit, indexed, before)
+
+    def search(self, searchterm, limit=0, indexed=False, before=None):
+        ''' See ops.search.  Served from self.cache if the same search (the
+        same once parsed, so e.g. "0300-*;kcarlton" and "0300-* ; kcarlton"
+        are one) was made before and the log hasn't changed since.
+        '''
+        if self.explain:
+            print('EXPLAIN QUERY PLAN of search ' + repr(searchterm) + ':\n    ' + '\n    '.join(
+                  self.read(ops.explain, searchterm, limit, self.has_fts, indexed, before)))
+        if not self.cache.maxbytes:
+            return self.read(ops.search, searchterm, limit, self.has_fts, indexed, before)
+        key = (query.unparse(query.parse(searchterm)), limit, indexed, before)
+        version = self.search_version()
+        rows = self.cache.get(key, version)
+        if rows is None:
+            rows = self.read(ops.search, searchterm, limit, self.has_fts, indexed, before)
+            self.cache.put(key, version, rows)
+        return list(rows)  # callers may change their list, not the cached one
+
+    def search_version(self):
+        ''' A value that changes whenever what search() reads changes: that
+        of data_version(), or with a replica, how far the replica has caught
+        up (after catching up, if that is due).
+        '''
+        if self.replica is not None:
+            self.replica.run(lambda conn: None)
+            return self.replica.last_seq
+        return self.data_version()
+
+    def rows(self, indexes, searchterm=''):
+        return self.read(ops.rows, indexes, searchterm, self.has_fts)
+
+    def data_version(self):
+        ''' A value that changes whenever anyone commits a change to the
+        database.  Costs next to nothing (no table is read), so it can be
+        polled often.  See watch.py.
+        '''
+        version = self.retry(self.conn.execute, 'PRAGMA data_version').fetchone()[0]
+        return version, self.writes
+
+    def changes(self, since):
+        ''' (seq, changed dwg_indexes) since entry since of the dwgchanges
+        journal of the master database; see ops.changes.
+        '''
+        seq, indexes = self.run(ops.changes, since)
+        if indexes != [] and self.replica is not None:
+            self.replica.expire()  # so that rows() sees the changes
+        return seq, indexes
+
+    def last_change(self):
+        return self.run(ops.last_change)
+
+    def get(self, dwg):
+        return self.read(ops.get, dwg)
+
+    def parts(self):
+        return self.read(ops.parts)
+
+    def descriptions(self):
+        return self.read(ops.descriptions)
+
+    def templates_used(self):
+        return self.run(ops.templates_used)  # a replica's copy of dwgtemplates isn't kept up
+
+    def peek(self, part='', count=1):
+        return self.run(ops.peek, part, count)
+
+    def stats(self):
+        return self.run(ops.stats)
+
+    def plan_change(self, k, clicked_text, column):
+        return self.run(ops.plan_change, k, clicked_text, column)
+
+    def apply_change(self, k, clicked_text, column):
+        return self.write(ops.apply_change, k, clicked_text, column)
+
+    def delete(self, dwg):
+        return self.write(ops.delete, dwg)
+
+
+default_store = Store()  # the one Store object shared by the whole dwglog2 program
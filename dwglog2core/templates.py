@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Description suggestions learned from the log.  The descriptions of the parts
+of one kind, e.g. 6890- (sub assy piping), mostly follow a few patterns that
+differ only in their numbers: SUB ASSY PIPING 4"OD CS, SUB ASSY PIPING 6"OD
+CS.  With the numbers replaced by ?, they become one template, SUB ASSY
+PIPING ?"OD CS, like those of pndescrip (see descrip.py).
+
+The dwgtemplates table (see schema.py) holds, for each four digit prefix,
+how often each template is used.  It is filled once from dwgnos and then
+kept up to date by add, apply_change and delete (see ops.py), a few rows at a
+time.  Programs that write to dwgnos without going through ops.py leave it a
+little behind, which matters little for a suggestion.
+"""
+
+import re
+
+NUMBER = re.compile(r'\d+(?:[./]\d+)*')  # e.g. 4, 1.5, 1/2
+
+
+def template(description):
+    ''' description with each number replaced by ?, e.g.
+    'SUB ASSY PIPING 4"OD CS' -> 'SUB ASSY PIPING ?"OD CS'.
+    '''
+    return NUMBER.sub('?', (description or '').strip())
+
+
+def prefix_of(part):
+    ''' The first four digits of part as an int, e.g. 6890 for 6890-2020-401,
+    the same key as pndescrip's; None if part doesn't begin with four digits
+    and a dash.
+    '''
+    if part and len(part) >= 5 and part[:4].isdigit() and part[4] == '-':
+        return int(part[:4])
+    return None
+
+
+def tally(rows):
+    ''' Uses of each template in rows, (part, description) tuples: a
+    dictionary {(prefix, template): uses}.
+    '''
+    uses = {}
+    for part, description in rows:
+        prefix = prefix_of(part)
+        if prefix is not None and description and description.strip():
+            key = (prefix, template(description))
+            uses[key] = uses.get(key, 0) + 1
+    return uses
+
+
+def build(conn):
+    ''' Fill the dwgtemplates table from all of dwgnos.  Call inside of a
+    write transaction.
+    '''
+    rows = conn.execute("SELECT part, description FROM dwgnos WHERE part LIKE '____-%'")
+    conn.execute('DELETE FROM dwgtemplates')
+    conn.executemany('INSERT INTO dwgtemplates(prefix, template, uses) VALUES (?,?,?)',
+                     [key + (n,) for key, n in tally(rows).items()])
+
+
+def count(conn, rows, sign=1):
+    ''' Count the templates of rows, (part, description) tuples, in the
+    dwgtemplates table: added records with sign 1, deleted ones, or records
+    as they were before a change, with sign -1.  Call inside of the write
+    transaction that makes the change.
+    '''
+    for (prefix, _template), n in tally(rows).items():
+        conn.execute('''INSERT INTO dwgtemplates(prefix, template, uses) VALUES (?,?,?)
+                        ON CONFLICT(prefix, template) DO UPDATE SET uses = uses + excluded.uses''',
+                     (prefix, _template, sign * n))
+        if sign < 0:
+            conn.execute('DELETE FROM dwgtemplates WHERE prefix = ? AND template = ? AND uses <= 0',
+                         (prefix, _template))
+
+
+class Suggestions:
+    ''' The templates of each prefix, most used first, for the Add Record
+    dialog.  Looking up a prefix is one dictionary lookup.
+
+    Parameters
+    ----------
+    rows: iterable, optional
+        (prefix, template, uses) tuples, e.g. from Store.templates().
+    most: int, optional
+        Templates kept per prefix.  The default is 10.
+    '''
+    def __init__(self, rows=(), most=10):
+        ranked = {}
+        for prefix, _template, uses in rows:
+            ranked.setdefault(prefix, []).append((-uses, _template))
+        self._templates = {prefix: [t for _, t in sorted(found)[:most]]
+                           for prefix, found in ranked.items()}
+
+    def __len__(self):
+        return len(self._templates)
+
+    def get(self, prefix):
+        ''' The templates of prefix, an int, e.g. 6890, most used first.'''
+        return self._templates.get(prefix, [])
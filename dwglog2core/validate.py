@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Rules for changing a field of a record of the dwglog2.db database, i.e. what
+happens when a user edits a cell of a table in the dwglog2 program.  The GUI
+asks plan_change() what a change would do, shows the user the message that
+comes back, and, if the user agrees, carries out the returned sql.  What the
+user typed is passed to sqlite as parameters of the sql, never put into it,
+so that e.g. a description with a quote in it, 1/2" O'RING, is stored as
+typed.
+"""
+
+from collections import namedtuple
+
+from . import dates
+from .codec import dwgnum2indexnum, indexnum2dwgnum, updatePN
+from .descrip import pndescrip
+
+
+colnames = {0:'dwg', 1:'part', 2:'description', 3:'date', 4:'author'}
+
+Change = namedtuple('Change', 'msgtitle msg sql confirm params', defaults=((),))
+Change.__doc__ = ''' A change to be made to the database.  msgtitle and msg are
+shown to the user; if confirm is True the user must OK the change before sql
+is carried out, with parameters params.'''
+
+
+class ChangeRejected(ValueError):
+    ''' The change is not allowed.  The message tells the user why.'''
+
+
+def plan_change(conn, k, clicked_text, column):
+    ''' Work out what changing a cell should do.  The appropriatness of the
+    change and how the change is handled depends on in what column the change
+    is made in.  For example, if a user enters a value in a cell meant for a
+    date, and the format of the text for that date is not appropriate, the
+    change will not be allowed.
+
+    Parameters
+    ----------
+    conn: sqlite3.Connection
+        Connection to dwglog2.db, used to look up the record being changed.
+    k: dictionary
+        The dicionary has keys named 0, 1, 2, 3, and 4.  The values
+        corresponding to these keys are text in columns 0 (dwg no.),
+        1 (part no.), 2 (description), 3 (date), and 4 (author); these
+        corresponding to the row that contains the cell that has changed.
+        k is updated in place to the values that will be stored.
+    clicked_text: str
+        The original text that was in the cell that has been changed to
+        contain the updated text.
+    column: int
+        The column in which the change occurred: 0, 1, 2, 3, or 4
+        (corresponding to the columns dwg, part, description, date, or author).
+        (Note that the row to apply the change to is known because k[0] of the
+        dictionary contains the drawing number, and this number is unique in
+        the table.)
+
+    Returns
+    -------
+    Change or None
+        None if the entered text doesn't make sense and is to be ignored.
+
+    Raises
+    ------
+    ChangeRejected
+        If the change is not allowed, e.g. a dwg. no. too far beyond the last.
+    '''
+    if column in [0, 1, 2, 3]:
+        k[column] = k[column].upper()
+    elif column == 4:
+        k[4] = k[column].lower()
+    overwrite = False
+    originalnum = False
+    pnerr = False
+    pnWillChgWithDwgNo = False
+    showConfirmationMsg = True
+
+    # === preliminary setup... need some data from the database
+    if column == 0:
+        result = conn.execute("SELECT dwg_index FROM dwgnos ORDER BY dwg_index DESC LIMIT 1").fetchone()
+        lastIndex = result[0]
+        result = conn.execute("SELECT dwg_index, part FROM dwgnos WHERE dwg = ?", (clicked_text,)).fetchone()
+        currentIndex = result[0]
+        currentPN = result[1]
+    elif column == 1:
+        result = conn.execute("SELECT dwg_index, part, description FROM dwgnos WHERE dwg = ?", (k[0],)).fetchone()
+        currentIndex = result[0]
+        currentDescrip = result[2]
+        currentPN = result[1]      # name was currentPart
+
+    # === analyze column input to determine what should happen
+    # case 1: delete a record:
+    if column == 0 and k[0].lower() in ('delete', 'remove', 'del', 'rm'):
+        k[0] = 'delete'
+    # case 2: user enters what appears to be a legit dwg. no.:
+    elif column == 0 and  k[0].isdigit() and (k[0][:2] == '20') and (len(k[0]) >= 7):
+        proposedNewIndex = dwgnum2indexnum(k[0])
+        # Is currentPN in sync w/ dwg no. which will allow to update to a new PN?
+        if currentPN != updatePN(currentPN, currentIndex, proposedNewIndex):
+            pnWillChgWithDwgNo = True
+        maxAllowedIndex = lastIndex + 50
+        if proposedNewIndex > maxAllowedIndex:
+            raise ChangeRejected('The maximum allowable increase for a drawing number ' +
+                                 'is 50.\n ' + str(indexnum2dwgnum(maxAllowedIndex)) +
+                                 ' is the max in this case.')
+    # case 3: dwg. no. erased e.g. 104119, to get back program generated no., e.g. 2020867
+    elif column == 0 and k[0].strip() == '':
+        originalnum = True
+        k[0] = str(indexnum2dwgnum(currentIndex))
+    # case 4: program generated no. overwritten, e.g. 2020867 overwritten by 104119
+    elif column == 0:
+        overwrite = True
+    elif column == 1:  # column containing the pn
+        k[1] = k[1][:30]
+        lst = k[1].split('-')
+        lst2 = clicked_text.split('-')
+        dg = str(indexnum2dwgnum(currentIndex))
+        # if pn looks to be in sync w/ dwg no., standard change notice to be shown.
+        # else if looks same except last digits, verify if this chqange really wanted.
+        # Note, 1st group of digits, i.e, 0300, 2730, etc. not taken into account
+        if ('-' in k[1] and k[1].count('-') == 2 and len(lst) == 3 and
+                all(lst) and lst[1] == dg[:4] and lst[2] == dg[4:]):
+            pnerr = False
+        # user in inadvertantly trying to change the dwg no. by changing the pn
+        elif ('-' in k[column] and k[column].count('-') == 2 and len(lst) == 3 and
+                all(lst) and lst[1] == dg[:4] and lst[2] != dg[4:]):
+            pnerr = True
+        # if cell left empty, attempt to fill with a "syncronized" pn,
+        # like 0300-2020-421 for dwgno 2020421
+        elif (not k[1].strip() and '-' in clicked_text and
+                  clicked_text.count('-') == 2  and len(lst2) == 3 and all(lst2)):
+            k[1] = lst2[0] + '-' + dg[:4] + '-' + dg[4:]
+        # if cell has 5 characters, like '0300-', fill in with synced pt. no.
+        elif (len(k[1]) == 5 and k[1].endswith('-')):
+            k[1] = k[1] + dg[:4] + '-' + dg[4:]
+            showConfirmationMsg = False
+        # if cell has 10 characters, like '0300-2020', fill in with synced pt. no.
+        elif (len(k[1]) == 10 and k[1].endswith('-') and k[1][5:9] == dg[:4]):
+            k[1] = k[1] + k[0][4:]
+
+        if (not currentDescrip.strip() and len(k[1]) >= 13 and k[1][4] == '-'
+            and  int(k[1][:4]) in pndescrip):
+            k[2] = pndescrip[int(k[1][:4])]
+    elif column == 2:
+        k[2] = k[2][:40]   # limit the description to 40 characters, the same as SyteLine
+    elif column == 3:  # the column containing the date
+        try:
+            isodate = dates.to_iso(k[3])  # accepts 11/5/2020 or 2020-11-05
+        except ValueError:
+            return None  # Entered date doesn't make sense.  Make no change.
+        if not 1998 <= int(isodate[:4]) <= 2099:
+            return None
+        k[3] = dates.to_display(isodate)  # shown to the user as 11/05/2020
+    elif column == 4:
+        k[4] = k[4].lower()    # make the author name lower case
+
+    # === Generate appropriate validation message to present to the user
+    if k[column] == 'delete':
+        msgtitle = 'Delete?'
+        msg = ('dwg:      ' + clicked_text + '\nptno:     ' + k[1] + '\ndescrip: '
+                + k[2] + '\ndate:     ' + k[3] + '\nauthor:  ' + k[4])
+    elif overwrite == True:
+        msgtitle = 'Overwrite?'
+        msg = ('Warning: You are about to OVERWRITE a standard drawing number.\n\n' +
+               'See "Help > Update a field > Only if company policy permits" \n\n' +
+               'from: ' +  clicked_text + '\nto:     ' + k[column])
+    elif pnerr == True:
+        msgtitle = 'Warning!'
+        msg = ('The drawing number WILL NOT be updated.  The drawing number\n' +
+               'will no longer be in sync with the part number.  To keep in sync,\n' +
+               'change instead the drawing number.\n\n' +
+               'See "Help > Update a field > A drawing number may be changed." \n\n' +
+               'from: ' +  clicked_text + '\nto:     ' + k[column])
+    elif pnWillChgWithDwgNo:
+        msgtitle = 'Update?'
+        msg =  ('from: ' +  clicked_text + '\nto:     ' + k[column])
+        msg += ('\n            and  \n')
+        msg += ('from: ' +  currentPN  + '\nto:     '  + updatePN(currentPN, currentIndex, proposedNewIndex))
+    else:
+        msgtitle = 'Update?'
+        msg = ('from: ' +  clicked_text + '\nto:     ' + k[column])
+
+    # === Generate the sqlite command to use to update the database
+    if column == 0 and k[0] == 'delete':  # case 1, delete
+        sqlUpdate = "DELETE from dwgnos WHERE dwg = ?"
+        params = (clicked_text,)
+    elif column == 0 and originalnum == True:  # case 3, original
+        sqlUpdate = "UPDATE dwgnos SET dwg = ? WHERE dwg = ?"
+        params = (str(indexnum2dwgnum(currentIndex)), clicked_text)
+    elif column == 0 and overwrite == True:  # case 4, overwrite
+        sqlUpdate = "UPDATE dwgnos SET dwg = ? WHERE dwg_index = ?"
+        params = (str(k[0]), currentIndex)
+    elif column == 0:  # case 2, legit dwg no.
+        sqlUpdate = "UPDATE dwgnos SET dwg = ?, part = ?, dwg_index = ? WHERE dwg = ?"
+        params = (str(indexnum2dwgnum(proposedNewIndex)),
+                  updatePN(currentPN, currentIndex, proposedNewIndex),
+                  proposedNewIndex, clicked_text)
+    elif column == 1:
+        sqlUpdate = "UPDATE dwgnos SET part = ?, description = ? WHERE dwg = ?"
+        params = (k[1], k[2], k[0])
+    elif column == 3:
+        sqlUpdate = "UPDATE dwgnos SET date = ? WHERE dwg = ?"
+        params = (isodate, k[0])
+    else:  # the column name comes from colnames, not from the user
+        sqlUpdate = "UPDATE dwgnos SET " + colnames[column] + " = ? WHERE dwg = ?"
+        params = (k[column], k[0])
+
+    return Change(msgtitle, msg, sqlUpdate, showConfirmationMsg, params)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Noticing changes made by other users, so that open tables can be brought up
+to date without the user pressing Refresh, and without reloading them.
+
+Watcher.poll() is meant to be called on a timer.  It first asks the store
+for its data version (for a file, PRAGMA data_version, which doesn't read
+any table); when that hasn't moved, that is all the poll costs.  When it
+has, the dwgchanges journal (see schema._dwgchanges) tells which records
+changed.  Each open view then fetches just those of the changed records that
+belong to it and merges them in place; see merge().
+"""
+
+import bisect
+
+
+class Watcher:
+    ''' Reports the dwg_index of records changed since the previous poll.
+
+    Parameters
+    ----------
+    store: Store or RemoteStore
+    '''
+    def __init__(self, store):
+        self.store = store
+        self.version = store.data_version()
+        self.seq = store.last_change()
+        self.polls = 0    # for the benchmark/debugging: polls made,
+        self.changed = 0  # and polls that found changes
+
+    def poll(self):
+        ''' dwg_index values of records changed (added, altered or deleted)
+        since the last poll, sorted; [] if none.  None if so much has changed
+        that the dwgchanges journal no longer goes back to the last poll: read
+        everything again.
+        '''
+        self.polls += 1
+        version = self.store.data_version()
+        if version == self.version:
+            return []
+        self.version = version
+        self.seq, indexes = self.store.changes(self.seq)
+        if indexes is None:
+            self.changed += 1
+            return None
+        if indexes:
+            self.changed += 1
+        return list(indexes)
+
+
+def merge(shown, changed, rows, limit=None):
+    ''' Bring shown up to date, in place, and say what was done so that a
+    table showing the same rows can be changed likewise.
+
+    Parameters
+    ----------
+    shown: list or columns.ColumnStore
+        Rows currently shown, each a tuple starting with its dwg_index,
+        newest (largest dwg_index) first.
+    changed: list
+        dwg_index values of records that changed (see Watcher.poll).
+    rows: list
+        The current rows, dwg_index first, of those of changed that belong to
+        the view, e.g. that the view's search still finds (see Store.rows).
+        A changed record not in rows is removed from the view.
+    limit: int, optional
+        Most rows to show, e.g. 100 for the latest 100.  Rows older than the
+        oldest one shown are then left out, unless fewer than limit rows are
+        shown.  The default is None, no limit.
+
+    Returns
+    -------
+    list
+        Edits, in the order to apply them: ('update', position, row),
+        ('insert', position, row), or ('delete', position, None).
+    '''
+    indexes = getattr(shown, 'dwg_index', None)  # e.g. a columns.ColumnStore
+    if indexes is None:
+        indexes = [row[0] for row in shown]
+    keys = [-i for i in indexes]  # ascending, for bisect
+    current = {row[0]: row for row in rows}
+    edits = []
+    for dwg_index in sorted(changed, reverse=True):
+        pos = bisect.bisect_left(keys, -dwg_index)
+        present = pos < len(keys) and keys[pos] == -dwg_index
+        row = current.get(dwg_index)
+        if row is None:
+            if present:
+                del keys[pos], shown[pos]
+                edits.append(('delete', pos, None))
+        elif present:
+            if tuple(shown[pos]) != tuple(row):
+                shown[pos] = row
+                edits.append(('update', pos, row))
+        elif limit is None or pos < limit:
+            keys.insert(pos, -dwg_index)
+            shown.insert(pos, row)
+            edits.append(('insert', pos, row))
+    while limit is not None and len(shown) > limit:
+        shown.pop()
+        keys.pop()
+        edits.append(('delete', len(shown), None))
+    return edits
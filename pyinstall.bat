@@ -1 +1,2 @@
 pyinstaller dwglog2.py -w  --icon=icon\dwglog2.ico
+pyinstaller dwglog2cli.py --console --exclude-module PyQt5
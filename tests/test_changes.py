@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Tests of the dwgchanges journal (schema.py, ops.py).
+"""
+
+import sqlite3
+
+from dwglog2core import ops, schema
+
+
+def test_pruned():
+    ''' The journal keeps the latest 10,000 entries; asking for changes
+    from before those gives None, i.e. read everything again.
+    '''
+    conn = sqlite3.connect(':memory:')
+    with conn:
+        schema.migrate(conn)
+        conn.executemany("INSERT INTO dwgnos VALUES (?, ?, '6890-', 'X', '2020-01-02', 'me')",
+                         [(202000000 + i, str(2020000 + i)) for i in range(1, 12001)])
+    count, first, last = conn.execute('SELECT COUNT(*), MIN(seq), MAX(seq) FROM dwgchanges').fetchone()
+    assert last == 12000 and 10000 <= count <= 11000
+    assert ops.changes(conn, last - 2) == (last, [202011999, 202012000])
+    assert ops.changes(conn, first - 1)[1] is not None
+    assert ops.changes(conn, first - 2) == (last, None)
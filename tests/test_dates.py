@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Tests of the dates stored in dwglog2.db (dates.py, schema.py).
+"""
+
+import sqlite3
+
+import pytest
+
+from dwglog2core import dates, schema
+
+
+def test_to_iso():
+    assert dates.to_iso('11/5/2020') == '2020-11-05'
+    assert dates.to_iso('2/29/2020') == '2020-02-29'
+    for text in ['02/31/2020', '2019-02-29', '13/01/2020', '11/05/20']:
+        with pytest.raises(ValueError):
+            dates.to_iso(text)
+
+
+def test_older_program():
+    ''' A date written as MM/DD/YYYY after migrating, as an older dwglog2
+    program does, is stored as YYYY-MM-DD.
+    '''
+    conn = sqlite3.connect(':memory:')
+    with conn:
+        schema.migrate(conn)
+        conn.execute('''INSERT INTO dwgnos VALUES
+                        (202000001, '2020001', '6890-2020-001', 'X', '11/05/2020', 'me')''')
+        conn.execute('''INSERT INTO dwgnos VALUES
+                        (202000002, '2020002', '6890-2020-002', 'X', '2020-01-02', 'me')''')
+        conn.execute("UPDATE dwgnos SET date = '02/31/2020' WHERE dwg_index = 202000002")
+        conn.execute("UPDATE dwgnos SET date = '12/25/2021' WHERE dwg_index = 202000001")
+    assert conn.execute('SELECT date FROM dwgnos ORDER BY dwg_index').fetchall() == [
+        ('2021-12-25',), ('02/31/2020',)]
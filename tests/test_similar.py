@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Kenneth E. Carlton
+
+Tests of the near duplicate check of the Add Record dialog (similar.py).
+"""
+
+from dwglog2core.similar import SimilarIndex
+
+ROWS = [(202000001, '2020001', '6890-2020-001', 'SUB ASSY PIPING 4"OD CS'),
+        (202000002, '2020002', '7318-2020-002', 'RECEIVER TANK VERT 200 GAL'),
+        (202000003, '2020003', '6050-2020-003', 'SEPARATOR OIL FR 30'),
+        (202000004, '2020004', '0300-2020-004', 'BASEPLATE DVW0103'),
+        (202000005, '2020005', '2730-2020-005', 'BRACKET CTRL PNL 24X24 CS')]
+
+
+def test_sizes_differ():
+    ''' Descriptions that differ only in their numbers are other parts.'''
+    index = SimilarIndex(ROWS)
+    for description in ['SUB ASSY PIPING 6"OD CS', 'RECEIVER TANK VERT 400 GAL',
+                        'SEPARATOR OIL FR 24', 'BASEPLATE DVW0063',
+                        'BRACKET CTRL PNL 24X36 CS']:
+        assert index.find(description) == []
+
+
+def test_abbreviated():
+    ''' BRKT for BRACKET, same numbers: the same part.'''
+    found = SimilarIndex(ROWS).find('brkt ctrl pnl 24x24 cs')
+    assert [(dwg, part) for _, dwg, part, _ in found] == [('2020005', '2730-2020-005')]
+
+
+def test_same():
+    found = SimilarIndex(ROWS).find('SUB ASSY PIPING 4"OD CS')
+    assert found == [(1.0, '2020001', '6890-2020-001', 'SUB ASSY PIPING 4"OD CS')]
+
+
+def test_deleted():
+    ''' A record changed or deleted is no longer found.'''
+    index = SimilarIndex(ROWS)
+    index.update([], [202000005])
+    assert index.find('BRKT CTRL PNL 24X24 CS') == []